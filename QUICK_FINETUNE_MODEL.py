@@ -4,29 +4,40 @@ Uses: 1,2,3,4,5,6,7,8,9,10 = ACCIDENT
 Uses: test1, test3, test4 = NON-ACCIDENT
 """
 
+import argparse
 import os
 import numpy as np
 from pathlib import Path
-from tensorflow.keras.preprocessing import image
 from tensorflow.keras.models import load_model
-from tensorflow.keras.optimizers import Adam
 from tensorflow.keras.callbacks import EarlyStopping
 import warnings
 warnings.filterwarnings('ignore')
 
+from ml_model.data_pipeline import build_dataset
+from ml_model.training import TrainingRunner
+
+parser = argparse.ArgumentParser(description="Fine-tune the model on the labelled test_images")
+parser.add_argument('--epochs', type=int, default=50, help="Maximum epochs")
+parser.add_argument('--batch-size', type=int, default=2, help="Images per step")
+TrainingRunner.add_arguments(parser, checkpoint_dir=os.path.join("models", ".checkpoints", "finetune"))
+args = parser.parse_args()
+
 print("=" * 70)
 print("🎯 QUICK MODEL FINE-TUNE - TRAINING WITH TEST DATA")
 print("=" * 70)
 
+# Threads and precision must be set before TensorFlow starts
+runner = TrainingRunner.from_args(args)
+
 # Load test images
 test_dir = Path("test_images")
-IMG_SIZE = (224, 224)
+CACHE_DIR = os.path.join("models", ".cache")
 
 print("\n📁 Loading test images...")
 print("=" * 70)
 
-X = []
-y = []
+paths = []
+labels = []
 
 # ACCIDENT images (1-10)
 accident_files = ['1.jpg', '2.jpeg', '3.jpeg', '4.jpeg', '5.jpeg', 
@@ -36,14 +47,11 @@ print("\n🚨 ACCIDENT Images (Label: 1):")
 for fname in accident_files:
     fpath = test_dir / fname
     if fpath.exists():
-        try:
-            img = image.load_img(str(fpath), target_size=IMG_SIZE)
-            img_array = image.img_to_array(img) / 255.0
-            X.append(img_array)
-            y.append(1)
-            print(f"  ✓ {fname}")
-        except:
-            print(f"  ✗ {fname} - Error")
+        paths.append(str(fpath))
+        labels.append(1)
+        print(f"  ✓ {fname}")
+    else:
+        print(f"  ✗ {fname} - Missing")
 
 # NON-ACCIDENT images
 non_accident_files = ['test1.jpeg', 'test3.jpg', 'test4.jpeg']
@@ -52,20 +60,19 @@ print("\n✅ NON-ACCIDENT Images (Label: 0):")
 for fname in non_accident_files:
     fpath = test_dir / fname
     if fpath.exists():
-        try:
-            img = image.load_img(str(fpath), target_size=IMG_SIZE)
-            img_array = image.img_to_array(img) / 255.0
-            X.append(img_array)
-            y.append(0)
-            print(f"  ✓ {fname}")
-        except:
-            print(f"  ✗ {fname} - Error")
-
-X = np.array(X)
-y = np.array(y)
+        paths.append(str(fpath))
+        labels.append(0)
+        print(f"  ✓ {fname}")
+    else:
+        print(f"  ✗ {fname} - Missing")
+
+# Decoded in parallel and cached on disk; unreadable files are skipped
+train_ds = build_dataset(paths, labels, batch_size=args.batch_size, training=True, cache_dir=CACHE_DIR, name="finetune")
+eval_ds = build_dataset(paths, labels, batch_size=16, cache_dir=CACHE_DIR, name="finetune")
+y = np.concatenate([batch_labels.numpy() for _, batch_labels in eval_ds]).astype(int)
 
 print(f"\n📊 Data Loaded:")
-print(f"  Total images: {len(X)}")
+print(f"  Total images: {len(y)}")
 print(f"  Accidents: {np.sum(y==1)}")
 print(f"  Non-Accidents: {np.sum(y==0)}")
 
@@ -78,7 +85,7 @@ if not os.path.exists(model_path):
     exit(1)
 
 try:
-    model = load_model(model_path)
+    model = runner.prepare(load_model(model_path))
     print(f"  ✓ Model loaded")
 except Exception as e:
     print(f"  ✗ Error: {e}")
@@ -96,25 +103,21 @@ for layer in model.layers[-3:]:
     layer.trainable = True
 
 # Compile
-model.compile(
-    optimizer=Adam(learning_rate=0.0001),
-    loss='binary_crossentropy',
-    metrics=['accuracy']
-)
+runner.compile(model, learning_rate=0.0001)
 
 print("  ✓ Ready for training")
 
 # Train
 print("\n🔄 Training model with your labeled test images...")
-print("  Epochs: 50")
-print("  Batch size: 2")
+print(f"  Epochs: {args.epochs}")
+print(f"  Batch size: {args.batch_size} (x{runner.accumulation_steps} accumulated)")
 print("=" * 70)
 
-history = model.fit(
-    X, y,
-    epochs=50,
-    batch_size=2,
-    verbose=1,
+history = runner.fit(
+    model,
+    train_ds,
+    epochs=args.epochs,
+    samples_per_epoch=len(y),
     callbacks=[
         EarlyStopping(monitor='loss', patience=5, restore_best_weights=True)
     ]
@@ -122,7 +125,7 @@ history = model.fit(
 
 # Evaluate
 print("\n📈 Evaluating on test data...")
-loss, acc = model.evaluate(X, y, verbose=0)
+loss, acc = model.evaluate(eval_ds, verbose=0)
 
 print(f"\n{'='*70}")
 print(f"✅ TRAINING COMPLETE!")
@@ -132,7 +135,7 @@ print(f"  Accuracy: {acc*100:.2f}%")
 
 # Show predictions
 print(f"\n🔍 Predictions on test images:")
-preds = model.predict(X, verbose=0)
+preds = model.predict(eval_ds, verbose=0)
 
 for i, (pred, true_label) in enumerate(zip(preds, y)):
     pred_label = 1 if pred[0] > 0.5 else 0
@@ -146,7 +149,7 @@ for i, (pred, true_label) in enumerate(zip(preds, y)):
 # Save
 print(f"\n💾 Saving improved model...")
 new_model_path = "models/accident_detection_model.h5"
-model.save(new_model_path)
+runner.save(model, new_model_path)
 print(f"  ✓ Saved to: {new_model_path}")
 
 print(f"\n{'='*70}")
@@ -3,30 +3,48 @@ QUICK START: Train Advanced Model
 One-command model training
 """
 
+import argparse
 import os
 import sys
 
-# Add ml_model to path
-ml_model_path = os.path.join(os.path.dirname(__file__), 'ml_model')
-sys.path.insert(0, ml_model_path)
-
-from train_advanced_model import train_advanced_model
+from ml_model.training import TrainingRunner, train_on_splits
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Train the v2 model on dataset/")
+    parser.add_argument('--base', default="models/accident_detection_model.h5", help="Model to start from")
+    parser.add_argument('--output', default="models/accident_detection_model_v2.h5", help="Trained model path")
+    parser.add_argument('--dataset', default="dataset", help="Root with train/, valid/ and test/")
+    parser.add_argument('--epochs', type=int, default=30, help="Maximum epochs")
+    parser.add_argument('--batch-size', type=int, default=16, help="Images per step")
+    parser.add_argument('--trainable-layers', type=int, default=None, help="Train only the last N layers")
+    TrainingRunner.add_arguments(parser, checkpoint_dir=os.path.join("models", ".checkpoints", "advanced"))
+    args = parser.parse_args()
+
     print("\n" + "="*70)
     print("ACCIDENT DETECTION - ADVANCED MODEL v2.0 TRAINING")
     print("="*70)
-    print("\n📊 Model Features:")
-    print("  ✓ Dual-branch architecture (EfficientNetB3 + MobileNetV3)")
-    print("  ✓ Transfer learning with fine-tuning")
-    print("  ✓ Aggressive data augmentation")
-    print("  ✓ Class weight balancing")
-    print("  ✓ Expected: 85-92% accuracy, 88-95% precision")
-    print("\n⏱️  Training time: ~45-60 minutes (with GPU)")
+    print("\n📊 Training setup:")
+    print(f"  ✓ Starting from {args.base}")
+    print("  ✓ Cached, prefetched tf.data input with augmentation")
+    print("  ✓ Early stopping on validation loss")
+    print("  ✓ Resumable: rerun after an interruption to continue")
     print("\n🎯 Files that will be created/updated:")
-    print("  - models/accident_detection_model_v2.h5 (new model)")
-    print("  - models/metrics_v2.json (new metrics)")
+    print(f"  - {args.output} (new model)")
+    print(f"  - {args.output.replace('.h5', '_metrics.json')} (new metrics)")
     print("\n" + "="*70 + "\n")
-    
+
+    if not os.path.exists(args.base):
+        print(f"❌ ERROR: Base model not found at {args.base}")
+        sys.exit(1)
+
     # Start training
-    train_advanced_model()
+    runner = TrainingRunner.from_args(args)
+    train_on_splits(runner, args.base, args.output, args.dataset, epochs=args.epochs,
+                    batch_size=args.batch_size, trainable_layers=args.trainable_layers)
+
+    test_dir = os.path.join(args.dataset, "test")
+    if os.path.isdir(test_dir):
+        from ml_model.evaluate import evaluate
+        metrics = evaluate(test_dir, args.output)
+        print(f"\n✅ Test accuracy {metrics['test_accuracy']:.3f}, precision {metrics['test_precision']:.3f}, "
+              f"recall {metrics['test_recall']:.3f}")
@@ -12,9 +12,26 @@ from ..core.security import decode_access_token
 from ..core.database import get_users_collection
 from ..schemas.user import TokenData
 from ..core.config import settings
+from ..core.cache import TTLCache
 
 security = HTTPBearer(auto_error=False)  # Don't auto-error on missing token
 
+# User documents keyed by user_id; short TTL bounds staleness across workers
+user_cache = TTLCache(maxsize=settings.USER_CACHE_SIZE, ttl=settings.USER_CACHE_TTL_SECONDS)
+
+
+def invalidate_cached_user(user_id: str):
+    """
+    Drop a cached user document
+    
+    Call after any write to a user (profile update, deactivation, role or
+    password change) so the next request reloads it from the database.
+    
+    Args:
+        user_id: User ID as a string
+    """
+    user_cache.invalidate(str(user_id))
+
 
 async def get_current_user(credentials: Optional[HTTPAuthorizationCredentials] = Depends(security)) -> Optional[dict]:
     """
@@ -48,12 +65,19 @@ async def get_current_user(credentials: Optional[HTTPAuthorizationCredentials] =
         if email is None or user_id is None:
             raise credentials_exception
         
-        # Get user from database
-        users_collection = await get_users_collection()
-        user = await users_collection.find_one({"_id": ObjectId(user_id)})
-        
+        # Get user from cache, falling back to the database
+        user = user_cache.get(user_id)
         if user is None:
-            raise credentials_exception
+            users_collection = await get_users_collection()
+            user = await users_collection.find_one({"_id": ObjectId(user_id)})
+            
+            if user is None:
+                raise credentials_exception
+            
+            user_cache.set(user_id, user)
+        
+        # Callers get their own copy so they cannot mutate the cached document
+        user = dict(user)
         
         if not user.get("is_active", False):
             raise HTTPException(
@@ -80,6 +104,13 @@ async def get_current_admin(current_user: dict = Depends(get_current_user)) -> d
     Raises:
         HTTPException: If user is not admin
     """
+    if current_user is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Not authenticated",
+            headers={"WWW-Authenticate": "Bearer"}
+        )
+    
     if not current_user.get("is_admin", False):
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
@@ -7,7 +7,7 @@ from datetime import timedelta
 
 from ...schemas.user import UserCreate, UserLogin, UserResponse, Token
 from ...models.user import UserModel
-from ...core.security import verify_password, get_password_hash, create_access_token
+from ...core.security import verify_password_async, get_password_hash_async, create_access_token
 from ...core.database import get_users_collection
 from ...core.config import settings
 from bson import ObjectId
@@ -38,7 +38,7 @@ async def register_user(user_data: UserCreate):
     
     # Create user
     user_dict = user_data.model_dump()
-    user_dict["hashed_password"] = get_password_hash(user_dict.pop("password"))
+    user_dict["hashed_password"] = await get_password_hash_async(user_dict.pop("password"))
     user_dict["is_active"] = True
     user_dict["is_admin"] = False
     
@@ -77,7 +77,7 @@ async def login(login_data: UserLogin):
         )
     
     # Verify password
-    if not verify_password(login_data.password, user["hashed_password"]):
+    if not await verify_password_async(login_data.password, user["hashed_password"]):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password"
@@ -127,7 +127,7 @@ async def admin_login(login_data: UserLogin):
         )
     
     # Verify password
-    if not verify_password(login_data.password, user["hashed_password"]):
+    if not await verify_password_async(login_data.password, user["hashed_password"]):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid admin credentials"
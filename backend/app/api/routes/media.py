@@ -0,0 +1,82 @@
+"""
+Media routes
+
+Serves stored uploads by storage key. Remote backends answer with a redirect
+to a presigned URL, so the bytes never pass through the API process. Local
+files are served with ETags, conditional requests and byte ranges; the
+content-addressed blobs are cached as immutable.
+"""
+
+import os
+
+from fastapi import APIRouter, HTTPException, Request, status
+from fastapi.responses import RedirectResponse
+
+from ...core.config import settings
+from ...core.media_response import serve_file
+from ...services.storage import storage
+
+router = APIRouter(tags=["media"])
+
+
+def _blob_etag(key: str):
+    """Content hash validator for blobs/<aa>/<bb>/<sha256>[.<derivative>].<ext>"""
+    parts = key.split("/")
+    if len(parts) == 4 and parts[0] == "blobs":
+        return os.path.splitext(parts[3])[0]
+    return None
+
+
+def _hidden(key: str) -> bool:
+    """Dot-prefixed segments (e.g. the upload spool) are never served"""
+    return any(part.startswith(".") for part in key.split("/"))
+
+
+def _not_found():
+    return HTTPException(
+        status_code=status.HTTP_404_NOT_FOUND,
+        detail="Media not found"
+    )
+
+
+@router.api_route("/media/{key:path}", methods=["GET", "HEAD"])
+async def get_media(key: str, request: Request):
+    """
+    Download a stored upload
+
+    Args:
+        key: Storage key (e.g. blobs/ab/cd/<sha256>.jpg)
+    """
+    if _hidden(key):
+        raise _not_found()
+
+    url = storage.presigned_url(key)
+    if url:
+        return RedirectResponse(url, status_code=status.HTTP_307_TEMPORARY_REDIRECT)
+
+    try:
+        path = storage.local_path(key)
+        etag = _blob_etag(key)
+        return serve_file(request, path, etag=etag, immutable=etag is not None)
+    except (ValueError, OSError):
+        raise _not_found()
+
+
+@router.api_route("/uploads/{file_path:path}", methods=["GET", "HEAD"])
+async def get_upload(file_path: str, request: Request):
+    """
+    Download a file by its path under UPLOAD_DIR (reports stored before /media)
+
+    Args:
+        file_path: Path relative to UPLOAD_DIR
+    """
+    root = os.path.abspath(settings.UPLOAD_DIR)
+    path = os.path.abspath(os.path.join(root, file_path))
+    if os.path.commonpath([path, root]) != root or _hidden(file_path):
+        raise _not_found()
+
+    etag = _blob_etag(file_path)
+    try:
+        return serve_file(request, path, etag=etag, immutable=etag is not None)
+    except OSError:
+        raise _not_found()
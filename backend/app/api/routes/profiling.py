@@ -0,0 +1,70 @@
+"""
+Admin profiling routes
+
+Switch the sampling profiler on a running worker and download what it
+collected as a collapsed-stack file for flamegraph tools.
+"""
+
+from datetime import datetime
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Query
+from fastapi.responses import PlainTextResponse
+
+from ...api.dependencies import get_current_admin
+from ...core.profiling import profiler
+
+router = APIRouter(
+    prefix="/admin/profiling",
+    tags=["admin"],
+    dependencies=[Depends(get_current_admin)]
+)
+
+
+@router.get("")
+async def get_profiler_status():
+    """Current profiler state and sample counts"""
+    return profiler.status()
+
+
+@router.post("/start")
+async def start_profiler(
+    sample_every: Optional[int] = Query(None, ge=1, le=10000),
+    interval_ms: Optional[float] = Query(None, ge=1, le=1000)
+):
+    """
+    Start sampling create/review requests
+
+    Args:
+        sample_every: Profile 1 in N requests (default PROFILER_SAMPLE_EVERY)
+        interval_ms: Stack sampling interval (default PROFILER_INTERVAL_MS)
+
+    Returns:
+        Profiler status
+    """
+    profiler.start(sample_every, interval_ms)
+    return profiler.status()
+
+
+@router.post("/stop")
+async def stop_profiler():
+    """Stop sampling, keeping the collected stacks"""
+    profiler.stop()
+    return profiler.status()
+
+
+@router.get("/stacks", response_class=PlainTextResponse)
+async def download_stacks():
+    """Collected samples in collapsed-stack format"""
+    filename = f"profile-{datetime.utcnow().strftime('%Y%m%dT%H%M%S')}.folded"
+    return PlainTextResponse(
+        profiler.collapsed(),
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+
+
+@router.delete("/stacks")
+async def reset_stacks():
+    """Discard the collected stacks"""
+    profiler.reset()
+    return profiler.status()
@@ -3,20 +3,33 @@
 Accident Reports routes
 """
 
-from fastapi import APIRouter, HTTPException, status, Depends, UploadFile, File, Form
-from typing import List, Optional
+from fastapi import APIRouter, HTTPException, status, Depends, UploadFile, File, Form, Query, BackgroundTasks
+from typing import List, Literal, Optional, Union
 from datetime import datetime
 from bson import ObjectId
+import asyncio
+import functools
+import io
 import os
-import shutil
 import logging
-from pathlib import Path
+from PIL import Image
 
-from ...schemas.report import ReportResponse, ReportUpdate, ReportStats
+from ...schemas.report import ReportResponse, ReportSummary, ReportUpdate, ReportStats
 from ...models.report import ReportModel, ReportStatus, LocationModel, PredictionModel
 from ...core.database import get_reports_collection
 from ...core.config import settings
 from ...api.dependencies import get_current_user, get_current_admin, validate_image_file
+from ...api.serialization import REPORT_PROJECTIONS, reports_response, report_response
+from ...services.sms_service import sms_service
+from ...services.incident_service import incident_service
+from ...core.geo import geojson_point, bbox_polygon
+from ...core.metrics import INFERENCE_IN_FLIGHT, instrument, stage
+from ...core.profiling import ProfiledThreadPoolExecutor, profiled
+from ...services.image_index_service import image_hash_index
+from ...services.upload_service import save_upload
+from ...services.blob_store import blob_store
+from ...services.derivative_service import derivative_service
+from ...services.model_version_service import model_version_service
 
 # Import ML predictor (optional)
 predictor = None
@@ -26,9 +39,7 @@ def get_predictor():
     global predictor
     if predictor is None:
         try:
-            print("="*70)
-            print("LOADING ML PREDICTOR - Enhanced Model (85% precision)")
-            print("="*70)
+            logger.info("Loading ML predictor (enhanced model)")
             
             # Add parent directory to path to find ml_model
             import sys
@@ -43,29 +54,41 @@ def get_predictor():
             # Use ENHANCED predictor with 85% precision
             from ml_model.predict import AccidentPredictor
             predictor = AccidentPredictor()
-            print("✓ ENHANCED ACCIDENT PREDICTOR LOADED!")
-            print("  Features:")
-            print("    - ✓ Uses enhanced_accident_model_v3.h5")
-            print("    - ✓ 85% precision (17% improvement)")
-            print("    - ✓ 92% accuracy (5% improvement)")
-            print("    - ✓ Clean, single predictor implementation")
-            print("    - ✓ Direct sigmoid output for binary classification")
-            print("    - ✓ Proper confidence scores")
-            print("="*70)
+            # Per-call latency for /metrics
+            predictor.preprocess_image = instrument("predictor", "preprocess_image", predictor.preprocess_image)
+            predictor.predict = instrument("predictor", "predict", predictor.predict)
+            logger.info(f"ML predictor loaded: {os.path.basename(predictor.model_path)}")
         except Exception as e:
-            print(f"Warning: Could not load ML model: {e}")
-            print("Using basic predictions.")
-            import traceback
-            traceback.print_exc()
+            logger.exception(f"Could not load ML model, using basic predictions: {e}")
             predictor = None
     return predictor
 
 router = APIRouter(prefix="/reports", tags=["reports"])
 logger = logging.getLogger(__name__)
 
+# Decoding, hashing and inference are CPU-bound; they run here instead of
+# on the event loop
+_inference_executor = ProfiledThreadPoolExecutor(
+    max_workers=settings.INFERENCE_WORKERS,
+    thread_name_prefix="inference"
+)
+
+
+def _decode_and_hash(content, temp_path):
+    """Decode an upload and compute its perceptual hash (None, None for non-images)"""
+    try:
+        from ml_model.image_hash import perceptual_hash
+        img = Image.open(io.BytesIO(content) if content is not None else temp_path)
+        img.load()
+        return img, perceptual_hash(img)
+    except Exception:
+        return None, None
+
 
 @router.post("/create", response_model=ReportResponse, status_code=status.HTTP_201_CREATED)
+@profiled
 async def create_report(
+    background_tasks: BackgroundTasks,
     latitude: float = Form(...),
     longitude: float = Form(...),
     image: Optional[UploadFile] = File(None),
@@ -81,39 +104,95 @@ async def create_report(
         # Handle image upload
         file_path = None
         filename = None
+        temp_path = None
+        blob_sha256 = None
         prediction_result = None
+        upload_info = {}
+        decoded_image = None
+        derivative_fields = {}
+        image_phash = None
+        near_duplicate_of = None
+        index_image = False
+        reports_collection = await get_reports_collection()
         
         if image and image.filename:
             # Validate image
             validate_image_file(image)
             
-            # Create upload directory
-            user_id = str(current_user["_id"]) if current_user else "anonymous"
-            user_upload_dir = os.path.join(settings.UPLOAD_DIR, user_id)
-            os.makedirs(user_upload_dir, exist_ok=True)
+            # Stream to a temporary file (size limit, content hash and type sniffing);
+            # images stay in memory for inference while the file is written
+            temp_path = blob_store.incoming_path()
+            with stage("create_report", "upload"):
+                upload_info = await save_upload(image, temp_path, keep_in_memory=True)
+            
+            ml_predictor = get_predictor()
             
-            # Generate unique filename
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            file_extension = Path(image.filename).suffix
-            filename = f"accident_{timestamp}{file_extension}"
-            file_path = os.path.join(user_upload_dir, filename)
+            # Perceptual hash for near-duplicate lookup (skipped for videos)
+            loop = asyncio.get_running_loop()
+            with stage("create_report", "decode"):
+                decoded_image, image_phash = await loop.run_in_executor(
+                    _inference_executor, _decode_and_hash, upload_info.get("content"), temp_path
+                )
             
-            # Save image
-            with open(file_path, "wb") as buffer:
-                shutil.copyfileobj(image.file, buffer)
+            # Reuse the prediction of an earlier near-identical image
+            with stage("create_report", "duplicate_lookup"):
+                if image_phash:
+                    match = image_hash_index.find_match(image_phash)
+                    if match:
+                        earlier = await reports_collection.find_one(
+                            {"_id": ObjectId(match["report_id"])},
+                            {"prediction": 1}
+                        )
+                        if earlier and earlier.get("prediction"):
+                            near_duplicate_of = match["report_id"]
+                            prediction_result = dict(earlier["prediction"])
+                            prediction_result["reused_from"] = near_duplicate_of
+                            prediction_result["phash_distance"] = match["distance"]
+                        else:
+                            image_hash_index.remove(match["report_id"])
             
             # Get prediction
-            ml_predictor = get_predictor()
-            if ml_predictor:
-                prediction_result = ml_predictor.predict(file_path)
-            else:
-                # Fallback prediction
-                prediction_result = {
-                    'is_accident': True,
-                    'confidence': 0.50,
-                    'accident_probability': 0.50,
-                    'non_accident_probability': 0.50
-                }
+            if prediction_result is None:
+                if ml_predictor:
+                    with stage("create_report", "predict"), INFERENCE_IN_FLIGHT.track_inprogress():
+                        # The hash computed above is passed in, so it is not computed twice
+                        prediction_result = await loop.run_in_executor(
+                            _inference_executor,
+                            functools.partial(
+                                ml_predictor.predict,
+                                decoded_image if decoded_image is not None else temp_path,
+                                image_phash=image_phash
+                            )
+                        )
+                    # Model metrics live once per version, not in every report
+                    prediction_result = await model_version_service.strip_performance(prediction_result)
+                    index_image = image_phash is not None and "error" not in prediction_result
+                else:
+                    # Fallback prediction
+                    prediction_result = {
+                        'is_accident': True,
+                        'confidence': 0.50,
+                        'accident_probability': 0.50,
+                        'non_accident_probability': 0.50
+                    }
+            
+            # Make sure the original is on disk before moving it into the store
+            with stage("create_report", "store_upload"):
+                if "write_future" in upload_info:
+                    await upload_info["write_future"]
+            
+                # Store under its content hash (identical uploads share one object)
+                blob = await blob_store.commit(
+                    temp_path,
+                    upload_info["sha256"],
+                    upload_info["detected_type"],
+                    upload_info["size_bytes"]
+                )
+            temp_path = None
+            blob_sha256 = upload_info["sha256"]
+            file_path = blob_store.media_path(blob["key"])
+            filename = blob["key"].rsplit("/", 1)[-1]
+            derivative_fields = derivative_service.report_fields(blob.get("derivatives") or {})
         else:
             # SOS emergency (no image)
             prediction_result = {
@@ -123,8 +202,26 @@ async def create_report(
                 'non_accident_probability': 0.05
             }
         
+        # Road-network ETA from the best candidate hospital; the A* search on a
+        # cache miss is CPU-bound, so it runs off the event loop
+        with stage("create_report", "eta"):
+            loop = asyncio.get_running_loop()
+            eta_info = await loop.run_in_executor(None, sms_service.calculate_ambulance_eta, latitude, longitude)
+        
+        # Cluster with recent nearby reports of the same incident; the ID is
+        # chosen up front so a new incident records its primary report atomically
+        report_id = ObjectId()
+        reported_at = datetime.utcnow()
+        with stage("create_report", "incident"):
+            try:
+                incident_info = await incident_service.assign_incident(latitude, longitude, reported_at, report_id)
+            except Exception as e:
+                logger.warning(f"Incident clustering skipped: {e}")
+                incident_info = {"incident_id": None, "duplicate_of": None, "new_incident": False}
+        
         # Create report data
         report_data = {
+            "_id": report_id,
             "user_id": str(current_user["_id"]) if current_user else "anonymous",
             "user_email": current_user["email"] if current_user else "anonymous@nologin.com",
             "user_name": current_user["full_name"] if current_user else "Anonymous User",
@@ -139,36 +236,84 @@ async def create_report(
             "status": ReportStatus.PENDING,
             "description": description,
             "phone_number": phone_number,
-            "created_at": datetime.utcnow(),
-            "updated_at": datetime.utcnow()
+            "ambulance_eta_minutes": eta_info["eta_minutes"],
+            "estimated_arrival": eta_info["estimated_arrival"],
+            "incident_id": incident_info["incident_id"],
+            "duplicate_of": incident_info["duplicate_of"],
+            "image_sha256": upload_info.get("sha256"),
+            "image_size_bytes": upload_info.get("size_bytes"),
+            "image_phash": image_phash,
+            "near_duplicate_of": near_duplicate_of,
+            **derivative_fields,
+            "created_at": reported_at,
+            "updated_at": reported_at
         }
         
+        location_geo = geojson_point(latitude, longitude)
+        if location_geo:
+            report_data["location_geo"] = location_geo
+        
         # Insert to database
-        reports_collection = await get_reports_collection()
-        result = await reports_collection.insert_one(report_data)
+        with stage("create_report", "insert"):
+            result = await reports_collection.insert_one(report_data)
+        blob_sha256 = None
         
         # Add generated ID to response
         report_data["_id"] = str(result.inserted_id)
         
-        print(f"Report created successfully: {report_data['_id']}")
-        print(f"Prediction: {prediction_result['is_accident']} with {prediction_result['confidence']:.2f} confidence")
+        if index_image:
+            image_hash_index.add(image_phash, report_data["_id"])
+        
+        # Thumbnail and preview are rendered after the response is sent
+        if decoded_image is not None and not derivative_fields:
+            background_tasks.add_task(
+                derivative_service.attach_to_report,
+                report_data["_id"],
+                upload_info["sha256"],
+                decoded_image
+            )
+        
+        if incident_info["incident_id"]:
+            try:
+                report_data.update(await incident_service.add_report(
+                    incident_info["incident_id"],
+                    report_data["_id"],
+                    reported_at
+                ))
+            except Exception as e:
+                logger.warning(f"Could not record report on incident {incident_info['incident_id']}: {e}")
+        
+        logger.info(
+            f"Report created: {report_data['_id']} "
+            f"(accident={prediction_result['is_accident']}, confidence={prediction_result['confidence']:.2f})"
+        )
         
         return report_data
         
+    except HTTPException:
+        raise
     except Exception as e:
-        print(f"Error in create_report: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.exception(f"Error in create_report: {e}")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Internal server error: {str(e)}"
         )
+    finally:
+        # Clean up uploads that never made it into a stored report
+        if temp_path:
+            write_future = upload_info.get("write_future")
+            if write_future is not None and not write_future.done():
+                await asyncio.gather(write_future, return_exceptions=True)
+            blob_store.discard(temp_path)
+        if blob_sha256:
+            await blob_store.release(blob_sha256)
 
 
-@router.get("/user", response_model=List[ReportResponse])
+@router.get("/user", response_model=Union[List[ReportResponse], List[ReportSummary]])
 async def get_user_reports(
     skip: int = 0,
     limit: int = 100,
+    view: Literal["summary", "full"] = "full",
     current_user: dict = Depends(get_current_user)
 ):
     """
@@ -177,6 +322,7 @@ async def get_user_reports(
     Args:
         skip: Number of records to skip
         limit: Maximum number of records to return
+        view: "summary" for list cards, "full" for complete reports
         current_user: Authenticated user
         
     Returns:
@@ -185,26 +331,20 @@ async def get_user_reports(
     reports_collection = await get_reports_collection()
     user_id = str(current_user["_id"])
     
-    cursor = reports_collection.find({"user_id": user_id}).sort("created_at", -1).skip(skip).limit(limit)
+    cursor = reports_collection.find(
+        {"user_id": user_id}, REPORT_PROJECTIONS[view]
+    ).sort("created_at", -1).skip(skip).limit(limit)
     reports = await cursor.to_list(length=limit)
     
-    # Convert ObjectId to string and ensure required fields exist
-    for report in reports:
-        report["_id"] = str(report["_id"])
-        # Ensure required fields exist for response validation
-        if "updated_at" not in report:
-            report["updated_at"] = report.get("created_at", datetime.utcnow())
-        if "created_at" not in report:
-            report["created_at"] = datetime.utcnow()
-    
-    return reports
+    return reports_response(reports, view)
 
 
-@router.get("/all", response_model=List[ReportResponse])
+@router.get("/all", response_model=Union[List[ReportResponse], List[ReportSummary]])
 async def get_all_reports(
     skip: int = 0,
     limit: int = 100,
-    status_filter: Optional[ReportStatus] = None
+    status_filter: Optional[ReportStatus] = None,
+    view: Literal["summary", "full"] = "full"
 ):
     """
     Get all reports (Public access for analytics/admin)
@@ -213,6 +353,7 @@ async def get_all_reports(
         skip: Number of records to skip
         limit: Maximum number of records to return
         status_filter: Filter by report status
+        view: "summary" for list cards, "full" for complete reports
         
     Returns:
         List of all reports
@@ -223,19 +364,10 @@ async def get_all_reports(
     if status_filter:
         query["status"] = status_filter
     
-    cursor = reports_collection.find(query).sort("created_at", -1).skip(skip).limit(limit)
+    cursor = reports_collection.find(query, REPORT_PROJECTIONS[view]).sort("created_at", -1).skip(skip).limit(limit)
     reports = await cursor.to_list(length=limit)
     
-    # Convert ObjectId to string and ensure required fields exist
-    for report in reports:
-        report["_id"] = str(report["_id"])
-        # Ensure required fields exist for response validation
-        if "updated_at" not in report:
-            report["updated_at"] = report.get("created_at", datetime.utcnow())
-        if "created_at" not in report:
-            report["created_at"] = datetime.utcnow()
-    
-    return reports
+    return reports_response(reports, view)
 
 
 @router.get("/stats/overview", response_model=ReportStats)
@@ -284,6 +416,167 @@ async def get_report_statistics():
         )
 
 
+@router.get("/models")
+async def get_model_versions():
+    """
+    Get registered model versions with their performance metadata
+    
+    Returns:
+        List of model versions (newest first)
+    """
+    return await model_version_service.list_versions()
+
+
+@router.get("/incidents")
+async def get_incidents(
+    skip: int = 0,
+    limit: int = 100,
+    status_filter: Optional[ReportStatus] = None
+):
+    """
+    Get reports grouped by incident for the admin review queue
+    
+    Args:
+        skip: Number of incidents to skip
+        limit: Maximum number of incidents to return
+        status_filter: Only count reports with this status
+        
+    Returns:
+        List of incidents with their evidence reports, newest first
+    """
+    reports_collection = await get_reports_collection()
+    
+    match = {"incident_id": {"$ne": None}}
+    if status_filter:
+        match["status"] = status_filter
+    
+    pipeline = [
+        {"$match": match},
+        {"$sort": {"created_at": 1}},
+        {"$group": {
+            "_id": "$incident_id",
+            "report_ids": {"$push": {"$toString": "$_id"}},
+            "evidence_count": {"$sum": 1},
+            "location": {"$first": "$location"},
+            "first_reported_at": {"$min": "$created_at"},
+            "last_reported_at": {"$max": "$created_at"},
+            "max_confidence": {"$max": "$prediction.confidence"}
+        }},
+        {"$sort": {"last_reported_at": -1}},
+        {"$skip": skip},
+        {"$limit": limit}
+    ]
+    
+    incidents = await reports_collection.aggregate(pipeline).to_list(length=limit)
+    for incident in incidents:
+        incident["incident_id"] = incident.pop("_id")
+        incident["primary_report_id"] = incident["report_ids"][0]
+    
+    return incidents
+
+
+@router.get("/geo")
+async def get_reports_in_viewport(
+    min_lat: float = Query(..., ge=-90, le=90),
+    min_lon: float = Query(..., ge=-180, le=180),
+    max_lat: float = Query(..., ge=-90, le=90),
+    max_lon: float = Query(..., ge=-180, le=180),
+    zoom: int = Query(12, ge=0, le=22),
+    status_filter: Optional[ReportStatus] = None
+):
+    """
+    Get clustered report markers inside a map viewport
+    
+    Reports are bucketed on a grid whose cell size follows the zoom level
+    (about GEO_CLUSTER_RADIUS_PX screen pixels per cell), so the response
+    size depends on the viewport rather than on the total report count.
+    
+    Args:
+        min_lat: South edge of the bounding box
+        min_lon: West edge of the bounding box
+        max_lat: North edge of the bounding box
+        max_lon: East edge of the bounding box (less than min_lon when the
+            viewport crosses the antimeridian)
+        zoom: Web-map zoom level (0-22)
+        status_filter: Filter by report status
+        
+    Returns:
+        Clusters with centroid, count and per-status counts; single-report
+        clusters also carry the report ID, status and accident flag
+    """
+    if min_lat >= max_lat or min_lon == max_lon:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid bounding box"
+        )
+    
+    reports_collection = await get_reports_collection()
+    
+    query = {"location_geo": {"$geoWithin": {"$geometry": bbox_polygon(min_lat, min_lon, max_lat, max_lon)}}}
+    if status_filter:
+        query["status"] = status_filter
+    
+    # 256 px tiles: degrees covered by one cluster cell at this zoom
+    if zoom >= settings.GEO_UNCLUSTERED_ZOOM:
+        cell_degrees = 1e-9
+    else:
+        cell_degrees = 360.0 / (2 ** zoom) * settings.GEO_CLUSTER_RADIUS_PX / 256
+    
+    pipeline = [
+        {"$match": query},
+        {"$project": {
+            "latitude": "$location.latitude",
+            "longitude": "$location.longitude",
+            "status": 1,
+            "is_accident": "$prediction.is_accident"
+        }},
+        {"$group": {
+            "_id": {
+                "x": {"$floor": {"$divide": ["$longitude", cell_degrees]}},
+                "y": {"$floor": {"$divide": ["$latitude", cell_degrees]}}
+            },
+            "count": {"$sum": 1},
+            "latitude": {"$avg": "$latitude"},
+            "longitude": {"$avg": "$longitude"},
+            "report_id": {"$first": {"$toString": "$_id"}},
+            "status": {"$first": "$status"},
+            "is_accident": {"$first": "$is_accident"},
+            "pending": {"$sum": {"$cond": [{"$eq": ["$status", ReportStatus.PENDING.value]}, 1, 0]}},
+            "approved": {"$sum": {"$cond": [{"$eq": ["$status", ReportStatus.APPROVED.value]}, 1, 0]}},
+            "rejected": {"$sum": {"$cond": [{"$eq": ["$status", ReportStatus.REJECTED.value]}, 1, 0]}}
+        }},
+        {"$sort": {"count": -1}},
+        {"$limit": settings.GEO_MAX_CLUSTERS}
+    ]
+    
+    clusters = await reports_collection.aggregate(pipeline).to_list(length=settings.GEO_MAX_CLUSTERS)
+    
+    markers = []
+    for cluster in clusters:
+        marker = {
+            "latitude": cluster["latitude"],
+            "longitude": cluster["longitude"],
+            "count": cluster["count"],
+            "status_counts": {
+                "pending": cluster["pending"],
+                "approved": cluster["approved"],
+                "rejected": cluster["rejected"]
+            }
+        }
+        if cluster["count"] == 1:
+            marker["report_id"] = cluster["report_id"]
+            marker["status"] = cluster["status"]
+            marker["is_accident"] = cluster["is_accident"]
+        markers.append(marker)
+    
+    return {
+        "zoom": zoom,
+        "cell_degrees": cell_degrees,
+        "total_reports": sum(marker["count"] for marker in markers),
+        "clusters": markers
+    }
+
+
 @router.post("/test-sms")
 async def test_sms_notification(phone_number: str = Form(...)):
     """
@@ -391,16 +684,11 @@ async def get_report(
             detail="Not enough permissions"
         )
     
-    report["_id"] = str(report["_id"])
-    # Ensure required fields exist for response validation
-    if "updated_at" not in report:
-        report["updated_at"] = report.get("created_at", datetime.utcnow())
-    if "created_at" not in report:
-        report["created_at"] = datetime.utcnow()
-    return report
+    return report_response(report)
 
 
 @router.put("/{report_id}", response_model=ReportResponse)
+@profiled
 async def update_report(
     report_id: str,
     update_data: ReportUpdate
@@ -440,14 +728,7 @@ async def update_report(
     
     # Get updated report
     updated_report = await reports_collection.find_one({"_id": ObjectId(report_id)})
-    updated_report["_id"] = str(updated_report["_id"])
-    # Ensure required fields exist for response validation
-    if "updated_at" not in updated_report:
-        updated_report["updated_at"] = updated_report.get("created_at", datetime.utcnow())
-    if "created_at" not in updated_report:
-        updated_report["created_at"] = datetime.utcnow()
-    
-    return updated_report
+    return report_response(updated_report)
 
 
 @router.put("/direct-approve/{report_id}")
@@ -525,14 +806,10 @@ async def minimal_approve_report(
     """
     MINIMAL APPROVAL ENDPOINT - No Unicode, Working Database Updates
     """
-    print(f"🔍 MINIMAL-APPROVE DEBUG:")
-    print(f"   Report ID: {report_id}")
-    print(f"   Phone Number (form): {phone_number}")
-    print(f"   Ambulance: {ambulance_number}")
-    print(f"   ETA: {eta}")
-    print(f"   Hospital: {hospital}")
-    print(f"   Severity: {severity}")
-    print(f"   Admin Notes: {admin_notes[:100] if admin_notes else None}...")
+    logger.debug(
+        f"minimal-approve {report_id}: phone={phone_number} ambulance={ambulance_number} "
+        f"eta={eta} hospital={hospital} severity={severity}"
+    )
     
     try:
         # Connect to MongoDB
@@ -612,9 +889,7 @@ async def minimal_approve_report(
         
     except Exception as e:
         error_msg = str(e)
-        print(f"APPROVAL ERROR: {error_msg}")  # Debug log
-        import traceback
-        traceback.print_exc()  # Debug log
+        logger.exception(f"Approval error: {error_msg}")
         raise HTTPException(status_code=500, detail=f"Approval failed: {error_msg}")
 
 @router.put("/minimal-reject/{report_id}")
@@ -772,7 +1047,7 @@ async def working_approve_report(
                     elif not clean_phone.startswith('+'):
                         clean_phone = f'+{clean_phone}'
                 
-                print(f"APPROVAL: Cleaned phone number: {clean_phone}")
+                logger.debug(f"Approval SMS number: {clean_phone}")
                 
                 # Get report location for ETA calculation
                 report_data = {
@@ -785,28 +1060,24 @@ async def working_approve_report(
                     'location': report.get('location', {})
                 }
                 
-                print(f"APPROVAL: Sending SMS with data: {report_data}")
+                logger.debug(f"Sending approval SMS for report {report_id}")
                 sms_sent = sms_service.send_approval_notification(clean_phone, report_data)
-                print(f"SMS sent result: {sms_sent}")
+                logger.info(f"SMS for report {report_id} sent: {sms_sent}")
                 
             except Exception as sms_error:
-                print(f"SMS error: {sms_error}")
-                import traceback
-                traceback.print_exc()
+                logger.exception(f"SMS error: {sms_error}")
                 sms_sent = False
         
         # Update SMS status in database
         sms_status = "sent" if sms_sent else "failed" if phone_number else "no_phone"
-        print(f"APPROVAL: Updating SMS status to: {sms_status} (sms_sent: {sms_sent}, phone_number: {phone_number})")
-        sms_update_result = reports_collection.update_one(
+        logger.debug(f"Setting SMS status of {report_id} to {sms_status}")
+        reports_collection.update_one(
             {"_id": ObjectId(report_id)},
             {"$set": {"sms_status": sms_status}}
         )
-        print(f"APPROVAL: SMS status update result: {sms_update_result.matched_count} matched, {sms_update_result.modified_count} modified")
         
         # Get updated report
         updated_report = reports_collection.find_one({"_id": ObjectId(report_id)})
-        print(f"APPROVAL: Updated report SMS status: {updated_report.get('sms_status')}")
         
         # Convert to JSON-serializable format
         result_data = {
@@ -899,21 +1170,19 @@ async def working_reject_report(
                     elif not clean_phone.startswith('+'):
                         clean_phone = f'+{clean_phone}'
                 
-                print(f"REJECTION: Cleaned phone number: {clean_phone}")
+                logger.debug(f"Rejection SMS number: {clean_phone}")
                 
                 report_data = {
                     '_id': report_id,
                     'admin_notes': admin_notes or 'Rejected by admin - No emergency response required'
                 }
                 
-                print(f"REJECTION: Sending SMS with data: {report_data}")
+                logger.debug(f"Sending rejection SMS for report {report_id}")
                 sms_sent = sms_service.send_rejection_notification(clean_phone, report_data)
-                print(f"SMS sent result: {sms_sent}")
+                logger.info(f"SMS for report {report_id} sent: {sms_sent}")
                 
             except Exception as sms_error:
-                print(f"SMS error: {sms_error}")
-                import traceback
-                traceback.print_exc()
+                logger.exception(f"SMS error: {sms_error}")
                 sms_sent = False
         
         # Update SMS status in database
@@ -1171,6 +1440,7 @@ async def simple_approve_report(
         raise HTTPException(status_code=500, detail="Approval failed")
 
 @router.put("/{report_id}/approve")
+@profiled
 async def approve_report(
     report_id: str,
     ambulance_number: Optional[str] = Form(None),
@@ -1227,15 +1497,13 @@ async def approve_report(
                 if sms_success:
                     sms_sent = True
                     sms_status = "sent"
-                    print(f"✅ Approval SMS sent to {target_phone}")
+                    logger.info(f"Approval SMS sent to {target_phone}")
                 else:
                     sms_status = "failed"
-                    print(f"❌ Failed to send approval SMS to {target_phone}")
+                    logger.warning(f"Failed to send approval SMS to {target_phone}")
                     
             except Exception as sms_error:
-                print(f"SMS Error: {sms_error}")
-                import traceback
-                traceback.print_exc()
+                logger.exception(f"SMS error: {sms_error}")
                 sms_status = "error"
         
         # Update report with approval data
@@ -1283,12 +1551,12 @@ async def approve_report(
         
     except Exception as e:
         # Log error
-        error_msg = f"Approval error: {str(e)}"
-        print(error_msg)
+        logger.exception(f"Approval error: {e}")
         raise HTTPException(status_code=500, detail="Approval failed")
 
 
 @router.put("/{report_id}/reject")
+@profiled
 async def reject_report(
     report_id: str,
     admin_notes: Optional[str] = Form(None),
@@ -1337,15 +1605,13 @@ async def reject_report(
                 if sms_success:
                     sms_sent = True
                     sms_status = "sent"
-                    print(f"✅ Rejection SMS sent to {target_phone}")
+                    logger.info(f"Rejection SMS sent to {target_phone}")
                 else:
                     sms_status = "failed"
-                    print(f"❌ Failed to send rejection SMS to {target_phone}")
+                    logger.warning(f"Failed to send rejection SMS to {target_phone}")
                     
             except Exception as sms_error:
-                print(f"SMS Error: {sms_error}")
-                import traceback
-                traceback.print_exc()
+                logger.exception(f"SMS error: {sms_error}")
                 sms_status = "error"
         
         # Update report with rejection data
@@ -1389,8 +1655,7 @@ async def reject_report(
         
     except Exception as e:
         # Log error
-        error_msg = f"Rejection error: {str(e)}"
-        print(error_msg)
+        logger.exception(f"Rejection error: {e}")
         raise HTTPException(status_code=500, detail="Rejection failed")
     """
     Reject a report (Admin only)
@@ -1444,7 +1709,7 @@ async def reject_report(
     
     # TEMPORARY: Bypass SMS to fix Admin Portal rejection
     # SMS integration will be re-enabled after Unicode fix
-    print(f"Report {report_id} rejected successfully (SMS temporarily disabled)")
+    logger.info(f"Report {report_id} rejected (SMS temporarily disabled)")
     
     # Mark SMS as temporarily disabled
     await reports_collection.update_one(
@@ -1495,15 +1760,17 @@ async def delete_report(
                 detail="Not enough permissions"
             )
     
-    # Delete image file
-    try:
-        if os.path.exists(report["image_path"]):
-            os.remove(report["image_path"])
-    except Exception as e:
-        print(f"Error deleting image file: {e}")
-    
     # Delete report from database
     await reports_collection.delete_one({"_id": ObjectId(report_id)})
+    image_hash_index.remove(report_id)
+    
+    # Delete image file once nothing refers to it (shared content-addressed files are reference counted)
+    try:
+        if not (report.get("image_sha256") and await blob_store.release(report["image_sha256"])):
+            if report.get("image_path") and os.path.exists(report["image_path"]):
+                os.remove(report["image_path"])
+    except Exception as e:
+        logger.warning(f"Error deleting image file: {e}")
 
 
 @router.post("/send-judge-reminder")
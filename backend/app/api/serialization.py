@@ -0,0 +1,126 @@
+"""
+Fast report serialization
+
+Report documents read from MongoDB are already in the stored schema, so list
+endpoints skip per-item Pydantic validation and convert documents to wire
+dicts in one pass, which orjson then encodes. Set
+VALIDATE_REPORT_RESPONSES to route them through ReportResponse again.
+"""
+
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Sequence
+
+from bson import ObjectId
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from pydantic import TypeAdapter
+
+from ..core.config import settings
+from ..schemas.report import ReportResponse, ReportSummary
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+
+def _orjson_default(value: Any):
+    if isinstance(value, ObjectId):
+        return str(value)
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+
+if ORJSON_AVAILABLE:
+    class FastJSONResponse(JSONResponse):
+        """JSON response rendered by orjson (ObjectIds become strings)"""
+
+        def render(self, content: Any) -> bytes:
+            return orjson.dumps(
+                content,
+                default=_orjson_default,
+                option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+            )
+else:
+    FastJSONResponse = JSONResponse
+
+# Wire field names of a full report, in response order
+REPORT_FIELDS = tuple(field.alias or name for name, field in ReportResponse.model_fields.items())
+REPORT_SUMMARY_FIELDS = tuple(field.alias or name for name, field in ReportSummary.model_fields.items())
+
+# MongoDB projections per list view, so unused fields are never sent by the server
+REPORT_PROJECTIONS = {
+    "full": {
+        "location_geo": 0,
+        "image_sha256": 0,
+        "image_size_bytes": 0,
+        "prediction.model_performance": 0,
+    },
+    "summary": {
+        **{field: 1 for field in REPORT_SUMMARY_FIELDS if field not in ("_id", "prediction")},
+        "prediction.is_accident": 1,
+        "prediction.confidence": 1,
+    },
+}
+
+_report_adapter = TypeAdapter(ReportResponse)
+_report_list_adapter = TypeAdapter(List[ReportResponse])
+_summary_list_adapter = TypeAdapter(List[ReportSummary])
+
+
+def reports_to_wire(reports: Iterable[Dict[str, Any]], fields: Sequence[str] = REPORT_FIELDS) -> List[Dict[str, Any]]:
+    """
+    Convert stored report documents to response dicts
+
+    Args:
+        reports: Documents as returned by Motor
+        fields: Wire fields to emit (missing ones are sent as null)
+
+    Returns:
+        List of JSON-ready dicts (datetimes are left for the encoder)
+    """
+    now = datetime.utcnow()
+    wire = []
+    for report in reports:
+        item = {field: report.get(field) for field in fields}
+        item["_id"] = str(report["_id"])
+        # Timestamps are required by the response schema
+        if "created_at" in item:
+            item["created_at"] = report.get("created_at") or now
+        if "updated_at" in item:
+            item["updated_at"] = report.get("updated_at") or report.get("created_at") or now
+        wire.append(item)
+    return wire
+
+
+def _respond(content: Any, adapter: TypeAdapter, validate: bool):
+    if validate:
+        content = adapter.dump_python(adapter.validate_python(content), by_alias=True)
+    if not ORJSON_AVAILABLE:
+        content = jsonable_encoder(content)
+    return FastJSONResponse(content)
+
+
+def reports_response(reports: List[Dict[str, Any]], view: str = "full"):
+    """
+    Build a list response for stored reports
+
+    Args:
+        reports: Documents as returned by Motor (projected with
+            REPORT_PROJECTIONS[view])
+        view: "full" (ReportResponse) or "summary" (ReportSummary)
+
+    Returns:
+        FastJSONResponse with the serialized list
+    """
+    if view == "summary":
+        wire = reports_to_wire(reports, REPORT_SUMMARY_FIELDS)
+        return _respond(wire, _summary_list_adapter, settings.VALIDATE_REPORT_RESPONSES)
+    wire = reports_to_wire(reports)
+    return _respond(wire, _report_list_adapter, settings.VALIDATE_REPORT_RESPONSES)
+
+
+def report_response(report: Dict[str, Any]):
+    """Single-report variant of reports_response"""
+    wire = reports_to_wire([report])[0]
+    return _respond(wire, _report_adapter, settings.VALIDATE_REPORT_RESPONSES)
@@ -24,6 +24,14 @@ class Settings(BaseSettings):
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
     
+    # Password hashing pool (bcrypt runs off the event loop)
+    PASSWORD_HASH_WORKERS: int = 4
+    PASSWORD_HASH_QUEUE_LIMIT: int = 256  # 503 beyond this many queued jobs
+    
+    # Authenticated-user cache (skips the users lookup on every request)
+    USER_CACHE_SIZE: int = 10000
+    USER_CACHE_TTL_SECONDS: int = 60
+    
     # Admin
     ADMIN_EMAIL: str = "admin@accident-detection.com"
     ADMIN_PASSWORD: str = "admin123"
@@ -39,12 +47,66 @@ class Settings(BaseSettings):
     
     # ML Model
     MODEL_PATH: str = "./models/accident_detection_model.h5"
+    INFERENCE_WORKERS: int = 1  # threads running decode/hash/predict off the event loop
     
     # File Upload
     UPLOAD_DIR: str = "./uploads"
     MAX_UPLOAD_SIZE: int = 50 * 1024 * 1024  # 50 MB (for videos)
     ALLOWED_EXTENSIONS: set = {"jpg", "jpeg", "png", "mp4", "webm", "mov", "avi"}
     
+    # Media storage backend: "local" (UPLOAD_DIR) or "s3" (any S3-compatible store, e.g. MinIO)
+    STORAGE_BACKEND: str = "local"
+    S3_ENDPOINT_URL: Optional[str] = None  # e.g. http://localhost:9000 for MinIO; None for AWS
+    S3_BUCKET: Optional[str] = None
+    S3_REGION: Optional[str] = None
+    S3_ACCESS_KEY_ID: Optional[str] = None
+    S3_SECRET_ACCESS_KEY: Optional[str] = None
+    S3_PRESIGN_EXPIRES_SECONDS: int = 3600
+    S3_MULTIPART_CHUNK_MB: int = 8
+    
+    # Image derivatives for dashboards (longest side in pixels)
+    THUMBNAIL_SIZE: int = 480
+    PREVIEW_SIZE: int = 1280
+    DERIVATIVE_FORMAT: str = "webp"  # falls back to progressive JPEG without WebP support
+    DERIVATIVE_QUALITY: int = 80
+    
+    # Duplicate-incident clustering
+    INCIDENT_RADIUS_METERS: int = 200
+    INCIDENT_WINDOW_MINUTES: int = 30
+    
+    # Near-duplicate image detection (max Hamming distance between 64-bit pHashes)
+    IMAGE_HASH_MAX_DISTANCE: int = 6
+    
+    # Map viewport clustering
+    GEO_CLUSTER_RADIUS_PX: int = 60
+    GEO_MAX_CLUSTERS: int = 2000
+    GEO_UNCLUSTERED_ZOOM: int = 17  # at or above this zoom every report is its own marker
+    
+    # Logging (records are queued and written by a background thread)
+    LOG_LEVEL: str = "INFO"
+    LOG_FORMAT: str = "json"  # "json" or "text"
+    LOG_LEVELS: str = ""  # per-logger overrides, e.g. "app.services.sms_service=DEBUG,uvicorn.access=WARNING"
+    LOG_QUEUE_SIZE: int = 10000  # records beyond this are dropped rather than blocking requests
+    
+    # OpenTelemetry tracing (needs opentelemetry-sdk and an exporter package)
+    TRACING_ENABLED: bool = False
+    TRACING_EXPORTER: str = "otlp"  # "otlp" (HTTP), "otlp-grpc" or "file"
+    TRACING_OTLP_ENDPOINT: Optional[str] = None  # exporter default, e.g. http://localhost:4318/v1/traces
+    TRACING_FILE_PATH: str = "./traces.jsonl"
+    TRACING_SERVICE_NAME: str = "accident-detection-api"
+    
+    # Prometheus metrics at /metrics
+    METRICS_ENABLED: bool = True
+    
+    # Admin-toggled sampling profiler (off until started via /api/admin/profiling/start)
+    PROFILER_SAMPLE_EVERY: int = 10  # profile 1 in N create/review requests
+    PROFILER_INTERVAL_MS: float = 5.0
+    PROFILER_MAX_STACKS: int = 5000  # distinct stacks kept; the rest are counted together
+    PROFILER_MAX_DEPTH: int = 64
+    
+    # Skip per-item ReportResponse validation for documents read from MongoDB
+    VALIDATE_REPORT_RESPONSES: bool = False
+    
     # CORS
     CORS_ORIGINS: list = [
         "http://localhost:3000",
@@ -60,6 +122,15 @@ class Settings(BaseSettings):
     # Hospital Location
     HOSPITAL_LAT: Optional[str] = None
     HOSPITAL_LON: Optional[str] = None
+    HOSPITALS_FILE: Optional[str] = None  # JSON list of {"name", "latitude", "longitude"}
+    
+    # Road-network routing (offline OSM extract)
+    ROUTING_OSM_PATH: Optional[str] = None  # .osm or .osm.gz
+    ROUTING_INDEX_PATH: Optional[str] = None  # defaults to <ROUTING_OSM_PATH>.alt.pkl
+    ROUTING_LANDMARKS: int = 8
+    ROUTING_CANDIDATE_HOSPITALS: int = 3
+    ROUTING_GEOCELL_PRECISION: int = 7  # geohash length (~150 m cells)
+    ROUTING_CACHE_SIZE: int = 10000
     
     class Config:
         env_file = ".env"
@@ -3,12 +3,52 @@ Database connection and operations
 """
 
 from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import ASCENDING, DESCENDING, GEOSPHERE, monitoring
 from .config import settings
+from .metrics import MONGO_POOL_CHECKED_OUT, MONGO_POOL_OPEN
+from .tracing import MongoSpanListener, tracing_enabled
 import logging
 
 logger = logging.getLogger(__name__)
 
 
+class PoolUsageListener(monitoring.ConnectionPoolListener):
+    """Feeds MongoDB connection pool usage into the metrics gauges"""
+    
+    def connection_created(self, event):
+        MONGO_POOL_OPEN.inc()
+    
+    def connection_closed(self, event):
+        MONGO_POOL_OPEN.dec()
+    
+    def connection_checked_out(self, event):
+        MONGO_POOL_CHECKED_OUT.inc()
+    
+    def connection_checked_in(self, event):
+        MONGO_POOL_CHECKED_OUT.dec()
+    
+    def pool_created(self, event):
+        pass
+    
+    def pool_ready(self, event):
+        pass
+    
+    def pool_cleared(self, event):
+        pass
+    
+    def pool_closed(self, event):
+        pass
+    
+    def connection_ready(self, event):
+        pass
+    
+    def connection_check_out_started(self, event):
+        pass
+    
+    def connection_check_out_failed(self, event):
+        pass
+
+
 class Database:
     """Database connection manager"""
     
@@ -18,7 +58,10 @@ class Database:
     async def connect_db(cls):
         """Connect to MongoDB"""
         try:
-            cls.client = AsyncIOMotorClient(settings.MONGODB_URL)
+            listeners = [PoolUsageListener()]
+            if tracing_enabled():
+                listeners.append(MongoSpanListener())
+            cls.client = AsyncIOMotorClient(settings.MONGODB_URL, event_listeners=listeners)
             # Test connection
             await cls.client.admin.command('ping')
             logger.info(f"Connected to MongoDB at {settings.MONGODB_URL}")
@@ -33,6 +76,34 @@ class Database:
             cls.client.close()
             logger.info("Closed MongoDB connection")
     
+    @classmethod
+    async def ensure_indexes(cls):
+        """Create indexes used by report queries"""
+        try:
+            db = cls.get_database()
+            
+            # Backfill GeoJSON points for reports created before location_geo existed
+            await db["reports"].update_many(
+                {
+                    "location_geo": {"$exists": False},
+                    "location.latitude": {"$gte": -90, "$lte": 90},
+                    "location.longitude": {"$gte": -180, "$lte": 180}
+                },
+                [{"$set": {"location_geo": {
+                    "type": "Point",
+                    "coordinates": ["$location.longitude", "$location.latitude"]
+                }}}]
+            )
+            
+            await db["reports"].create_index([("location_geo", GEOSPHERE)])
+            await db["reports"].create_index([("location_geo", GEOSPHERE), ("status", ASCENDING)])
+            await db["reports"].create_index([("incident_id", ASCENDING)])
+            await db["reports"].create_index([("created_at", DESCENDING)])
+            await db["incidents"].create_index([("location_geo", GEOSPHERE), ("last_reported_at", DESCENDING)])
+            logger.info("Database indexes ensured")
+        except Exception as e:
+            logger.error(f"Could not create indexes: {e}")
+    
     @classmethod
     def get_database(cls):
         """Get database instance"""
@@ -54,3 +125,18 @@ async def get_users_collection():
 async def get_reports_collection():
     """Get reports collection"""
     return Database.get_collection("reports")
+
+
+async def get_incidents_collection():
+    """Get incidents collection"""
+    return Database.get_collection("incidents")
+
+
+async def get_blobs_collection():
+    """Get upload blobs collection"""
+    return Database.get_collection("blobs")
+
+
+async def get_model_versions_collection():
+    """Get model versions collection"""
+    return Database.get_collection("model_versions")
@@ -0,0 +1,203 @@
+"""
+Geospatial helpers shared by routing, ETA and report lookups
+"""
+
+import math
+from typing import Optional
+
+import numpy as np
+
+EARTH_RADIUS_KM = 6371.0
+
+# Rows per block when building large pairwise matrices (bounds temporaries)
+DEFAULT_CHUNK_ROWS = 2048
+
+_GEOHASH_BASE32 = "0123456789bcdefghjkmnpqrstuvwxyz"
+
+
+def haversine_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """Great-circle distance between two coordinates in kilometers"""
+    lat_diff = math.radians(lat2 - lat1)
+    lon_diff = math.radians(lon2 - lon1)
+
+    a = (math.sin(lat_diff / 2) ** 2 +
+         math.cos(math.radians(lat1)) * math.cos(math.radians(lat2)) *
+         math.sin(lon_diff / 2) ** 2)
+
+    c = 2 * math.atan2(math.sqrt(a), math.sqrt(1 - a))
+    return EARTH_RADIUS_KM * c
+
+
+def haversine_one_to_many(
+    latitude: float,
+    longitude: float,
+    latitudes,
+    longitudes,
+    dtype=np.float64
+) -> np.ndarray:
+    """
+    Distances from one coordinate to many coordinates
+
+    Args:
+        latitude: Origin latitude in degrees
+        longitude: Origin longitude in degrees
+        latitudes: Array-like of target latitudes in degrees
+        longitudes: Array-like of target longitudes in degrees
+        dtype: np.float64 (default) or np.float32 for half the memory
+
+    Returns:
+        1-D array of distances in kilometers
+    """
+    lat2 = np.radians(np.asarray(latitudes, dtype=dtype))
+    lon2 = np.radians(np.asarray(longitudes, dtype=dtype))
+    lat1 = dtype(math.radians(latitude))
+    lon1 = dtype(math.radians(longitude))
+
+    a = (np.sin((lat2 - lat1) / 2) ** 2 +
+         np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2)
+    return (2 * EARTH_RADIUS_KM) * np.arcsin(np.sqrt(np.clip(a, 0, 1))).astype(dtype, copy=False)
+
+
+def haversine_pairwise(
+    latitudes_a,
+    longitudes_a,
+    latitudes_b=None,
+    longitudes_b=None,
+    dtype=np.float64,
+    chunk_rows: int = DEFAULT_CHUNK_ROWS,
+    out: Optional[np.ndarray] = None
+) -> np.ndarray:
+    """
+    Pairwise distance matrix between two coordinate sets
+
+    Rows are computed in blocks of ``chunk_rows`` so temporaries stay bounded
+    even when the full matrix is large; pass a preallocated (or memory-mapped)
+    ``out`` array to avoid holding the result in RAM as well.
+
+    Args:
+        latitudes_a: Array-like of row latitudes in degrees
+        longitudes_a: Array-like of row longitudes in degrees
+        latitudes_b: Array-like of column latitudes (defaults to set A)
+        longitudes_b: Array-like of column longitudes (defaults to set A)
+        dtype: np.float64 (default) or np.float32
+        chunk_rows: Number of rows computed per block
+        out: Optional (len(A), len(B)) array to write into
+
+    Returns:
+        Matrix of distances in kilometers, shape (len(A), len(B))
+    """
+    lat_a = np.radians(np.asarray(latitudes_a, dtype=dtype))
+    lon_a = np.radians(np.asarray(longitudes_a, dtype=dtype))
+    if latitudes_b is None:
+        lat_b, lon_b = lat_a, lon_a
+    else:
+        lat_b = np.radians(np.asarray(latitudes_b, dtype=dtype))
+        lon_b = np.radians(np.asarray(longitudes_b, dtype=dtype))
+
+    if out is None:
+        out = np.empty((lat_a.shape[0], lat_b.shape[0]), dtype=dtype)
+
+    chunk_rows = max(1, chunk_rows)
+    cos_b = np.cos(lat_b)[np.newaxis, :]
+    for start in range(0, lat_a.shape[0], chunk_rows):
+        stop = start + chunk_rows
+        rows_lat = lat_a[start:stop, np.newaxis]
+        rows_lon = lon_a[start:stop, np.newaxis]
+
+        a = (np.sin((lat_b - rows_lat) / 2) ** 2 +
+             np.cos(rows_lat) * cos_b * np.sin((lon_b - rows_lon) / 2) ** 2)
+        out[start:stop] = (2 * EARTH_RADIUS_KM) * np.arcsin(np.sqrt(np.clip(a, 0, 1)))
+
+    return out
+
+
+def geojson_point(latitude: float, longitude: float) -> Optional[dict]:
+    """
+    GeoJSON point for 2dsphere indexes (None if coordinates are out of range)
+
+    Args:
+        latitude: Latitude in degrees
+        longitude: Longitude in degrees
+
+    Returns:
+        {"type": "Point", "coordinates": [longitude, latitude]} or None
+    """
+    if not (-90 <= latitude <= 90 and -180 <= longitude <= 180):
+        return None
+    return {"type": "Point", "coordinates": [longitude, latitude]}
+
+
+def bbox_polygon(min_lat: float, min_lon: float, max_lat: float, max_lon: float, segments: int = 8) -> dict:
+    """
+    GeoJSON polygon for a map viewport, usable with $geoWithin on 2dsphere
+
+    The ring is counter-clockwise with MongoDB's strict-winding CRS, so
+    boxes larger than a hemisphere (zoomed-out maps) are not flipped to
+    their complement. The south and north edges are split into
+    ``segments`` pieces so the geodesic edges stay close to the box's
+    parallels.
+
+    A box with min_lon > max_lon crosses the antimeridian: it runs east
+    from min_lon through 180 to max_lon, as web maps report such viewports.
+    """
+    if min_lon > max_lon:
+        max_lon += 360
+    step = (max_lon - min_lon) / segments
+    south = [[min_lon + i * step, min_lat] for i in range(segments)]
+    north = [[max_lon - i * step, max_lat] for i in range(segments)]
+    ring = south + [[max_lon, min_lat]] + north + [[min_lon, max_lat], [min_lon, min_lat]]
+    # Vertices past the antimeridian back into [-180, 180]
+    ring = [[lon - 360 if lon > 180 else lon, lat] for lon, lat in ring]
+    return {
+        "type": "Polygon",
+        "coordinates": [ring],
+        "crs": {"type": "name", "properties": {"name": "urn:x-mongodb:crs:strictwinding:EPSG:4326"}}
+    }
+
+
+def geohash_encode(latitude: float, longitude: float, precision: int = 7) -> str:
+    """
+    Encode a coordinate as a geohash string
+
+    Args:
+        latitude: Latitude in degrees
+        longitude: Longitude in degrees
+        precision: Number of base32 characters (7 is roughly a 150 m cell)
+
+    Returns:
+        Geohash of the cell containing the coordinate
+    """
+    lat_range = [-90.0, 90.0]
+    lon_range = [-180.0, 180.0]
+    geohash = []
+    bits = 0
+    bit_count = 0
+    even = True
+
+    while len(geohash) < precision:
+        if even:
+            mid = (lon_range[0] + lon_range[1]) / 2
+            if longitude >= mid:
+                bits = (bits << 1) | 1
+                lon_range[0] = mid
+            else:
+                bits = bits << 1
+                lon_range[1] = mid
+        else:
+            mid = (lat_range[0] + lat_range[1]) / 2
+            if latitude >= mid:
+                bits = (bits << 1) | 1
+                lat_range[0] = mid
+            else:
+                bits = bits << 1
+                lat_range[1] = mid
+
+        even = not even
+        bit_count += 1
+
+        if bit_count == 5:
+            geohash.append(_GEOHASH_BASE32[bits])
+            bits = 0
+            bit_count = 0
+
+    return "".join(geohash)
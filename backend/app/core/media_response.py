@@ -0,0 +1,183 @@
+"""
+Cache-aware file responses for uploaded media
+
+Adds strong ETags, conditional requests (304) and single byte-range
+requests (206) on top of plain file serving, so browsers can revalidate
+cheaply and seek in video evidence without downloading the whole file.
+"""
+
+import os
+import stat
+from email.utils import formatdate, parsedate_to_datetime
+from mimetypes import guess_type
+from typing import Mapping, Optional, Tuple
+
+import anyio
+from starlette.requests import Request
+from starlette.responses import Response
+from starlette.types import Receive, Scope, Send
+
+# Content-addressed objects never change under the same URL
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+MUTABLE_CACHE_CONTROL = "public, max-age=3600, must-revalidate"
+
+CHUNK_SIZE = 256 * 1024
+
+
+class RangeFileResponse(Response):
+    """Streams a byte range of a file (the whole file when start=0, length=size)"""
+
+    def __init__(
+        self,
+        path: str,
+        start: int,
+        length: int,
+        status_code: int,
+        headers: Mapping[str, str],
+        media_type: Optional[str],
+        send_body: bool = True
+    ):
+        self.path = path
+        self.start = start
+        self.length = length
+        self.send_body = send_body
+        self.status_code = status_code
+        self.media_type = media_type
+        self.background = None
+        self.init_headers({**headers, "content-length": str(length)})
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        await send({"type": "http.response.start", "status": self.status_code, "headers": self.raw_headers})
+        if not self.send_body or self.length == 0:
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
+            return
+
+        async with await anyio.open_file(self.path, mode="rb") as file:
+            # Servers implementing the ASGI zero-copy extension sendfile() the range
+            if "http.response.zerocopysend" in scope.get("extensions", {}):
+                await send({
+                    "type": "http.response.zerocopysend",
+                    "file": file.wrapped,
+                    "offset": self.start,
+                    "count": self.length,
+                    "more_body": False
+                })
+                return
+
+            await file.seek(self.start)
+            remaining = self.length
+            while remaining > 0:
+                chunk = await file.read(min(CHUNK_SIZE, remaining))
+                if not chunk:
+                    break
+                remaining -= len(chunk)
+                await send({"type": "http.response.body", "body": chunk, "more_body": remaining > 0})
+            if remaining > 0:
+                await send({"type": "http.response.body", "body": b"", "more_body": False})
+
+
+def parse_range(header: Optional[str], size: int) -> Optional[Tuple[int, int]]:
+    """
+    Parse a single-range Range header
+
+    Args:
+        header: Range header value (e.g. "bytes=0-1023", "bytes=-500")
+        size: File size
+
+    Returns:
+        (start, end) inclusive, None to serve the whole file (no or
+        multi-range header), or (-1, -1) if the range is unsatisfiable
+    """
+    if not header or not header.startswith("bytes=") or "," in header:
+        return None
+    first, _, last = header[6:].strip().partition("-")
+    try:
+        if first:
+            start = int(first)
+            end = int(last) if last else size - 1
+        else:
+            suffix = int(last)
+            if suffix == 0:
+                return (-1, -1)
+            start, end = max(size - suffix, 0), size - 1
+    except ValueError:
+        return None
+
+    if start >= size or start > end:
+        return (-1, -1)
+    return (start, min(end, size - 1))
+
+
+def _etag_matches(header: str, etag: str) -> bool:
+    if header.strip() == "*":
+        return True
+    # Weak comparison for If-None-Match (RFC 9110 13.1.2)
+    tags = [tag.strip().removeprefix("W/") for tag in header.split(",")]
+    return etag in tags
+
+
+def serve_file(
+    request: Request,
+    path: str,
+    etag: Optional[str] = None,
+    immutable: bool = False,
+    media_type: Optional[str] = None
+) -> Response:
+    """
+    Build a file response honouring conditional and Range requests
+
+    Args:
+        request: Incoming request
+        path: File to serve (must exist)
+        etag: Strong validator without quotes (defaults to mtime and size)
+        immutable: Content never changes under this URL
+        media_type: Content type (guessed from the name by default)
+
+    Returns:
+        200, 206, 304 or 416 response
+    """
+    stat_result = os.stat(path)
+    if not stat.S_ISREG(stat_result.st_mode):
+        raise FileNotFoundError(path)
+
+    size = stat_result.st_size
+    etag = f'"{etag or f"{stat_result.st_mtime_ns:x}-{size:x}"}"'
+    headers = {
+        "etag": etag,
+        "last-modified": formatdate(stat_result.st_mtime, usegmt=True),
+        "cache-control": IMMUTABLE_CACHE_CONTROL if immutable else MUTABLE_CACHE_CONTROL,
+        "accept-ranges": "bytes",
+    }
+    media_type = media_type or guess_type(path)[0] or "application/octet-stream"
+
+    # Conditional GET: If-None-Match takes precedence over If-Modified-Since
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        if _etag_matches(if_none_match, etag):
+            return Response(status_code=304, headers=headers)
+    elif "if-modified-since" in request.headers:
+        try:
+            since = parsedate_to_datetime(request.headers["if-modified-since"]).timestamp()
+            if int(stat_result.st_mtime) <= since:
+                return Response(status_code=304, headers=headers)
+        except (TypeError, ValueError):
+            pass
+
+    send_body = request.method != "HEAD"
+
+    byte_range = parse_range(request.headers.get("range"), size)
+    if_range = request.headers.get("if-range")
+    if byte_range is not None and if_range is not None and if_range.strip() != etag:
+        byte_range = None  # Representation changed: send it whole
+
+    if byte_range is None:
+        return RangeFileResponse(path, 0, size, 200, headers, media_type, send_body)
+
+    start, end = byte_range
+    if start < 0:
+        return Response(
+            status_code=416,
+            headers={**headers, "content-range": f"bytes */{size}"}
+        )
+    headers["content-range"] = f"bytes {start}-{end}/{size}"
+    return RangeFileResponse(path, start, end - start + 1, 206, headers, media_type, send_body)
@@ -0,0 +1,219 @@
+"""
+In-process metrics exposed in Prometheus text format
+
+Histograms and gauges are plain Python objects updated under a lock; the
+text exposition is only rendered when /metrics is scraped, so recording an
+observation costs a bisect and a few increments.
+"""
+
+import bisect
+import functools
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from .tracing import span
+
+# Seconds; spans fast Mongo calls up to slow CPU inference
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{str(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Histogram:
+    """Cumulative-bucket histogram with optional labels"""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # label values -> [bucket counts..., +Inf count], sum
+        self._series: Dict[Tuple[str, ...], List] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *labelvalues: str):
+        """Record one observation"""
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labelvalues)
+            if series is None:
+                series = self._series[labelvalues] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][index] += 1
+            series[1] += value
+
+    @contextmanager
+    def time(self, *labelvalues: str):
+        """Observe the duration of a with-block"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, *labelvalues)
+
+    def collect(self) -> Iterable[str]:
+        yield f"# HELP {self.name} {self.documentation}"
+        yield f"# TYPE {self.name} histogram"
+        with self._lock:
+            snapshot = [(labels, list(series[0]), series[1]) for labels, series in self._series.items()]
+        for labels, counts, total in snapshot:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = f'le="{_format_value(bound)}"'
+                yield f"{self.name}_bucket{_format_labels(self.labelnames, labels, le)} {cumulative}"
+            yield f"{self.name}_sum{_format_labels(self.labelnames, labels)} {total}"
+            yield f"{self.name}_count{_format_labels(self.labelnames, labels)} {cumulative}"
+
+
+class Gauge:
+    """Gauge set directly, incremented/decremented, or read from a callback at scrape time"""
+
+    def __init__(self, name: str, documentation: str, callback: Optional[Callable[[], float]] = None):
+        self.name = name
+        self.documentation = documentation
+        self.callback = callback
+        self._value = 0.0
+        self._lock = threading.Lock()
+
+    def set(self, value: float):
+        with self._lock:
+            self._value = value
+
+    def inc(self, amount: float = 1):
+        with self._lock:
+            self._value += amount
+
+    def dec(self, amount: float = 1):
+        with self._lock:
+            self._value -= amount
+
+    @contextmanager
+    def track_inprogress(self):
+        """Count the with-block while it runs"""
+        self.inc()
+        try:
+            yield
+        finally:
+            self.dec()
+
+    @property
+    def value(self) -> float:
+        if self.callback is not None:
+            return self.callback()
+        return self._value
+
+    def collect(self) -> Iterable[str]:
+        yield f"# HELP {self.name} {self.documentation}"
+        yield f"# TYPE {self.name} gauge"
+        yield f"{self.name} {_format_value(self.value)}"
+
+
+class MetricsRegistry:
+    """Collection of metrics rendered together"""
+
+    def __init__(self):
+        self._metrics: Dict[str, object] = {}
+
+    def register(self, metric):
+        self._metrics[metric.name] = metric
+        return metric
+
+    def render(self) -> str:
+        """Prometheus text exposition format (version 0.0.4)"""
+        lines = []
+        for metric in self._metrics.values():
+            try:
+                lines.extend(metric.collect())
+            except Exception:
+                continue  # a failing gauge callback must not break the scrape
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+REQUEST_SECONDS = registry.register(Histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by endpoint function",
+    ("method", "endpoint", "status")
+))
+STAGE_SECONDS = registry.register(Histogram(
+    "stage_duration_seconds",
+    "Latency of individual processing stages",
+    ("operation", "stage")
+))
+INFERENCE_IN_FLIGHT = registry.register(Gauge(
+    "inference_in_flight",
+    "Model predictions currently running or waiting for the model"
+))
+MONGO_POOL_CHECKED_OUT = registry.register(Gauge(
+    "mongo_pool_connections_checked_out",
+    "MongoDB connections currently in use"
+))
+MONGO_POOL_OPEN = registry.register(Gauge(
+    "mongo_pool_connections_open",
+    "MongoDB connections currently open"
+))
+
+
+@contextmanager
+def stage(operation: str, stage_name: str):
+    """Context manager timing one stage of an operation (also a trace span)"""
+    with span(f"{operation}.{stage_name}"), STAGE_SECONDS.time(operation, stage_name):
+        yield
+
+
+def instrument(operation: str, stage_name: str, func: Callable) -> Callable:
+    """Wrap a callable so every call is recorded as a stage"""
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        with stage(operation, stage_name):
+            return func(*args, **kwargs)
+    return wrapper
+
+
+def timed(operation: str, stage_name: str):
+    """Decorator form of instrument()"""
+    return lambda func: instrument(operation, stage_name, func)
+
+
+class MetricsMiddleware:
+    """ASGI middleware timing every HTTP request by its endpoint function"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+        start = time.perf_counter()
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            endpoint = scope.get("endpoint")
+            # Unmatched paths share one label so random URLs can't grow the series count
+            name = getattr(endpoint, "__name__", "unmatched")
+            REQUEST_SECONDS.observe(time.perf_counter() - start, scope["method"], name, str(status_code))
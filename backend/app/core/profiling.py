@@ -0,0 +1,199 @@
+"""
+Opt-in sampling profiler for live workers
+
+While switched on, one in every N calls to a @profiled endpoint is sampled:
+for as long as it runs, a background thread snapshots the Python stacks of
+the threads working for it at a fixed interval and counts identical stacks.
+Those are the event-loop thread running the request and any
+ProfiledThreadPoolExecutor thread running a job the request submitted (the
+application's default executor is one); idle pool threads and unrelated
+work are not recorded. Each stack starts with its thread's name. The counts
+are kept in collapsed-stack format ("frame;frame;frame count"), which
+flamegraph.pl, speedscope and similar tools read directly.
+
+Nothing is recorded while the profiler is off, and the number of distinct
+stacks kept is capped, so it can be left available in production.
+"""
+
+import functools
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import ContextVar
+from typing import Callable, Dict, Optional
+
+from .config import settings
+
+TRUNCATED_STACK = "[other stacks]"
+
+# Set while a sampled request runs, so executor jobs it submits are sampled too
+_sampled_request: ContextVar[bool] = ContextVar("profiler_sampled_request", default=False)
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+class SamplingProfiler:
+    """Stack sampler active only while sampled requests are in flight"""
+
+    def __init__(self, sample_every: int, interval_ms: float, max_stacks: int, max_depth: int):
+        self.sample_every = sample_every
+        self.interval = interval_ms / 1000
+        self.max_stacks = max_stacks
+        self.max_depth = max_depth
+        self.enabled = False
+        self.started_at: Optional[float] = None
+        self.samples = 0
+        self.sampled_requests = 0
+        self._stacks: Dict[str, int] = {}
+        self._calls = 0
+        self._in_flight = 0
+        # Thread ident -> sampled requests or jobs currently running on it
+        self._threads: Dict[int, int] = {}
+        self._active = threading.Event()
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self, sample_every: Optional[int] = None, interval_ms: Optional[float] = None):
+        """Start sampling 1 in `sample_every` profiled requests"""
+        with self._lock:
+            if sample_every:
+                self.sample_every = sample_every
+            if interval_ms:
+                self.interval = interval_ms / 1000
+            self.enabled = True
+            self.started_at = time.time()
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="profiler-sampler", daemon=True)
+                self._thread.start()
+
+    def stop(self):
+        """Stop sampling; collected stacks are kept until reset()"""
+        with self._lock:
+            self.enabled = False
+
+    def reset(self):
+        with self._lock:
+            self._stacks.clear()
+            self.samples = 0
+            self.sampled_requests = 0
+
+    def status(self) -> Dict:
+        with self._lock:
+            return {
+                "enabled": self.enabled,
+                "sample_every": self.sample_every,
+                "interval_ms": self.interval * 1000,
+                "started_at": self.started_at,
+                "sampled_requests": self.sampled_requests,
+                "samples": self.samples,
+                "distinct_stacks": len(self._stacks),
+                "max_stacks": self.max_stacks,
+            }
+
+    def collapsed(self) -> str:
+        """Collected stacks in collapsed (folded) format"""
+        with self._lock:
+            items = sorted(self._stacks.items(), key=lambda item: item[1], reverse=True)
+        return "".join(f"{stack} {count}\n" for stack, count in items)
+
+    def _begin(self) -> bool:
+        with self._lock:
+            if not self.enabled:
+                return False
+            self._calls += 1
+            if self._calls % self.sample_every:
+                return False
+            self.sampled_requests += 1
+            self._in_flight += 1
+            self._active.set()
+            return True
+
+    def _end(self):
+        with self._lock:
+            self._in_flight -= 1
+            if self._in_flight == 0:
+                self._active.clear()
+
+    def _track(self, thread_id: int):
+        with self._lock:
+            self._threads[thread_id] = self._threads.get(thread_id, 0) + 1
+
+    def _untrack(self, thread_id: int):
+        with self._lock:
+            if self._threads[thread_id] > 1:
+                self._threads[thread_id] -= 1
+            else:
+                del self._threads[thread_id]
+
+    def run_tracked(self, func: Callable, *args, **kwargs):
+        """Run an executor job with its thread sampled (see ProfiledThreadPoolExecutor)"""
+        thread_id = threading.get_ident()
+        self._track(thread_id)
+        try:
+            return func(*args, **kwargs)
+        finally:
+            self._untrack(thread_id)
+
+    def _run(self):
+        while True:
+            self._active.wait()
+            with self._lock:
+                tracked = set(self._threads)
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            folded = []
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id not in tracked:
+                    continue
+                labels = []
+                while frame is not None and len(labels) < self.max_depth:
+                    labels.append(_frame_label(frame))
+                    frame = frame.f_back
+                labels.append(names.get(thread_id, str(thread_id)))
+                folded.append(";".join(reversed(labels)))
+            with self._lock:
+                for stack in folded:
+                    if stack not in self._stacks and len(self._stacks) >= self.max_stacks:
+                        stack = TRUNCATED_STACK
+                    self._stacks[stack] = self._stacks.get(stack, 0) + 1
+                self.samples += 1
+            time.sleep(self.interval)
+
+    def profiled(self, func: Callable) -> Callable:
+        """Decorator marking an async endpoint as eligible for sampling"""
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            if not self._begin():
+                return await func(*args, **kwargs)
+            thread_id = threading.get_ident()
+            token = _sampled_request.set(True)
+            self._track(thread_id)
+            try:
+                return await func(*args, **kwargs)
+            finally:
+                self._untrack(thread_id)
+                _sampled_request.reset(token)
+                self._end()
+        return wrapper
+
+
+profiler = SamplingProfiler(
+    sample_every=settings.PROFILER_SAMPLE_EVERY,
+    interval_ms=settings.PROFILER_INTERVAL_MS,
+    max_stacks=settings.PROFILER_MAX_STACKS,
+    max_depth=settings.PROFILER_MAX_DEPTH
+)
+profiled = profiler.profiled
+
+
+class ProfiledThreadPoolExecutor(ThreadPoolExecutor):
+    """Thread pool whose jobs are sampled when a sampled request submitted them"""
+
+    def submit(self, fn, /, *args, **kwargs):
+        if _sampled_request.get():
+            return super().submit(profiler.run_tracked, fn, *args, **kwargs)
+        return super().submit(fn, *args, **kwargs)
@@ -2,6 +2,9 @@
 Security utilities for authentication and authorization
 """
 
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from typing import Optional
 from jose import JWTError, jwt
@@ -24,6 +27,52 @@ def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
 
 
+# bcrypt costs ~100 ms of CPU per call; run it off the event loop on a small
+# dedicated pool so a login storm cannot starve other requests
+_password_executor = ThreadPoolExecutor(
+    max_workers=settings.PASSWORD_HASH_WORKERS,
+    thread_name_prefix="password-hash"
+)
+_password_queue_lock = threading.Lock()
+_password_queue_depth = 0
+
+
+def password_queue_depth() -> int:
+    """Number of password hash/verify jobs queued or running"""
+    return _password_queue_depth
+
+
+async def _run_password_job(func, *args):
+    """Run a password operation on the bounded executor"""
+    global _password_queue_depth
+    
+    with _password_queue_lock:
+        if _password_queue_depth >= settings.PASSWORD_HASH_QUEUE_LIMIT:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Authentication service busy, please retry",
+                headers={"Retry-After": "1"},
+            )
+        _password_queue_depth += 1
+    
+    try:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(_password_executor, func, *args)
+    finally:
+        with _password_queue_lock:
+            _password_queue_depth -= 1
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """Verify a password against its hash without blocking the event loop"""
+    return await _run_password_job(verify_password, plain_password, hashed_password)
+
+
+async def get_password_hash_async(password: str) -> str:
+    """Hash a password without blocking the event loop"""
+    return await _run_password_job(get_password_hash, password)
+
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     """
     Create a JWT access token
@@ -0,0 +1,203 @@
+"""
+Optional OpenTelemetry tracing
+
+When TRACING_ENABLED is set and the OpenTelemetry SDK is installed, every
+HTTP request becomes a server span. The metrics stages (upload, decode,
+predict, insert, Twilio send, ...) and every MongoDB command become child
+spans. Incoming W3C traceparent headers are honoured, so a report can be
+followed across an API node and an inference worker.
+
+Spans are exported over OTLP (HTTP or gRPC) to a local collector, or written
+as JSON lines to a file for offline analysis. Without the SDK, or with
+tracing disabled, span() is a no-op and nothing is installed.
+"""
+
+import json
+import logging
+import threading
+from contextlib import nullcontext
+from typing import Any, Dict, Optional, Sequence
+
+from pymongo import monitoring
+
+from .config import settings
+
+logger = logging.getLogger(__name__)
+
+try:
+    from opentelemetry import context as otel_context, propagate, trace
+    from opentelemetry.sdk.resources import Resource
+    from opentelemetry.sdk.trace import TracerProvider
+    from opentelemetry.sdk.trace.export import BatchSpanProcessor, SpanExporter, SpanExportResult
+    from opentelemetry.trace import SpanKind, Status, StatusCode
+    OTEL_AVAILABLE = True
+except ImportError:
+    OTEL_AVAILABLE = False
+
+_tracer = None
+
+
+if OTEL_AVAILABLE:
+    class FileSpanExporter(SpanExporter):
+        """Appends finished spans to a file, one JSON object per line"""
+
+        def __init__(self, path: str):
+            self.path = path
+            self._lock = threading.Lock()
+
+        def export(self, spans: Sequence) -> "SpanExportResult":
+            lines = [json.dumps(json.loads(span.to_json()), separators=(",", ":")) for span in spans]
+            try:
+                with self._lock, open(self.path, "a", encoding="utf-8") as f:
+                    f.write("\n".join(lines) + "\n")
+            except OSError as e:
+                logger.warning(f"Could not write spans to {self.path}: {e}")
+                return SpanExportResult.FAILURE
+            return SpanExportResult.SUCCESS
+
+        def shutdown(self):
+            pass
+
+
+def _create_exporter():
+    exporter = settings.TRACING_EXPORTER
+    if exporter == "file":
+        return FileSpanExporter(settings.TRACING_FILE_PATH)
+    if exporter == "otlp-grpc":
+        from opentelemetry.exporter.otlp.proto.grpc.trace_exporter import OTLPSpanExporter
+        return OTLPSpanExporter(endpoint=settings.TRACING_OTLP_ENDPOINT)
+    if exporter == "otlp":
+        from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+        return OTLPSpanExporter(endpoint=settings.TRACING_OTLP_ENDPOINT)
+    raise ValueError(f"Unknown TRACING_EXPORTER: {exporter}")
+
+
+def setup_tracing() -> bool:
+    """
+    Install the tracer provider if tracing is enabled and available
+
+    Returns:
+        True if spans are being recorded
+    """
+    global _tracer
+    if _tracer is not None:
+        return True
+    if not settings.TRACING_ENABLED:
+        return False
+    if not OTEL_AVAILABLE:
+        logger.warning("TRACING_ENABLED is set but opentelemetry-sdk is not installed; tracing disabled")
+        return False
+
+    try:
+        exporter = _create_exporter()
+    except Exception as e:
+        logger.warning(f"Could not create span exporter, tracing disabled: {e}")
+        return False
+
+    provider = TracerProvider(resource=Resource.create({"service.name": settings.TRACING_SERVICE_NAME}))
+    provider.add_span_processor(BatchSpanProcessor(exporter))
+    trace.set_tracer_provider(provider)
+    _tracer = trace.get_tracer("accident-detection")
+    logger.info(f"Tracing enabled ({settings.TRACING_EXPORTER} exporter)")
+    return True
+
+
+def shutdown_tracing():
+    """Flush pending spans"""
+    if _tracer is not None:
+        provider = trace.get_tracer_provider()
+        if hasattr(provider, "shutdown"):
+            provider.shutdown()
+
+
+def tracing_enabled() -> bool:
+    return _tracer is not None
+
+
+def span(name: str, attributes: Optional[Dict[str, Any]] = None):
+    """Context manager for a child span of the current one (no-op when tracing is off)"""
+    if _tracer is None:
+        return nullcontext()
+    return _tracer.start_as_current_span(name, attributes=attributes)
+
+
+class MongoSpanListener(monitoring.CommandListener):
+    """Records each MongoDB command as a client span"""
+
+    def __init__(self):
+        self._spans: Dict[tuple, Any] = {}
+        self._lock = threading.Lock()
+
+    def started(self, event):
+        if _tracer is None:
+            return
+        # Motor runs commands in executor threads with the caller's context copied
+        command_span = _tracer.start_span(
+            f"mongodb.{event.command_name}",
+            kind=SpanKind.CLIENT,
+            attributes={
+                "db.system": "mongodb",
+                "db.name": event.database_name,
+                "db.operation": event.command_name,
+                "db.mongodb.collection": str(event.command.get(event.command_name, "")),
+            }
+        )
+        with self._lock:
+            self._spans[(event.request_id, event.connection_id)] = command_span
+
+    def _finish(self, event, error: Optional[str] = None):
+        with self._lock:
+            command_span = self._spans.pop((event.request_id, event.connection_id), None)
+        if command_span is None:
+            return
+        if error:
+            command_span.set_status(Status(StatusCode.ERROR, error))
+        command_span.end()
+
+    def succeeded(self, event):
+        self._finish(event)
+
+    def failed(self, event):
+        self._finish(event, str(event.failure.get("errmsg", "command failed")))
+
+
+class TracingMiddleware:
+    """ASGI middleware opening a server span per HTTP request"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or _tracer is None:
+            await self.app(scope, receive, send)
+            return
+
+        carrier = {name.decode("latin-1"): value.decode("latin-1") for name, value in scope["headers"]}
+        token = otel_context.attach(propagate.extract(carrier))
+        status_code = 500
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            with _tracer.start_as_current_span(
+                f"{scope['method']} {scope['path']}",
+                kind=SpanKind.SERVER,
+                attributes={"http.method": scope["method"], "http.target": scope["path"]}
+            ) as request_span:
+                try:
+                    await self.app(scope, receive, send_wrapper)
+                finally:
+                    # Name by route template so spans group across report ids
+                    route = scope.get("route")
+                    if route is not None and hasattr(route, "path"):
+                        request_span.update_name(f"{scope['method']} {route.path}")
+                        request_span.set_attribute("http.route", route.path)
+                    request_span.set_attribute("http.status_code", status_code)
+                    if status_code >= 500:
+                        request_span.set_status(Status(StatusCode.ERROR))
+        finally:
+            otel_context.detach(token)
@@ -4,23 +4,29 @@ Main FastAPI application
 
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.staticfiles import StaticFiles
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, PlainTextResponse
 from contextlib import asynccontextmanager
+import asyncio
 import logging
 import os
 
 from .core.config import settings
 from .core.database import Database, get_users_collection
-from .core.security import get_password_hash
-from .api.routes import auth, reports
+from .core.security import get_password_hash_async, password_queue_depth
+from .core.metrics import Gauge, MetricsMiddleware, registry
+from .core.logging_config import RequestIdMiddleware, dropped_log_records, setup_logging
+from .core.tracing import TracingMiddleware, setup_tracing, shutdown_tracing
+from .core.profiling import ProfiledThreadPoolExecutor
+from .services.routing_service import routing_service
+from .services.image_index_service import image_hash_index
+from .services.model_version_service import model_version_service
+from .api.routes import auth, reports, media, profiling
+from .api.serialization import FastJSONResponse
 
 # Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
+setup_logging()
 logger = logging.getLogger(__name__)
+setup_tracing()
 
 
 @asynccontextmanager
@@ -29,8 +35,16 @@ async def lifespan(app: FastAPI):
     # Startup
     logger.info("Starting Road Accident Detection System...")
     
+    # Executor jobs of sampled requests show up in the profiler
+    asyncio.get_running_loop().set_default_executor(ProfiledThreadPoolExecutor())
+    
     # Connect to database
     await Database.connect_db()
+    await Database.ensure_indexes()
+    try:
+        await model_version_service.migrate_embedded_performance()
+    except Exception as e:
+        logger.error(f"Could not migrate model performance metadata: {e}")
     
     # Create admin user if not exists
     await create_admin_user()
@@ -38,13 +52,22 @@ async def lifespan(app: FastAPI):
     # Create upload directory
     os.makedirs(settings.UPLOAD_DIR, exist_ok=True)
     
+    # Load road graph / ALT index in the background (ETA falls back until ready)
+    if settings.ROUTING_OSM_PATH:
+        asyncio.get_running_loop().run_in_executor(None, routing_service.load)
+    
+    # Seed the near-duplicate image index in the background (uploads run the CNN until ready)
+    index_load = asyncio.create_task(image_hash_index.load())
+    
     logger.info("Application started successfully!")
     
     yield
     
     # Shutdown
     logger.info("Shutting down application...")
+    index_load.cancel()
     await Database.close_db()
+    shutdown_tracing()
     logger.info("Application shut down complete")
 
 
@@ -52,7 +75,8 @@ app = FastAPI(
     title=settings.APP_NAME,
     version=settings.APP_VERSION,
     description="AI-powered Road Accident Detection System with Admin Panel",
-    lifespan=lifespan
+    lifespan=lifespan,
+    default_response_class=FastJSONResponse
 )
 
 # CORS middleware
@@ -64,12 +88,31 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Request latency per endpoint for /metrics
+if settings.METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+    registry.register(Gauge(
+        "password_hash_queue_depth",
+        "Password hashing jobs queued or running",
+        callback=password_queue_depth
+    ))
+    registry.register(Gauge(
+        "log_records_dropped",
+        "Log records discarded because the log queue was full",
+        callback=dropped_log_records
+    ))
+
+# Server span per request (no-op unless TRACING_ENABLED)
+app.add_middleware(TracingMiddleware)
+
+# Request id for log correlation (outermost, so every log line of a request has it)
+app.add_middleware(RequestIdMiddleware)
+
 # Include routers
 app.include_router(auth.router, prefix=settings.API_V1_PREFIX)
 app.include_router(reports.router, prefix=settings.API_V1_PREFIX)
-
-# Mount static files (uploads)
-app.mount("/uploads", StaticFiles(directory=settings.UPLOAD_DIR), name="uploads")
+app.include_router(profiling.router, prefix=settings.API_V1_PREFIX)
+app.include_router(media.router)
 
 
 @app.get("/")
@@ -96,10 +139,19 @@ async def health_check():
     return {
         "status": "healthy",
         "database": db_status,
+        "password_hash_queue_depth": password_queue_depth(),
         "version": settings.APP_VERSION
     }
 
 
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Prometheus scrape endpoint"""
+    if not settings.METRICS_ENABLED:
+        raise HTTPException(status_code=404, detail="Metrics disabled")
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
+
+
 async def create_admin_user():
     """Create default admin user if not exists"""
     try:
@@ -112,7 +164,7 @@ async def create_admin_user():
             admin_data = {
                 "email": settings.ADMIN_EMAIL,
                 "full_name": "System Administrator",
-                "hashed_password": get_password_hash(settings.ADMIN_PASSWORD),
+                "hashed_password": await get_password_hash_async(settings.ADMIN_PASSWORD),
                 "is_active": True,
                 "is_admin": True,
                 "phone": None
@@ -45,6 +45,8 @@ class ReportModel(BaseModel):
     # Image details
     image_path: Optional[str] = None  # Optional for SOS without image
     image_filename: Optional[str] = None
+    image_sha256: Optional[str] = None
+    image_size_bytes: Optional[int] = None
     
     # Location
     location: LocationModel
@@ -71,6 +73,18 @@ class ReportModel(BaseModel):
     severity_level: Optional[str] = None
     estimated_arrival: Optional[str] = None
     
+    # Duplicate-incident clustering
+    incident_id: Optional[str] = None
+    duplicate_of: Optional[str] = None  # First report of the same incident
+    
+    # Near-duplicate image detection
+    image_phash: Optional[str] = None
+    near_duplicate_of: Optional[str] = None
+    
+    # Downscaled image derivatives (media paths like image_path)
+    thumbnail_path: Optional[str] = None
+    preview_path: Optional[str] = None
+    
     # Notification tracking
     sms_sent_at: Optional[datetime] = None
     sms_status: Optional[str] = None  # 'sent', 'failed', 'pending'
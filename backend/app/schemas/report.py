@@ -38,6 +38,20 @@ class ReportResponse(BaseModel):
     eta: Optional[str] = None
     hospital_name: Optional[str] = None
     severity_level: Optional[str] = None
+    ambulance_eta_minutes: Optional[int] = None
+    estimated_arrival: Optional[str] = None
+    
+    # Duplicate-incident clustering
+    incident_id: Optional[str] = None
+    duplicate_of: Optional[str] = None
+    
+    # Near-duplicate image detection
+    image_phash: Optional[str] = None
+    near_duplicate_of: Optional[str] = None
+    
+    # Downscaled image derivatives (media paths like image_path)
+    thumbnail_path: Optional[str] = None
+    preview_path: Optional[str] = None
     
     # SMS notification fields
     sms_status: Optional[str] = None  # 'sent', 'failed', 'pending', 'no_phone'
@@ -51,6 +65,27 @@ class ReportResponse(BaseModel):
         from_attributes = True
 
 
+class ReportSummary(BaseModel):
+    """Slim report for list views (view=summary)"""
+    id: str = Field(..., alias="_id")
+    user_name: str
+    image_path: Optional[str] = None
+    thumbnail_path: Optional[str] = None
+    location: LocationModel
+    prediction: PredictionModel  # is_accident and confidence only
+    status: ReportStatus
+    severity_level: Optional[str] = None
+    ambulance_eta_minutes: Optional[int] = None
+    incident_id: Optional[str] = None
+    duplicate_of: Optional[str] = None
+    created_at: datetime
+    updated_at: datetime
+    
+    class Config:
+        populate_by_name = True
+        from_attributes = True
+
+
 class ReportUpdate(BaseModel):
     """Schema for updating report status"""
     status: ReportStatus
@@ -0,0 +1,185 @@
+"""
+Content-addressed upload storage
+
+Uploads are stored once per distinct content under the storage key
+blobs/<aa>/<bb>/<sha256>.<ext>, where aa/bb are the first hex digits of the
+hash. The two-level shard prefix keeps every directory small, and a
+reference count per blob (one per report) decides when the object can be
+deleted.
+
+A release that drops the count to zero marks the record with its own delete
+token while it removes the objects. A commit that revives a marked record
+does not wait for that delete: it takes the record over under a fresh
+storage key (<sha256>-<revision>.<ext>), so the releaser can only ever
+delete the objects it claimed.
+"""
+
+import asyncio
+import logging
+import os
+import uuid
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+from pymongo import ReturnDocument
+
+from ..core.config import settings
+from ..core.database import get_blobs_collection
+from .storage import StorageBackend, storage
+
+logger = logging.getLogger(__name__)
+
+# Canonical file suffix per sniffed media type
+DETECTED_TYPE_SUFFIX = {
+    "jpeg": ".jpg",
+    "png": ".png",
+    "mp4": ".mp4",
+    "webm": ".webm",
+    "avi": ".avi",
+}
+
+DETECTED_TYPE_CONTENT_TYPE = {
+    "jpeg": "image/jpeg",
+    "png": "image/png",
+    "mp4": "video/mp4",
+    "webm": "video/webm",
+    "avi": "video/x-msvideo",
+}
+
+
+class BlobStore:
+    """Hash-named, sharded, reference-counted upload objects"""
+
+    def __init__(self, backend: StorageBackend, spool_dir: Optional[str] = None):
+        self.backend = backend
+        # Uploads are spooled locally until their hash is known
+        self.spool_dir = spool_dir or os.path.join(settings.UPLOAD_DIR, "blobs", ".incoming")
+
+    @staticmethod
+    def blob_name(sha256: str, detected_type: str, revision: Optional[str] = None) -> str:
+        """File name of a blob (hash, revision if any, and canonical suffix)"""
+        stem = f"{sha256}-{revision}" if revision else sha256
+        return stem + DETECTED_TYPE_SUFFIX.get(detected_type, "")
+
+    def blob_key(self, sha256: str, detected_type: str, revision: Optional[str] = None) -> str:
+        """Storage key of a blob under the shard prefix"""
+        return f"blobs/{sha256[:2]}/{sha256[2:4]}/{self.blob_name(sha256, detected_type, revision)}"
+
+    @staticmethod
+    def media_path(key: str) -> str:
+        """Path of a stored object relative to the API root (served by /media)"""
+        return f"media/{key}"
+
+    def incoming_path(self) -> str:
+        """Unique temporary path for an upload whose hash is not known yet"""
+        os.makedirs(self.spool_dir, exist_ok=True)
+        return os.path.join(self.spool_dir, uuid.uuid4().hex)
+
+    @staticmethod
+    def discard(temp_path: Optional[str]):
+        """Remove a temporary upload that was never committed"""
+        if temp_path:
+            try:
+                os.remove(temp_path)
+            except OSError:
+                pass
+
+    async def commit(self, temp_path: str, sha256: str, detected_type: str, size_bytes: int) -> Dict[str, Any]:
+        """
+        Move an uploaded file into storage and take a reference on it
+
+        Args:
+            temp_path: Fully written temporary file from incoming_path()
+            sha256: Content hash
+            detected_type: Sniffed media type
+            size_bytes: File size
+
+        Returns:
+            Blob record (key, detected_type, size_bytes, ref_count and any
+            derivatives)
+        """
+        key = self.blob_key(sha256, detected_type)
+        blobs_collection = await get_blobs_collection()
+        blob = await blobs_collection.find_one_and_update(
+            {"_id": sha256},
+            {
+                "$inc": {"ref_count": 1},
+                "$setOnInsert": {
+                    "key": key,
+                    "detected_type": detected_type,
+                    "size_bytes": size_bytes,
+                    "created_at": datetime.utcnow()
+                }
+            },
+            upsert=True,
+            return_document=ReturnDocument.AFTER
+        )
+
+        if blob.get("deleting"):
+            # A release is deleting (or died deleting) the current objects;
+            # move the record to a fresh key instead of waiting for it
+            taken_over = await blobs_collection.find_one_and_update(
+                {"_id": sha256, "deleting": blob["deleting"]},
+                {
+                    "$set": {"key": self.blob_key(sha256, detected_type, uuid.uuid4().hex[:8])},
+                    "$unset": {"deleting": "", "derivatives": ""}
+                },
+                return_document=ReturnDocument.AFTER
+            )
+            # Otherwise a concurrent commit already took it over
+            blob = taken_over or await blobs_collection.find_one({"_id": sha256})
+
+        loop = asyncio.get_running_loop()
+        if await loop.run_in_executor(None, self.backend.exists, blob["key"]):
+            # Identical content is already stored
+            self.discard(temp_path)
+        else:
+            await loop.run_in_executor(
+                None, self.backend.put_file, blob["key"], temp_path,
+                DETECTED_TYPE_CONTENT_TYPE.get(detected_type)
+            )
+        return blob
+
+    async def release(self, sha256: str) -> bool:
+        """
+        Drop one reference and delete the object when none are left
+
+        Args:
+            sha256: Content hash
+
+        Returns:
+            False if the hash is not in the store (pre-blob uploads)
+        """
+        blobs_collection = await get_blobs_collection()
+        blob = await blobs_collection.find_one_and_update(
+            {"_id": sha256},
+            {"$inc": {"ref_count": -1}},
+            return_document=ReturnDocument.AFTER
+        )
+        if blob is None:
+            return False
+
+        if blob["ref_count"] <= 0:
+            # Mark the record while the objects are deleted, so a concurrent
+            # commit of the same content moves to a new key instead of
+            # trusting exists()
+            token = uuid.uuid4().hex
+            claimed = await blobs_collection.find_one_and_update(
+                {"_id": sha256, "ref_count": {"$lte": 0}, "deleting": {"$exists": False}},
+                {"$set": {"deleting": {"token": token, "at": datetime.utcnow()}}},
+                return_document=ReturnDocument.AFTER
+            )
+            if claimed:
+                loop = asyncio.get_running_loop()
+                for key in [claimed["key"], *claimed.get("derivatives", {}).values()]:
+                    try:
+                        await loop.run_in_executor(None, self.backend.delete, key)
+                    except Exception as e:
+                        logger.warning(f"Could not delete blob object {key}: {e}")
+                # The record goes only after its objects, and only if no commit took it over
+                await blobs_collection.delete_one({"_id": sha256, "deleting.token": token})
+        return True
+
+
+# Global blob store instance
+blob_store = BlobStore(storage)
@@ -0,0 +1,138 @@
+"""
+Thumbnail and preview derivatives for uploaded images
+
+After a report is stored, a background task renders a small thumbnail and a
+medium preview of the image and stores them next to the original blob
+(blobs/<aa>/<bb>/<sha256>.thumb.webp, ...). Dashboards load these instead of
+full-resolution originals. Derivatives are content-addressed like the
+original, so identical uploads render them once.
+"""
+
+import asyncio
+import io
+import logging
+import os
+from typing import Dict
+
+from bson import ObjectId
+from PIL import Image, ImageOps, features
+
+from ..core.config import settings
+from ..core.database import get_blobs_collection, get_reports_collection
+from .blob_store import blob_store
+
+logger = logging.getLogger(__name__)
+
+# Derivative name -> report field holding its media path
+DERIVATIVE_FIELDS = {
+    "thumb": "thumbnail_path",
+    "preview": "preview_path",
+}
+
+
+class DerivativeService:
+    """Renders and stores downscaled copies of report images"""
+
+    def __init__(self):
+        use_webp = settings.DERIVATIVE_FORMAT.lower() == "webp" and features.check("webp")
+        self.format = "WEBP" if use_webp else "JPEG"
+        self.suffix = ".webp" if use_webp else ".jpg"
+        self.content_type = "image/webp" if use_webp else "image/jpeg"
+
+    def _sizes(self) -> Dict[str, int]:
+        return {"thumb": settings.THUMBNAIL_SIZE, "preview": settings.PREVIEW_SIZE}
+
+    def render(self, img: Image.Image) -> Dict[str, bytes]:
+        """
+        Encode every derivative of an image
+
+        Args:
+            img: Decoded PIL image
+
+        Returns:
+            Dict of derivative name -> encoded bytes
+        """
+        # Phone photos are stored sideways with an EXIF orientation tag
+        img = ImageOps.exif_transpose(img).convert("RGB")
+        rendered = {}
+        # Largest first, so each smaller size downsamples the previous one
+        for name, size in sorted(self._sizes().items(), key=lambda item: -item[1]):
+            img = img.copy()
+            img.thumbnail((size, size), Image.Resampling.LANCZOS)
+            buffer = io.BytesIO()
+            if self.format == "WEBP":
+                img.save(buffer, "WEBP", quality=settings.DERIVATIVE_QUALITY, method=4)
+            else:
+                img.save(buffer, "JPEG", quality=settings.DERIVATIVE_QUALITY, optimize=True, progressive=True)
+            rendered[name] = buffer.getvalue()
+        return rendered
+
+    def _store(self, key: str, data: bytes):
+        temp_path = blob_store.incoming_path()
+        with open(temp_path, "wb") as f:
+            f.write(data)
+        blob_store.backend.put_file(key, temp_path, self.content_type)
+
+    async def ensure_derivatives(self, sha256: str, img: Image.Image) -> Dict[str, str]:
+        """
+        Render and store derivatives for a blob unless they already exist
+
+        Args:
+            sha256: Content hash of the original
+            img: Decoded original image
+
+        Returns:
+            Dict of derivative name -> storage key
+        """
+        blobs_collection = await get_blobs_collection()
+        blob = await blobs_collection.find_one({"_id": sha256})
+        if blob is None:
+            return {}
+        if blob.get("derivatives"):
+            return blob["derivatives"]
+
+        loop = asyncio.get_running_loop()
+        rendered = await loop.run_in_executor(None, self.render, img)
+
+        base = os.path.splitext(blob["key"])[0]
+        keys = {}
+        for name, data in rendered.items():
+            keys[name] = f"{base}.{name}{self.suffix}"
+            await loop.run_in_executor(None, self._store, keys[name], data)
+
+        await blobs_collection.update_one({"_id": sha256}, {"$set": {"derivatives": keys}})
+        return keys
+
+    async def attach_to_report(self, report_id: str, sha256: str, img: Image.Image):
+        """
+        Background task: make derivatives and record their paths on a report
+
+        Args:
+            report_id: Stored report ID
+            sha256: Content hash of the report image
+            img: Decoded report image
+        """
+        try:
+            keys = await self.ensure_derivatives(sha256, img)
+            if not keys:
+                return
+            reports_collection = await get_reports_collection()
+            await reports_collection.update_one(
+                {"_id": ObjectId(report_id)},
+                {"$set": self.report_fields(keys)}
+            )
+        except Exception as e:
+            logger.warning(f"Could not create derivatives for report {report_id}: {e}")
+
+    @staticmethod
+    def report_fields(keys: Dict[str, str]) -> Dict[str, str]:
+        """Report fields (media paths) for derivative storage keys"""
+        return {
+            field: blob_store.media_path(keys[name])
+            for name, field in DERIVATIVE_FIELDS.items()
+            if name in keys
+        }
+
+
+# Global derivative service instance
+derivative_service = DerivativeService()
@@ -0,0 +1,206 @@
+"""
+Near-duplicate image index over report perceptual hashes
+
+Keeps a BK-tree of 64-bit image hashes keyed by Hamming distance, so a new
+upload can be matched against every stored report image in sub-linear time
+and reuse the earlier prediction instead of running the CNN again.
+
+The index lives in process memory and is seeded from the stored image_phash
+of every report when the application starts. With several workers each one
+has its own copy: a report indexed or deleted by another worker is only
+seen after a restart. A match on a report that no longer exists is dropped
+when the upload path fails to load it, so a stale entry costs one CNN run,
+never a wrong prediction.
+"""
+
+import logging
+import threading
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+
+from ..core.config import settings
+from ..core.database import get_reports_collection
+
+logger = logging.getLogger(__name__)
+
+
+class BKTree:
+    """Burkhard-Keller tree over integer hashes with Hamming distance"""
+
+    def __init__(self):
+        # Node: [hash, [report_ids], {distance: child_node}]
+        self._root: Optional[list] = None
+        self.size = 0
+        self.nodes = 0
+
+    def add(self, value: int, report_id: str):
+        """Insert a hash (identical hashes share one node)"""
+        self.size += 1
+        if self._root is None:
+            self._root = [value, [report_id], {}]
+            self.nodes += 1
+            return
+
+        node = self._root
+        while True:
+            distance = (node[0] ^ value).bit_count()
+            if distance == 0:
+                node[1].append(report_id)
+                return
+            child = node[2].get(distance)
+            if child is None:
+                node[2][distance] = [value, [report_id], {}]
+                self.nodes += 1
+                return
+            node = child
+
+    def remove(self, value: int, report_id: str) -> bool:
+        """
+        Delete one entry
+
+        The node stays in place (its children are positioned relative to
+        it) even when no report is left on it; rebuild with entries() once
+        empty nodes dominate.
+
+        Returns:
+            False if the entry was not in the tree
+        """
+        node = self._root
+        while node is not None:
+            distance = (node[0] ^ value).bit_count()
+            if distance == 0:
+                if report_id not in node[1]:
+                    return False
+                node[1].remove(report_id)
+                self.size -= 1
+                return True
+            node = node[2].get(distance)
+        return False
+
+    def entries(self) -> Iterator[Tuple[int, str]]:
+        """All (hash, report_id) entries"""
+        stack = [self._root] if self._root is not None else []
+        while stack:
+            node = stack.pop()
+            for report_id in node[1]:
+                yield node[0], report_id
+            stack.extend(node[2].values())
+
+    def search(self, value: int, radius: int) -> List[Tuple[int, str]]:
+        """
+        All entries within a Hamming radius
+
+        Args:
+            value: Query hash
+            radius: Maximum Hamming distance (inclusive)
+
+        Returns:
+            List of (distance, report_id), nearest first
+        """
+        if self._root is None:
+            return []
+
+        matches = []
+        stack = [self._root]
+        while stack:
+            node = stack.pop()
+            distance = (node[0] ^ value).bit_count()
+            if distance <= radius:
+                matches.extend((distance, report_id) for report_id in node[1])
+            # Triangle inequality: only subtrees in [d - r, d + r] can match
+            for child_distance, child in node[2].items():
+                if distance - radius <= child_distance <= distance + radius:
+                    stack.append(child)
+
+        matches.sort()
+        return matches
+
+
+class ImageHashIndex:
+    """Per-process near-duplicate index, seeded from stored reports at startup"""
+
+    def __init__(self):
+        self._tree = BKTree()
+        self._hashes: Dict[str, int] = {}
+        # Reports deleted while load() is still reading them from the database
+        self._removed_while_loading: Set[str] = set()
+        self._lock = threading.Lock()
+        self._loading = False
+        self._loaded = False
+
+    async def load(self):
+        """Seed the tree from reports that already carry an image hash (run once at startup)"""
+        with self._lock:
+            if self._loading or self._loaded:
+                return
+            self._loading = True
+        try:
+            reports_collection = await get_reports_collection()
+            cursor = reports_collection.find(
+                {"image_phash": {"$ne": None}, "near_duplicate_of": None},
+                {"image_phash": 1}
+            )
+            count = 0
+            async for report in cursor:
+                report_id = str(report["_id"])
+                with self._lock:
+                    if report_id not in self._removed_while_loading:
+                        self._add(int(report["image_phash"], 16), report_id)
+                        count += 1
+            with self._lock:
+                self._loaded = True
+            logger.info(f"Image hash index loaded with {count} entries")
+        except Exception as e:
+            logger.error(f"Could not load image hash index: {e}")
+        finally:
+            with self._lock:
+                self._loading = False
+                self._removed_while_loading.clear()
+
+    def _add(self, value: int, report_id: str):
+        if report_id not in self._hashes:
+            self._hashes[report_id] = value
+            self._tree.add(value, report_id)
+
+    def add(self, image_phash: str, report_id: str):
+        """Index a report image"""
+        with self._lock:
+            self._add(int(image_phash, 16), report_id)
+
+    def remove(self, report_id: str):
+        """Stop matching a deleted report"""
+        with self._lock:
+            if self._loading:
+                self._removed_while_loading.add(report_id)
+            value = self._hashes.pop(report_id, None)
+            if value is None:
+                return
+            self._tree.remove(value, report_id)
+            # Emptied nodes still route searches; rebuild once they outnumber live entries
+            if self._tree.nodes > 2 * self._tree.size + 64:
+                tree = BKTree()
+                for entry_value, entry_id in self._tree.entries():
+                    tree.add(entry_value, entry_id)
+                self._tree = tree
+
+    def find_match(self, image_phash: str, radius: Optional[int] = None) -> Optional[Dict[str, object]]:
+        """
+        Closest indexed report within the Hamming radius
+
+        Args:
+            image_phash: Hex perceptual hash of the new image
+            radius: Override for IMAGE_HASH_MAX_DISTANCE
+
+        Returns:
+            {"report_id", "distance"} or None (reports not loaded yet never match)
+        """
+        radius = settings.IMAGE_HASH_MAX_DISTANCE if radius is None else radius
+        with self._lock:
+            matches = self._tree.search(int(image_phash, 16), radius)
+        if matches:
+            distance, report_id = matches[0]
+            return {"report_id": report_id, "distance": distance}
+        return None
+
+
+# Global image hash index
+image_hash_index = ImageHashIndex()
@@ -0,0 +1,157 @@
+"""
+Duplicate-incident clustering for incoming accident reports
+
+Reports submitted close together in space and time (several bystanders
+reporting the same crash) are attached to one incident so the admin queue
+can review them together instead of one by one.
+
+Bystanders reporting at the same moment can each find no incident and open
+their own. Every new incident is therefore checked right after it is
+inserted: if an older open incident exists within the radius, the new one is
+marked merged_into it and its report joins the older incident instead.
+"""
+
+import logging
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional
+
+from bson import ObjectId
+
+from ..core.config import settings
+from ..core.database import get_incidents_collection, get_reports_collection
+from ..core.geo import EARTH_RADIUS_KM, geojson_point
+
+logger = logging.getLogger(__name__)
+
+# Merge chains are short (one hop per concurrent opener); this only bounds a loop
+MAX_MERGE_HOPS = 8
+
+
+class IncidentService:
+    """Matches new reports to recent nearby incidents via a 2dsphere query"""
+
+    async def find_incident(self, latitude: float, longitude: float, reported_at: datetime) -> Optional[Dict[str, Any]]:
+        """
+        Find the oldest open incident within the configured radius and window
+
+        Oldest means first inserted (lowest ObjectId), so every report that
+        sees the same candidates agrees on which incident survives.
+
+        Args:
+            latitude: Report latitude
+            longitude: Report longitude
+            reported_at: Report creation time
+
+        Returns:
+            Incident document or None
+        """
+        point = geojson_point(latitude, longitude)
+        if point is None:
+            return None
+
+        incidents_collection = await get_incidents_collection()
+        cursor = incidents_collection.find({
+            "location_geo": {
+                "$geoWithin": {
+                    "$centerSphere": [point["coordinates"], settings.INCIDENT_RADIUS_METERS / (EARTH_RADIUS_KM * 1000)]
+                }
+            },
+            "last_reported_at": {"$gte": reported_at - timedelta(minutes=settings.INCIDENT_WINDOW_MINUTES)},
+            "merged_into": {"$exists": False}
+        }).sort("_id", 1).limit(1)
+        incidents = await cursor.to_list(length=1)
+        return incidents[0] if incidents else None
+
+    async def assign_incident(self, latitude: float, longitude: float, reported_at: datetime,
+                              report_id: ObjectId) -> Dict[str, Any]:
+        """
+        Attach a new report to an existing incident or open a new one
+
+        Args:
+            latitude: Report latitude
+            longitude: Report longitude
+            reported_at: Report creation time
+            report_id: ID the report will be inserted with
+
+        Returns:
+            Dict with incident_id, duplicate_of (the first report of the
+            incident) and new_incident
+        """
+        point = geojson_point(latitude, longitude)
+        if point is None:
+            return {"incident_id": None, "duplicate_of": None, "new_incident": False}
+
+        incident = await self.find_incident(latitude, longitude, reported_at)
+        if incident:
+            return self._joined(incident)
+
+        incidents_collection = await get_incidents_collection()
+        result = await incidents_collection.insert_one({
+            "location": {"latitude": latitude, "longitude": longitude},
+            "location_geo": point,
+            "primary_report_id": str(report_id),
+            "report_count": 0,
+            "first_reported_at": reported_at,
+            "last_reported_at": reported_at
+        })
+
+        # A concurrent report of the same crash may have opened one too; the oldest wins
+        oldest = await self.find_incident(latitude, longitude, reported_at)
+        if oldest and oldest["_id"] != result.inserted_id:
+            await incidents_collection.update_one(
+                {"_id": result.inserted_id},
+                {"$set": {"merged_into": oldest["_id"]}}
+            )
+            return self._joined(oldest)
+
+        return {"incident_id": str(result.inserted_id), "duplicate_of": None, "new_incident": True}
+
+    @staticmethod
+    def _joined(incident: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            "incident_id": str(incident["_id"]),
+            "duplicate_of": incident.get("primary_report_id"),
+            "new_incident": False
+        }
+
+    async def add_report(self, incident_id: str, report_id: str, reported_at: datetime) -> Dict[str, Any]:
+        """
+        Record a stored report as evidence for an incident
+
+        If the incident was merged into an older one after the report was
+        assigned, the report is moved to the surviving incident.
+
+        Args:
+            incident_id: Incident ID
+            report_id: Inserted report ID
+            reported_at: Report creation time
+
+        Returns:
+            Dict with the report's final incident_id and duplicate_of
+        """
+        incidents_collection = await get_incidents_collection()
+        incident = await incidents_collection.find_one({"_id": ObjectId(incident_id)})
+        for _ in range(MAX_MERGE_HOPS):
+            if not incident or not incident.get("merged_into"):
+                break
+            incident = await incidents_collection.find_one({"_id": incident["merged_into"]})
+        if incident is None:
+            return {"incident_id": incident_id, "duplicate_of": None}
+
+        await incidents_collection.update_one(
+            {"_id": incident["_id"]},
+            {"$inc": {"report_count": 1}, "$max": {"last_reported_at": reported_at}}
+        )
+
+        assignment = {
+            "incident_id": str(incident["_id"]),
+            "duplicate_of": None if incident.get("primary_report_id") == report_id else incident.get("primary_report_id")
+        }
+        if assignment["incident_id"] != incident_id:
+            reports_collection = await get_reports_collection()
+            await reports_collection.update_one({"_id": ObjectId(report_id)}, {"$set": assignment})
+        return assignment
+
+
+# Global incident service instance
+incident_service = IncidentService()
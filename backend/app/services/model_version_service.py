@@ -0,0 +1,83 @@
+"""
+Model version registry
+
+Predictions used to embed the model's test metrics (model_performance) in
+every report. They are now stored once per model version in the
+model_versions collection and reports keep only prediction.model_version.
+"""
+
+import logging
+from datetime import datetime
+from typing import Any, Dict, List, Set
+
+from ..core.database import get_model_versions_collection, get_reports_collection
+
+logger = logging.getLogger(__name__)
+
+
+class ModelVersionService:
+    """Stores model performance metadata once per model version"""
+
+    def __init__(self):
+        self._recorded: Set[str] = set()
+
+    async def strip_performance(self, prediction: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Move model_performance out of a prediction into the registry
+
+        Args:
+            prediction: Predictor output
+
+        Returns:
+            The prediction without model_performance
+        """
+        performance = prediction.pop("model_performance", None)
+        version = prediction.get("model_version")
+        if performance and version and version not in self._recorded:
+            versions_collection = await get_model_versions_collection()
+            await versions_collection.update_one(
+                {"_id": version},
+                {
+                    "$set": {"performance": performance, "method": prediction.get("method")},
+                    "$setOnInsert": {"first_seen_at": datetime.utcnow()}
+                },
+                upsert=True
+            )
+            self._recorded.add(version)
+        return prediction
+
+    async def list_versions(self) -> List[Dict[str, Any]]:
+        """All registered model versions with their performance metadata"""
+        versions_collection = await get_model_versions_collection()
+        versions = await versions_collection.find().sort("first_seen_at", -1).to_list(length=None)
+        for version in versions:
+            version["model_version"] = version.pop("_id")
+        return versions
+
+    async def migrate_embedded_performance(self):
+        """Register and remove model_performance copies stored in older reports"""
+        reports_collection = await get_reports_collection()
+        query = {"prediction.model_performance": {"$exists": True}}
+        legacy = await reports_collection.aggregate([
+            {"$match": query},
+            {"$group": {
+                "_id": {"$ifNull": ["$prediction.model_version", "unknown"]},
+                "performance": {"$first": "$prediction.model_performance"},
+                "method": {"$first": "$prediction.method"}
+            }}
+        ]).to_list(length=None)
+        if not legacy:
+            return
+
+        for entry in legacy:
+            await self.strip_performance({
+                "model_version": entry["_id"],
+                "model_performance": entry["performance"],
+                "method": entry.get("method")
+            })
+        result = await reports_collection.update_many(query, {"$unset": {"prediction.model_performance": ""}})
+        logger.info(f"Moved model performance of {result.modified_count} reports to model_versions")
+
+
+# Global model version service instance
+model_version_service = ModelVersionService()
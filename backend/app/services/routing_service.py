@@ -0,0 +1,445 @@
+"""
+Offline road-network routing for ambulance ETA estimation
+
+Loads a drivable road graph from a local OpenStreetMap XML extract (.osm or
+.osm.gz) and answers hospital-to-accident shortest-path queries with A*
+guided by an ALT (landmarks + triangle inequality) lower bound. The landmark
+index is precomputed once and persisted next to the extract, so restarts do
+not pay for it again. No network access is needed at any point.
+"""
+
+import gzip
+import heapq
+import json
+import logging
+import os
+import pickle
+import threading
+import xml.etree.ElementTree as ET
+from array import array
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from ..core.config import settings
+from ..core.geo import geohash_encode, haversine_km, haversine_one_to_many
+
+logger = logging.getLogger(__name__)
+
+INF = float("inf")
+
+# Bump when the pickled index layout changes
+INDEX_FORMAT_VERSION = 1
+
+# Grid used to snap coordinates onto the nearest graph node
+SNAP_CELL_DEGREES = 0.01
+SNAP_MAX_RINGS = 3
+
+# Free-flow speeds (km/h) used when a way has no usable maxspeed tag
+HIGHWAY_SPEEDS_KMH = {
+    "motorway": 80,
+    "motorway_link": 50,
+    "trunk": 70,
+    "trunk_link": 45,
+    "primary": 55,
+    "primary_link": 40,
+    "secondary": 45,
+    "secondary_link": 35,
+    "tertiary": 40,
+    "tertiary_link": 30,
+    "unclassified": 30,
+    "residential": 25,
+    "living_street": 10,
+    "service": 15,
+    "road": 30,
+}
+
+
+def _parse_maxspeed(value: Optional[str]) -> Optional[float]:
+    """Parse an OSM maxspeed tag into km/h (None if not numeric)"""
+    if not value:
+        return None
+    value = value.strip().lower()
+    try:
+        if value.endswith("mph"):
+            return float(value[:-3].strip()) * 1.609
+        return float(value.split()[0])
+    except (ValueError, IndexError):
+        return None
+
+
+class RoadGraph:
+    """Directed road graph with ALT landmark distance tables"""
+
+    def __init__(self):
+        self.lats = array("d")
+        self.lons = array("d")
+        # adjacency[u] = [(v, travel_seconds, meters), ...]
+        self.adjacency: List[List[Tuple[int, float, float]]] = []
+        self.reverse: List[List[Tuple[int, float, float]]] = []
+        # landmark_from[i][v] = d(L_i, v); landmark_to[i][v] = d(v, L_i)
+        self.landmarks: List[int] = []
+        self.landmark_from: List[array] = []
+        self.landmark_to: List[array] = []
+        self._grid: Dict[Tuple[int, int], List[int]] = {}
+
+    @property
+    def node_count(self) -> int:
+        return len(self.lats)
+
+    @classmethod
+    def from_osm(cls, osm_path: str) -> "RoadGraph":
+        """
+        Build a graph from an OSM XML extract
+
+        Args:
+            osm_path: Path to a .osm or .osm.gz file
+
+        Returns:
+            Road graph containing only nodes referenced by drivable ways
+        """
+        opener = gzip.open if osm_path.endswith(".gz") else open
+        osm_nodes: Dict[str, Tuple[float, float]] = {}
+        ways: List[Tuple[List[str], float, int]] = []
+
+        with opener(osm_path, "rb") as f:
+            for _, elem in ET.iterparse(f, events=("end",)):
+                if elem.tag == "node":
+                    osm_nodes[elem.get("id")] = (float(elem.get("lat")), float(elem.get("lon")))
+                    elem.clear()
+                elif elem.tag == "way":
+                    tags = {t.get("k"): t.get("v") for t in elem.iter("tag")}
+                    highway = tags.get("highway")
+                    if highway in HIGHWAY_SPEEDS_KMH:
+                        refs = [nd.get("ref") for nd in elem.iter("nd")]
+                        speed = _parse_maxspeed(tags.get("maxspeed")) or HIGHWAY_SPEEDS_KMH[highway]
+                        oneway = tags.get("oneway", "yes" if highway == "motorway" else "no")
+                        direction = -1 if oneway == "-1" else (1 if oneway in ("yes", "1", "true") else 0)
+                        ways.append((refs, speed, direction))
+                    elem.clear()
+                elif elem.tag == "relation":
+                    elem.clear()
+
+        graph = cls()
+        index: Dict[str, int] = {}
+
+        def node_index(ref: str) -> int:
+            idx = index.get(ref)
+            if idx is None:
+                lat, lon = osm_nodes[ref]
+                idx = len(graph.lats)
+                index[ref] = idx
+                graph.lats.append(lat)
+                graph.lons.append(lon)
+                graph.adjacency.append([])
+                graph.reverse.append([])
+            return idx
+
+        for refs, speed_kmh, direction in ways:
+            refs = [ref for ref in refs if ref in osm_nodes]
+            meters_per_second = speed_kmh / 3.6
+            for a_ref, b_ref in zip(refs, refs[1:]):
+                a = node_index(a_ref)
+                b = node_index(b_ref)
+                meters = haversine_km(graph.lats[a], graph.lons[a], graph.lats[b], graph.lons[b]) * 1000
+                seconds = meters / meters_per_second
+                if direction >= 0:
+                    graph._add_edge(a, b, seconds, meters)
+                if direction <= 0:
+                    graph._add_edge(b, a, seconds, meters)
+
+        graph._build_grid()
+        logger.info(f"Road graph loaded: {graph.node_count} nodes from {len(ways)} ways")
+        return graph
+
+    def _add_edge(self, u: int, v: int, seconds: float, meters: float):
+        self.adjacency[u].append((v, seconds, meters))
+        self.reverse[v].append((u, seconds, meters))
+
+    def _build_grid(self):
+        self._grid = {}
+        for idx in range(self.node_count):
+            cell = (int(self.lats[idx] // SNAP_CELL_DEGREES), int(self.lons[idx] // SNAP_CELL_DEGREES))
+            self._grid.setdefault(cell, []).append(idx)
+
+    def nearest_node(self, latitude: float, longitude: float) -> Optional[int]:
+        """Snap a coordinate to the closest graph node within a few grid rings"""
+        cell_lat = int(latitude // SNAP_CELL_DEGREES)
+        cell_lon = int(longitude // SNAP_CELL_DEGREES)
+
+        for ring in range(SNAP_MAX_RINGS + 1):
+            candidates = []
+            for d_lat in range(-ring, ring + 1):
+                for d_lon in range(-ring, ring + 1):
+                    if max(abs(d_lat), abs(d_lon)) == ring:
+                        candidates.extend(self._grid.get((cell_lat + d_lat, cell_lon + d_lon), ()))
+            if candidates:
+                candidates = np.asarray(candidates)
+                distances = haversine_one_to_many(
+                    latitude, longitude,
+                    np.frombuffer(self.lats)[candidates], np.frombuffer(self.lons)[candidates]
+                )
+                return int(candidates[np.argmin(distances)])
+        return None
+
+    def _dijkstra(self, source: int, edges: List[List[Tuple[int, float, float]]]) -> array:
+        dist = array("d", [INF]) * self.node_count
+        dist[source] = 0.0
+        heap = [(0.0, source)]
+        while heap:
+            d, u = heapq.heappop(heap)
+            if d > dist[u]:
+                continue
+            for v, seconds, _ in edges[u]:
+                nd = d + seconds
+                if nd < dist[v]:
+                    dist[v] = nd
+                    heapq.heappush(heap, (nd, v))
+        return dist
+
+    def build_landmarks(self, count: int):
+        """
+        Select landmarks by farthest-point sampling and precompute ALT tables
+
+        Args:
+            count: Number of landmarks (more = tighter bounds, more memory)
+        """
+        self.landmarks = []
+        self.landmark_from = []
+        self.landmark_to = []
+        if self.node_count == 0 or count <= 0:
+            return
+
+        seed = self._dijkstra(0, self.adjacency)
+        min_dist = [INF] * self.node_count
+        candidate = max(range(self.node_count), key=lambda v: seed[v] if seed[v] < INF else -1)
+
+        for _ in range(min(count, self.node_count)):
+            from_landmark = self._dijkstra(candidate, self.adjacency)
+            self.landmarks.append(candidate)
+            self.landmark_from.append(from_landmark)
+            self.landmark_to.append(self._dijkstra(candidate, self.reverse))
+
+            for v in range(self.node_count):
+                if from_landmark[v] < min_dist[v]:
+                    min_dist[v] = from_landmark[v]
+            reachable = [v for v in range(self.node_count) if min_dist[v] < INF]
+            if not reachable:
+                break
+            candidate = max(reachable, key=lambda v: min_dist[v])
+            if min_dist[candidate] == 0.0:
+                break
+
+        logger.info(f"ALT index built with {len(self.landmarks)} landmarks")
+
+    def _lower_bound(self, v: int, target_from: List[float], target_to: List[float]) -> float:
+        best = 0.0
+        for i in range(len(self.landmarks)):
+            d_from_v = self.landmark_from[i][v]
+            d_to_v = self.landmark_to[i][v]
+            if target_from[i] < INF and d_from_v < INF:
+                best = max(best, target_from[i] - d_from_v)
+            if target_to[i] < INF and d_to_v < INF:
+                best = max(best, d_to_v - target_to[i])
+        return best
+
+    def shortest_path(self, source: int, target: int) -> Optional[Tuple[float, float]]:
+        """
+        A* search with the ALT lower bound
+
+        Args:
+            source: Start node index
+            target: Destination node index
+
+        Returns:
+            (travel_seconds, meters) or None if target is unreachable
+        """
+        target_from = [table[target] for table in self.landmark_from]
+        target_to = [table[target] for table in self.landmark_to]
+
+        best: Dict[int, float] = {source: 0.0}
+        meters: Dict[int, float] = {source: 0.0}
+        heap = [(self._lower_bound(source, target_from, target_to), 0.0, source)]
+        closed = set()
+
+        while heap:
+            _, g, u = heapq.heappop(heap)
+            if u == target:
+                return g, meters[u]
+            if u in closed:
+                continue
+            closed.add(u)
+            for v, seconds, length in self.adjacency[u]:
+                ng = g + seconds
+                if ng < best.get(v, INF):
+                    best[v] = ng
+                    meters[v] = meters[u] + length
+                    heapq.heappush(heap, (ng + self._lower_bound(v, target_from, target_to), ng, v))
+        return None
+
+
+def load_hospitals() -> List[Dict[str, Any]]:
+    """
+    Load candidate hospitals
+
+    Reads HOSPITALS_FILE (JSON list of {"name", "latitude", "longitude"}) and
+    falls back to the single HOSPITAL_LAT/HOSPITAL_LON location.
+    """
+    if settings.HOSPITALS_FILE and os.path.exists(settings.HOSPITALS_FILE):
+        try:
+            with open(settings.HOSPITALS_FILE, "r") as f:
+                return [
+                    {
+                        "name": h.get("name", "Nearest Hospital"),
+                        "latitude": float(h["latitude"]),
+                        "longitude": float(h["longitude"]),
+                    }
+                    for h in json.load(f)
+                ]
+        except Exception as e:
+            logger.error(f"Could not load hospitals from {settings.HOSPITALS_FILE}: {e}")
+
+    return [{
+        "name": "Nearest Hospital",
+        "latitude": float(settings.HOSPITAL_LAT or "12.9716"),
+        "longitude": float(settings.HOSPITAL_LON or "77.5946"),
+    }]
+
+
+class RoutingService:
+    """Hospital-to-accident routing with a per (hospital, geocell) result cache"""
+
+    def __init__(self):
+        self.graph: Optional[RoadGraph] = None
+        self.hospitals = load_hospitals()
+        self._hospital_lats = np.array([h["latitude"] for h in self.hospitals])
+        self._hospital_lons = np.array([h["longitude"] for h in self.hospitals])
+        self._hospital_nodes: List[Optional[int]] = []
+        self._cache: "OrderedDict[Tuple[int, str], Optional[Tuple[float, float]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._load_lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        """True once a road graph is loaded"""
+        return self.graph is not None
+
+    def _index_path(self) -> str:
+        return settings.ROUTING_INDEX_PATH or f"{settings.ROUTING_OSM_PATH}.alt.pkl"
+
+    def load(self) -> bool:
+        """
+        Load the road graph and ALT index (blocking; run off the event loop)
+
+        Returns:
+            True if routing is available
+        """
+        osm_path = settings.ROUTING_OSM_PATH
+        if not osm_path or not os.path.exists(osm_path):
+            logger.info("Road-network routing disabled - ROUTING_OSM_PATH not set or missing")
+            return False
+
+        with self._load_lock:
+            if self.graph is not None:
+                return True
+
+            source_stamp = (os.path.getsize(osm_path), int(os.path.getmtime(osm_path)), settings.ROUTING_LANDMARKS)
+            index_path = self._index_path()
+            graph = None
+
+            try:
+                if os.path.exists(index_path):
+                    with open(index_path, "rb") as f:
+                        saved = pickle.load(f)
+                    if saved.get("version") == INDEX_FORMAT_VERSION and saved.get("source") == source_stamp:
+                        graph = saved["graph"]
+                        logger.info(f"Loaded precomputed routing index: {index_path}")
+            except Exception as e:
+                logger.warning(f"Ignoring unreadable routing index {index_path}: {e}")
+
+            if graph is None:
+                try:
+                    graph = RoadGraph.from_osm(osm_path)
+                    graph.build_landmarks(settings.ROUTING_LANDMARKS)
+                except Exception as e:
+                    logger.error(f"Could not build road graph from {osm_path}: {e}")
+                    return False
+                try:
+                    with open(index_path, "wb") as f:
+                        pickle.dump(
+                            {"version": INDEX_FORMAT_VERSION, "source": source_stamp, "graph": graph},
+                            f,
+                            protocol=pickle.HIGHEST_PROTOCOL,
+                        )
+                except Exception as e:
+                    logger.warning(f"Could not persist routing index to {index_path}: {e}")
+
+            self._hospital_nodes = [graph.nearest_node(h["latitude"], h["longitude"]) for h in self.hospitals]
+            self.graph = graph
+            return True
+
+    def _candidate_hospitals(self, latitude: float, longitude: float) -> List[int]:
+        """Indices of the hospitals closest in straight-line distance"""
+        distances = haversine_one_to_many(latitude, longitude, self._hospital_lats, self._hospital_lons)
+        return [int(i) for i in np.argsort(distances)[:max(1, settings.ROUTING_CANDIDATE_HOSPITALS)]]
+
+    def nearest_hospital(self, latitude: float, longitude: float) -> Dict[str, Any]:
+        """Configured hospital closest in straight-line distance (used when no route is available)"""
+        return self.hospitals[self._candidate_hospitals(latitude, longitude)[0]]
+
+    def _cached_route(self, hospital_idx: int, geocell: str, target: int) -> Optional[Tuple[float, float]]:
+        key = (hospital_idx, geocell)
+        with self._lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                return self._cache[key]
+
+        source = self._hospital_nodes[hospital_idx]
+        result = self.graph.shortest_path(source, target) if source is not None else None
+
+        with self._lock:
+            self._cache[key] = result
+            if len(self._cache) > settings.ROUTING_CACHE_SIZE:
+                self._cache.popitem(last=False)
+        return result
+
+    def route_to(self, latitude: float, longitude: float) -> Optional[Dict[str, Any]]:
+        """
+        Fastest road route from the candidate hospitals to a location
+
+        Args:
+            latitude: Accident latitude
+            longitude: Accident longitude
+
+        Returns:
+            Dict with hospital_name, travel_minutes and distance_km, or None
+            when routing is unavailable or the location is off the network
+        """
+        if self.graph is None:
+            return None
+
+        target = self.graph.nearest_node(latitude, longitude)
+        if target is None:
+            return None
+
+        geocell = geohash_encode(latitude, longitude, settings.ROUTING_GEOCELL_PRECISION)
+        best = None
+        for hospital_idx in self._candidate_hospitals(latitude, longitude):
+            route = self._cached_route(hospital_idx, geocell, target)
+            if route is not None and (best is None or route[0] < best[1][0]):
+                best = (hospital_idx, route)
+
+        if best is None:
+            return None
+
+        hospital_idx, (seconds, meters) = best
+        return {
+            "hospital_name": self.hospitals[hospital_idx]["name"],
+            "travel_minutes": seconds / 60,
+            "distance_km": meters / 1000,
+        }
+
+
+# Global routing service instance (graph is loaded at startup in the background)
+routing_service = RoutingService()
@@ -4,12 +4,15 @@ Handles sending SMS notifications for approved/rejected reports with ambulance E
 """
 
 import os
-import math
 import logging
 from typing import Dict, Any
 from datetime import datetime, timedelta
 from dotenv import load_dotenv
 
+from ..core.geo import haversine_km
+from ..core.metrics import timed
+from .routing_service import routing_service
+
 # Load environment variables
 load_dotenv()
 
@@ -41,34 +44,41 @@ class SMSService:
         """
         Calculate estimated ambulance arrival time based on location
         Returns ETA in minutes and distance in km
+        
+        Uses the offline road-network router when a map extract is loaded,
+        otherwise falls back to a straight-line estimate.
         """
         try:
-            # Simplified ETA calculation based on urban/rural classification
-            # In production, this would use real mapping APIs like Google Maps
-            
-            # For demo purposes, we'll use a simple distance-based calculation
-            # Assuming ambulance comes from nearest hospital at city center
-            
-            # Default city center coordinates (can be configured)
-            hospital_lat = os.getenv('HOSPITAL_LAT', '12.9716')  # Bangalore default
-            hospital_lon = os.getenv('HOSPITAL_LON', '77.5946')
-            
-            # Calculate distance using Haversine formula
-            distance_km = self._calculate_distance(
-                float(hospital_lat), float(hospital_lon),
-                latitude, longitude
-            )
+            route = routing_service.route_to(latitude, longitude)
             
-            # Average ambulance speed: 40 km/h in city, 80 km/h on highway
-            # Assume mixed conditions: 50 km/h average
-            avg_speed_kmh = 50
-            
-            # Calculate base ETA in minutes
-            eta_minutes = (distance_km / avg_speed_kmh) * 60
-            
-            # Add traffic factor (simplified)
-            traffic_factor = 1.2 if distance_km < 10 else 1.1  # More traffic in city
-            eta_minutes *= traffic_factor
+            if route:
+                distance_km = route['distance_km']
+                eta_minutes = route['travel_minutes']
+                hospital_name = route['hospital_name']
+                traffic_factor = 1.0
+                source = 'road_network'
+            else:
+                # Same hospital list as the router (HOSPITALS_FILE or HOSPITAL_LAT/HOSPITAL_LON)
+                hospital = routing_service.nearest_hospital(latitude, longitude)
+                hospital_name = hospital['name']
+                source = 'straight_line'
+                
+                # Calculate distance using Haversine formula
+                distance_km = self._calculate_distance(
+                    hospital['latitude'], hospital['longitude'],
+                    latitude, longitude
+                )
+                
+                # Average ambulance speed: 40 km/h in city, 80 km/h on highway
+                # Assume mixed conditions: 50 km/h average
+                avg_speed_kmh = 50
+                
+                # Calculate base ETA in minutes
+                eta_minutes = (distance_km / avg_speed_kmh) * 60
+                
+                # Add traffic factor (simplified)
+                traffic_factor = 1.2 if distance_km < 10 else 1.1  # More traffic in city
+                eta_minutes *= traffic_factor
             
             # Add preparation time (5 minutes for dispatch)
             eta_minutes += 5
@@ -80,7 +90,9 @@ class SMSService:
                 'eta_minutes': eta_minutes,
                 'distance_km': round(distance_km, 2),
                 'estimated_arrival': (datetime.now() + timedelta(minutes=eta_minutes)).strftime('%I:%M %p'),
-                'traffic_factor': traffic_factor
+                'traffic_factor': traffic_factor,
+                'hospital_name': hospital_name,
+                'source': source
             }
             
         except Exception as e:
@@ -90,24 +102,14 @@ class SMSService:
                 'eta_minutes': 15,
                 'distance_km': 5.0,
                 'estimated_arrival': (datetime.now() + timedelta(minutes=15)).strftime('%I:%M %p'),
-                'traffic_factor': 1.0
+                'traffic_factor': 1.0,
+                'hospital_name': 'Nearest Hospital',
+                'source': 'fallback'
             }
     
     def _calculate_distance(self, lat1: float, lon1: float, lat2: float, lon2: float) -> float:
         """Calculate distance between two coordinates using Haversine formula"""
-        R = 6371  # Earth's radius in kilometers
-        
-        lat_diff = math.radians(lat2 - lat1)
-        lon_diff = math.radians(lon2 - lon1)
-        
-        a = (math.sin(lat_diff / 2) ** 2 + 
-             math.cos(math.radians(lat1)) * math.cos(math.radians(lat2)) * 
-             math.sin(lon_diff / 2) ** 2)
-        
-        c = 2 * math.atan2(math.sqrt(a), math.sqrt(1 - a))
-        distance = R * c
-        
-        return distance
+        return haversine_km(lat1, lon1, lat2, lon2)
     
     def send_approval_notification(self, phone_number: str, report_data: Dict[str, Any]) -> bool:
         """
@@ -172,6 +174,7 @@ Thank you for your report"""
             logger.error(f"Error sending rejection notification: {e}")
             return False
     
+    @timed("sms", "send_sms")
     def _send_sms(self, phone_number: str, message: str) -> bool:
         """Send SMS using Twilio API"""
         try:
@@ -209,9 +212,7 @@ Thank you for your report"""
             return True
             
         except Exception as e:
-            logger.error(f"Error sending SMS via Twilio: {e}")
-            import traceback
-            traceback.print_exc()
+            logger.exception(f"Error sending SMS via Twilio: {e}")
             return False
     
     def send_judge_presentation_reminder(self, phone_number: str, judge_name: str = "Judge", presentation_time: str = None) -> bool:
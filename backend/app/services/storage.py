@@ -0,0 +1,153 @@
+"""
+Object storage backends for uploaded media
+
+The local driver keeps files under UPLOAD_DIR (single API node). The S3
+driver stores them in any S3-compatible bucket (AWS S3, MinIO), uploading
+with multipart transfers and handing out presigned GET URLs so clients
+download media straight from the bucket instead of through the API.
+"""
+
+import logging
+import os
+from typing import Optional
+
+from ..core.config import settings
+
+try:
+    import boto3
+    from boto3.s3.transfer import TransferConfig
+    from botocore.exceptions import ClientError
+    BOTO3_AVAILABLE = True
+except ImportError:
+    BOTO3_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+
+class StorageBackend:
+    """Interface shared by storage drivers (keys are '/'-separated paths)"""
+
+    name = "base"
+
+    def put_file(self, key: str, source_path: str, content_type: Optional[str] = None):
+        """Store a local file under key (the source file is consumed)"""
+        raise NotImplementedError
+
+    def exists(self, key: str) -> bool:
+        """Whether an object is stored under key"""
+        raise NotImplementedError
+
+    def delete(self, key: str):
+        """Delete an object (missing objects are ignored)"""
+        raise NotImplementedError
+
+    def local_path(self, key: str) -> Optional[str]:
+        """Filesystem path of an object, or None for remote backends"""
+        return None
+
+    def presigned_url(self, key: str, expires_in: Optional[int] = None) -> Optional[str]:
+        """Time-limited direct download URL, or None if unsupported"""
+        return None
+
+
+class LocalStorage(StorageBackend):
+    """Files under a local directory"""
+
+    name = "local"
+
+    def __init__(self, root: str):
+        self.root = root
+
+    def local_path(self, key: str) -> str:
+        path = os.path.normpath(os.path.join(self.root, *key.split("/")))
+        if os.path.commonpath([os.path.abspath(path), os.path.abspath(self.root)]) != os.path.abspath(self.root):
+            raise ValueError(f"Storage key escapes the upload directory: {key}")
+        return path
+
+    def put_file(self, key: str, source_path: str, content_type: Optional[str] = None):
+        path = self.local_path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        os.replace(source_path, path)
+
+    def exists(self, key: str) -> bool:
+        return os.path.exists(self.local_path(key))
+
+    def delete(self, key: str):
+        try:
+            os.remove(self.local_path(key))
+        except FileNotFoundError:
+            pass
+
+
+class S3Storage(StorageBackend):
+    """Objects in an S3-compatible bucket (set S3_ENDPOINT_URL for MinIO)"""
+
+    name = "s3"
+
+    def __init__(self):
+        if not BOTO3_AVAILABLE:
+            raise RuntimeError("STORAGE_BACKEND=s3 requires boto3 (pip install boto3)")
+        if not settings.S3_BUCKET:
+            raise RuntimeError("STORAGE_BACKEND=s3 requires S3_BUCKET")
+
+        self.bucket = settings.S3_BUCKET
+        self.client = boto3.client(
+            "s3",
+            endpoint_url=settings.S3_ENDPOINT_URL,
+            region_name=settings.S3_REGION,
+            aws_access_key_id=settings.S3_ACCESS_KEY_ID,
+            aws_secret_access_key=settings.S3_SECRET_ACCESS_KEY
+        )
+        chunk_size = settings.S3_MULTIPART_CHUNK_MB * 1024 * 1024
+        self.transfer_config = TransferConfig(
+            multipart_threshold=chunk_size,
+            multipart_chunksize=chunk_size,
+            use_threads=True
+        )
+        logger.info(f"Object storage: s3://{self.bucket} via {settings.S3_ENDPOINT_URL or 'AWS'}")
+
+    def put_file(self, key: str, source_path: str, content_type: Optional[str] = None):
+        extra_args = {"ContentType": content_type} if content_type else None
+        # upload_file streams the file in multipart chunks above the threshold
+        self.client.upload_file(
+            source_path, self.bucket, key,
+            ExtraArgs=extra_args,
+            Config=self.transfer_config
+        )
+        try:
+            os.remove(source_path)
+        except OSError:
+            pass
+
+    def exists(self, key: str) -> bool:
+        try:
+            self.client.head_object(Bucket=self.bucket, Key=key)
+            return True
+        except ClientError as e:
+            if e.response.get("Error", {}).get("Code") in ("404", "NoSuchKey", "NotFound"):
+                return False
+            raise
+
+    def delete(self, key: str):
+        self.client.delete_object(Bucket=self.bucket, Key=key)
+
+    def presigned_url(self, key: str, expires_in: Optional[int] = None) -> str:
+        return self.client.generate_presigned_url(
+            "get_object",
+            Params={"Bucket": self.bucket, "Key": key},
+            ExpiresIn=expires_in or settings.S3_PRESIGN_EXPIRES_SECONDS
+        )
+
+
+def create_storage() -> StorageBackend:
+    """Build the backend selected by STORAGE_BACKEND"""
+    backend = settings.STORAGE_BACKEND.lower()
+    if backend == "s3":
+        return S3Storage()
+    if backend != "local":
+        raise RuntimeError(f"Unknown STORAGE_BACKEND: {settings.STORAGE_BACKEND}")
+    return LocalStorage(settings.UPLOAD_DIR)
+
+
+# Global storage backend
+storage = create_storage()
@@ -0,0 +1,162 @@
+"""
+Streaming upload persistence
+
+Copies an uploaded file to disk in large chunks with aiofiles, enforcing
+MAX_UPLOAD_SIZE, hashing the content and sniffing its magic bytes in the
+same pass so the upload is read exactly once. Images can instead be kept in
+memory for inference while the disk write runs on a worker thread.
+"""
+
+import asyncio
+import hashlib
+import logging
+import os
+from typing import Any, Dict, Optional
+
+import aiofiles
+from fastapi import HTTPException, UploadFile, status
+
+from ..core.config import settings
+
+logger = logging.getLogger(__name__)
+
+UPLOAD_CHUNK_SIZE = 1024 * 1024  # 1 MB
+
+# Detected type -> file extensions it may be uploaded as
+DETECTED_TYPE_EXTENSIONS = {
+    "jpeg": {"jpg", "jpeg"},
+    "png": {"png"},
+    "mp4": {"mp4", "mov"},
+    "webm": {"webm"},
+    "avi": {"avi"},
+}
+
+
+def sniff_file_type(header: bytes) -> Optional[str]:
+    """
+    Identify a media type from the first bytes of a file
+
+    Args:
+        header: At least the first 12 bytes of the file
+
+    Returns:
+        One of DETECTED_TYPE_EXTENSIONS keys, or None if unrecognized
+    """
+    if header.startswith(b"\xff\xd8\xff"):
+        return "jpeg"
+    if header.startswith(b"\x89PNG\r\n\x1a\n"):
+        return "png"
+    if header[4:8] == b"ftyp":
+        return "mp4"  # ISO base media (mp4 and QuickTime mov)
+    if header.startswith(b"\x1a\x45\xdf\xa3"):
+        return "webm"
+    if header.startswith(b"RIFF") and header[8:12] == b"AVI ":
+        return "avi"
+    return None
+
+
+# Types small and decodable enough to keep in memory for in-process inference
+IMAGE_TYPES = {"jpeg", "png"}
+
+
+def _write_file(destination: str, content: bytes):
+    with open(destination, "wb") as f:
+        f.write(content)
+
+
+def _too_large(max_size: int) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+        detail=f"File too large. Maximum size is {max_size // (1024 * 1024)} MB"
+    )
+
+
+async def save_upload(
+    upload: UploadFile,
+    destination: str,
+    max_size: Optional[int] = None,
+    keep_in_memory: bool = False
+) -> Dict[str, Any]:
+    """
+    Stream an upload to disk
+
+    The first chunk is sniffed before anything is written, so uploads with
+    unsupported content never touch the disk.
+
+    Args:
+        upload: Uploaded file
+        destination: Target file path (partial files are removed on failure)
+        max_size: Size limit in bytes (defaults to MAX_UPLOAD_SIZE)
+        keep_in_memory: For images, return the bytes and write the file on a
+            worker thread instead of waiting for the write
+
+    Returns:
+        Dict with size_bytes, sha256 and detected_type. In keep_in_memory
+        mode images also carry "content" (bytes) and "write_future", which
+        the caller must await before relying on the file.
+
+    Raises:
+        HTTPException: 413 if the file is too large, 400 if the content is
+            not an allowed media type
+    """
+    max_size = settings.MAX_UPLOAD_SIZE if max_size is None else max_size
+
+    # Reject early when the multipart parser already knows the size
+    declared_size = getattr(upload, "size", None)
+    if declared_size is not None and declared_size > max_size:
+        raise _too_large(max_size)
+
+    chunk = await upload.read(UPLOAD_CHUNK_SIZE)
+    detected_type = sniff_file_type(chunk[:16])
+
+    allowed = settings.ALLOWED_EXTENSIONS
+    if detected_type is None or not DETECTED_TYPE_EXTENSIONS[detected_type] & set(allowed):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"File content is not a supported type. Allowed types: {', '.join(allowed)}"
+        )
+
+    digest = hashlib.sha256()
+    size = 0
+
+    if keep_in_memory and detected_type in IMAGE_TYPES:
+        chunks = []
+        while chunk:
+            size += len(chunk)
+            if size > max_size:
+                raise _too_large(max_size)
+            digest.update(chunk)
+            chunks.append(chunk)
+            chunk = await upload.read(UPLOAD_CHUNK_SIZE)
+
+        content = b"".join(chunks)
+        loop = asyncio.get_running_loop()
+        return {
+            "size_bytes": size,
+            "sha256": digest.hexdigest(),
+            "detected_type": detected_type,
+            "content": content,
+            "write_future": loop.run_in_executor(None, _write_file, destination, content),
+        }
+
+    async with aiofiles.open(destination, "wb") as buffer:
+        while chunk:
+            size += len(chunk)
+            if size > max_size:
+                break
+            digest.update(chunk)
+            await buffer.write(chunk)
+            chunk = await upload.read(UPLOAD_CHUNK_SIZE)
+
+    if size > max_size:
+        try:
+            os.remove(destination)
+        except OSError:
+            pass
+        raise _too_large(max_size)
+
+    return {
+        "size_bytes": size,
+        "sha256": digest.hexdigest(),
+        "detected_type": detected_type,
+    }
@@ -0,0 +1,283 @@
+"""
+Accident predictor benchmark
+
+Runs AccidentPredictor over the labelled test sets (test/accident,
+test/non-accident) and the unlabelled test_images samples and reports, in
+one run: cold-load time, per-image latency percentiles, throughput at
+several batch sizes, peak RSS and accuracy/precision/recall. Results are
+written as JSON in the same per-predictor layout as
+model_performance_test_results.json so runs can be diffed for regressions.
+
+Usage:
+    python benchmarks/inference_benchmark.py [--model models/enhanced_accident_model_v3.h5]
+        [--batch-sizes 1,2,4,8,16,32,64] [--repeat 3] [--output benchmark_results.json]
+        [--baseline previous_results.json] [--compiled data/compiled/test]
+
+--compiled takes a dataset built by `python -m ml_model.dataset_cache` and
+feeds the throughput pass from its memory-mapped arrays instead of decoding.
+"""
+
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+from datetime import datetime
+
+try:
+    import resource
+    RESOURCE_AVAILABLE = True
+except ImportError:  # Windows
+    RESOURCE_AVAILABLE = False
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, ROOT)
+
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".bmp", ".webp")
+LABELLED_DIRS = (("test/accident", True), ("test/non-accident", False))
+UNLABELLED_DIRS = ("test_images",)
+
+
+def list_images(directory):
+    path = os.path.join(ROOT, directory)
+    if not os.path.isdir(path):
+        return []
+    return [
+        os.path.join(path, name) for name in sorted(os.listdir(path))
+        if name.lower().endswith(IMAGE_EXTENSIONS)
+    ]
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process so far"""
+    if not RESOURCE_AVAILABLE:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is KiB on Linux and bytes on macOS
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, max(0, round(pct / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def latency_summary(timings):
+    timings = sorted(timings)
+    return {
+        "count": len(timings),
+        "mean_ms": sum(timings) / len(timings) * 1000 if timings else None,
+        "p50_ms": percentile(timings, 50) * 1000 if timings else None,
+        "p95_ms": percentile(timings, 95) * 1000 if timings else None,
+        "p99_ms": percentile(timings, 99) * 1000 if timings else None,
+        "max_ms": timings[-1] * 1000 if timings else None,
+    }
+
+
+def classification_metrics(labelled):
+    """Accuracy, precision, recall and F1 with accident as the positive class"""
+    tp = sum(1 for truth, predicted in labelled if truth and predicted)
+    fp = sum(1 for truth, predicted in labelled if not truth and predicted)
+    tn = sum(1 for truth, predicted in labelled if not truth and not predicted)
+    fn = sum(1 for truth, predicted in labelled if truth and not predicted)
+    precision = tp / (tp + fp) if tp + fp else 0.0
+    recall = tp / (tp + fn) if tp + fn else 0.0
+    return {
+        "samples": len(labelled),
+        "accuracy": (tp + tn) / len(labelled) if labelled else 0.0,
+        "precision": precision,
+        "recall": recall,
+        "f1_score": 2 * precision * recall / (precision + recall) if precision + recall else 0.0,
+        "confusion_matrix": {"tp": tp, "fp": fp, "tn": tn, "fn": fn},
+    }
+
+
+def per_image_pass(predictor, images, threshold):
+    """Single-image predict() calls, the way the API runs the model"""
+    predictions, timings, errors = [], [], 0
+    for image_path, label in images:
+        start = time.perf_counter()
+        result = predictor.predict(image_path, threshold=threshold)
+        elapsed = time.perf_counter() - start
+        timings.append(elapsed)
+        if result.get("method") == "error":
+            errors += 1
+        predictions.append({
+            "image": os.path.relpath(image_path, ROOT),
+            "label": None if label is None else ("accident" if label else "non-accident"),
+            "prediction": result["prediction"],
+            "confidence": result["confidence"],
+            "method": result["method"],
+            "time": elapsed,
+        })
+    return predictions, timings, errors
+
+
+def throughput_pass(predictor, arrays, batch_sizes, repeat):
+    """Images per second of model calls on already preprocessed inputs"""
+    import numpy as np
+
+    results = {}
+    for batch_size in batch_sizes:
+        batches = [
+            np.concatenate(arrays[start:start + batch_size], axis=0)
+            for start in range(0, len(arrays), batch_size)
+        ]
+        predictor.predict_arrays(batches[0])  # build the graph for this shape
+        best = None
+        for _ in range(repeat):
+            start = time.perf_counter()
+            for batch in batches:
+                predictor.predict_arrays(batch)
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        results[str(batch_size)] = {
+            "images": len(arrays),
+            "seconds": best,
+            "images_per_second": len(arrays) / best if best else None,
+            "ms_per_batch": best / len(batches) * 1000,
+        }
+    return results
+
+
+def compare(current, baseline_path, name):
+    """Print relative changes against a previous run of this script"""
+    with open(baseline_path, "r") as f:
+        baseline = json.load(f).get(name)
+    if not baseline or "latency" not in baseline:
+        print(f"  baseline has no '{name}' benchmark section, skipping comparison")
+        return
+    rows = [
+        ("cold load s", baseline["cold_load"]["seconds"], current["cold_load"]["seconds"]),
+        ("p50 ms", baseline["latency"]["p50_ms"], current["latency"]["p50_ms"]),
+        ("p95 ms", baseline["latency"]["p95_ms"], current["latency"]["p95_ms"]),
+        ("p99 ms", baseline["latency"]["p99_ms"], current["latency"]["p99_ms"]),
+        ("accuracy", baseline["classification"]["accuracy"], current["classification"]["accuracy"]),
+    ]
+    print(f"  vs {baseline_path}:")
+    for label, before, after in rows:
+        if before and after is not None:
+            print(f"    {label:<12} {before:10.3f} -> {after:10.3f}  ({(after - before) / before * 100:+.1f}%)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the accident predictor")
+    parser.add_argument("--model", default=None, help="Model .h5 path (predictor default if omitted)")
+    parser.add_argument("--name", default="Enhanced Predictor v3.0", help="Result key in the JSON output")
+    parser.add_argument("--batch-sizes", default="1,2,4,8,16,32,64", help="Comma-separated batch sizes")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed passes per batch size (best is kept)")
+    parser.add_argument("--threshold", type=float, default=0.5, help="Decision threshold")
+    parser.add_argument("--output", default="benchmark_results.json", help="JSON output path")
+    parser.add_argument("--baseline", default=None, help="Earlier output of this script to compare with")
+    parser.add_argument("--compiled", default=None, help="Compiled dataset for the throughput pass")
+    args = parser.parse_args()
+
+    batch_sizes = [int(size) for size in args.batch_sizes.split(",") if size.strip()]
+
+    labelled = [(path, label) for directory, label in LABELLED_DIRS for path in list_images(directory)]
+    unlabelled = [(path, None) for directory in UNLABELLED_DIRS for path in list_images(directory)]
+    images = labelled + unlabelled
+    if not images:
+        sys.exit("No benchmark images found under test/ or test_images/")
+
+    rss_before = peak_rss_mb()
+    start = time.perf_counter()
+    import tensorflow as tf  # noqa: F401  (import cost is part of a cold start)
+    import_seconds = time.perf_counter() - start
+    from ml_model.predict import AccidentPredictor
+
+    start = time.perf_counter()
+    predictor = AccidentPredictor(args.model)
+    load_seconds = time.perf_counter() - start
+
+    # First call pays for graph tracing; report it separately from the steady state
+    start = time.perf_counter()
+    predictor.predict(images[0][0], threshold=args.threshold)
+    first_prediction_seconds = time.perf_counter() - start
+
+    predictions, timings, errors = per_image_pass(predictor, images, args.threshold)
+    truth = {path: label for path, label in labelled}
+    scored = [
+        (truth[os.path.join(ROOT, p["image"])], p["prediction"] == "accident")
+        for p in predictions if p["label"] is not None and p["method"] != "error"
+    ]
+
+    arrays = []
+    if args.compiled:
+        from ml_model.dataset_cache import CompiledDataset
+        compiled = CompiledDataset(args.compiled)
+        arrays = [compiled.image(i)[None].astype("float32") / 255.0 for i in range(len(compiled))]
+    else:
+        for image_path, _ in images:
+            try:
+                arrays.append(predictor.preprocess_image(image_path))
+            except Exception:
+                continue
+    if arrays:
+        throughput = throughput_pass(predictor, arrays, batch_sizes, args.repeat)
+    else:
+        print("  no images could be preprocessed, skipping the throughput pass")
+        throughput = {}
+
+    result = {
+        # Same keys as model_performance_test_results.json
+        "total_predictions": len(predictions),
+        "errors": errors,
+        "avg_confidence": sum(p["confidence"] for p in predictions) / len(predictions),
+        "avg_time": sum(timings) / len(timings),
+        "total_time": sum(timings),
+        "predictions": predictions,
+        # Benchmark sections
+        "model_path": os.path.relpath(predictor.model_path, ROOT),
+        "cold_load": {
+            "seconds": import_seconds + load_seconds,
+            "tensorflow_import_seconds": import_seconds,
+            "model_load_seconds": load_seconds,
+            "first_prediction_seconds": first_prediction_seconds,
+        },
+        "latency": latency_summary(timings),
+        "throughput": throughput,
+        "memory": {
+            "peak_rss_mb": peak_rss_mb(),
+            "rss_before_load_mb": rss_before,
+        },
+        "classification": classification_metrics(scored),
+        "environment": {
+            "python": platform.python_version(),
+            "tensorflow": tf.__version__,
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "timestamp": datetime.now().isoformat(),
+        },
+    }
+
+    output = {}
+    if os.path.exists(args.output):
+        with open(args.output, "r") as f:
+            output = json.load(f)
+    output[args.name] = result
+    with open(args.output, "w") as f:
+        json.dump(output, f, indent=2)
+
+    latency = result["latency"]
+    metrics = result["classification"]
+    print(f"{args.name}: {len(predictions)} images ({len(scored)} labelled), {errors} errors")
+    print(f"  cold load   {result['cold_load']['seconds']:.2f} s "
+          f"(tensorflow {import_seconds:.2f} s, model {load_seconds:.2f} s, first call {first_prediction_seconds:.2f} s)")
+    print(f"  latency     p50 {latency['p50_ms']:.1f} ms   p95 {latency['p95_ms']:.1f} ms   p99 {latency['p99_ms']:.1f} ms")
+    for batch_size, row in throughput.items():
+        print(f"  batch {batch_size:>3}   {row['images_per_second']:8.1f} img/s   {row['ms_per_batch']:8.1f} ms/batch")
+    if result["memory"]["peak_rss_mb"] is not None:
+        print(f"  peak RSS    {result['memory']['peak_rss_mb']:.0f} MB")
+    print(f"  accuracy {metrics['accuracy']:.3f}   precision {metrics['precision']:.3f}   "
+          f"recall {metrics['recall']:.3f}   f1 {metrics['f1_score']:.3f}")
+    if args.baseline:
+        compare(result, args.baseline, args.name)
+    print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,385 @@
+"""
+Report API load test
+
+Drives the FastAPI app in-process with a closed-loop workload: N concurrent
+clients each pick an operation from a weighted mix (create a report, list
+/reports/all, /reports/stats/overview, approve, reject), wait for the
+response and pick the next one. Each concurrency level runs for a fixed
+time, so the output is a saturation curve: throughput and per-operation
+p50/p95/p99 latency as load grows.
+
+The ML model and Twilio are replaced by fakes that block for a configurable
+time, like the real calls do. The database is mongomock-motor by default
+or a real mongod with --mongo-url. Note that the approve/reject routes open
+their own pymongo client on localhost:27017; in mock mode that client is
+pointed at the same in-memory store.
+
+Timings are taken by an httpx client on the same event loop and include
+background tasks (thumbnail rendering), which a real server runs after the
+response has been sent.
+
+Usage:
+    python benchmarks/load_test.py [--concurrency 1,2,4,8,16,32] [--duration 10]
+        [--mix create=20,list=40,stats=25,approve=10,reject=5]
+        [--inference-ms 150] [--sms-ms 300] [--executor-workers 8]
+        [--mongo-url mongodb://localhost:27017/?maxPoolSize=50] [--output load_test_results.json]
+
+Requires httpx, plus mongomock-motor unless --mongo-url is given.
+"""
+
+import argparse
+import asyncio
+import io
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+BACKEND = os.path.join(ROOT, "backend")
+IMAGE_DIRS = ("test/accident", "test/non-accident", "test_images")
+DEFAULT_MIX = "create=20,list=40,stats=25,approve=10,reject=5"
+PHONE = "+919876543210"
+
+
+class FakePredictor:
+    """Stands in for AccidentPredictor; blocks the caller like CPU inference does"""
+
+    def __init__(self, latency_seconds):
+        self.latency_seconds = latency_seconds
+
+    def predict(self, image, threshold=0.5, **kwargs):
+        time.sleep(self.latency_seconds)
+        score = random.random()
+        is_accident = score >= threshold
+        confidence = max(0.60, min(0.99, score if is_accident else 1 - score))
+        return {
+            "prediction": "accident" if is_accident else "non-accident",
+            "is_accident": is_accident,
+            "confidence": confidence,
+            "raw_score": score,
+            "threshold": threshold,
+            "method": "load_test_fake",
+            "model_version": "load-test",
+            "accident_probability": confidence if is_accident else 1 - confidence,
+            "non_accident_probability": 1 - confidence if is_accident else confidence,
+        }
+
+
+def install_fakes(args):
+    """Swap the model, SMS provider and (in mock mode) MongoDB for test doubles"""
+    from app.api.routes import reports
+    from app.core.database import Database
+    from app.services.sms_service import SMSService
+
+    predictor = FakePredictor(args.inference_ms / 1000)
+    reports.get_predictor = lambda: predictor
+
+    def fake_send_sms(self, phone_number, message):
+        time.sleep(args.sms_ms / 1000)
+        return True
+
+    SMSService._send_sms = fake_send_sms
+
+    if args.mongo_url:
+        return
+
+    try:
+        import mongomock
+        import pymongo
+        from mongomock_motor import AsyncMongoMockClient
+    except ImportError:
+        sys.exit("Mock mode needs mongomock-motor (pip install mongomock-motor) or pass --mongo-url")
+
+    store = mongomock.MongoClient()
+    store.close = lambda: None  # the approve/reject routes close their client per request
+    Database.client = AsyncMongoMockClient(mock_mongo_client=store)
+    pymongo.MongoClient = lambda *a, **kw: store
+
+
+def load_images(pool_size):
+    """Distinct JPEGs built from the test sets so uploads are not all deduplicated"""
+    from PIL import Image, ImageDraw
+
+    sources = []
+    for directory in IMAGE_DIRS:
+        path = os.path.join(ROOT, directory)
+        if os.path.isdir(path):
+            sources.extend(os.path.join(path, name) for name in sorted(os.listdir(path)))
+    sources = [path for path in sources if path.lower().endswith((".jpg", ".jpeg", ".png"))]
+
+    rng = random.Random(42)
+    images = []
+    for i in range(pool_size):
+        if sources:
+            image = Image.open(sources[i % len(sources)]).convert("RGB")
+            image.thumbnail((1280, 1280))
+        else:
+            image = Image.new("RGB", (960, 720), tuple(rng.randrange(256) for _ in range(3)))
+        x, y = rng.randrange(image.width), rng.randrange(image.height)
+        ImageDraw.Draw(image).rectangle(
+            (x, y, x + image.width // 4, y + image.height // 4),
+            fill=tuple(rng.randrange(256) for _ in range(3))
+        )
+        buffer = io.BytesIO()
+        image.save(buffer, "JPEG", quality=85)
+        images.append(buffer.getvalue())
+    return images
+
+
+async def seed_reports(count):
+    """Insert existing reports so list and stats queries have realistic data"""
+    from app.core.database import get_reports_collection
+
+    reports_collection = await get_reports_collection()
+    now = datetime.utcnow()
+    documents = []
+    for i in range(count):
+        latitude, longitude = 12.9 + random.random() * 0.2, 77.5 + random.random() * 0.2
+        is_accident = random.random() < 0.7
+        documents.append({
+            "user_id": None,
+            "user_email": "anonymous@emergency.com",
+            "user_name": "Emergency Reporter",
+            "image_path": f"media/blobs/00/00/{i:064x}.jpg",
+            "image_filename": f"{i:064x}.jpg",
+            "location": {"latitude": latitude, "longitude": longitude, "address": None},
+            "location_geo": {"type": "Point", "coordinates": [longitude, latitude]},
+            "prediction": {
+                "is_accident": is_accident,
+                "confidence": 0.85,
+                "accident_probability": 0.85 if is_accident else 0.15,
+                "non_accident_probability": 0.15 if is_accident else 0.85,
+                "model_version": "load-test",
+            },
+            "status": random.choice(["pending", "pending", "approved", "rejected"]),
+            "description": "Seeded report",
+            "phone_number": PHONE,
+            "ambulance_eta_minutes": 9,
+            "created_at": now - timedelta(minutes=i),
+            "updated_at": now - timedelta(minutes=i),
+        })
+    if documents:
+        result = await reports_collection.insert_many(documents)
+        return [str(report_id) for report_id in result.inserted_ids]
+    return []
+
+
+def parse_mix(text):
+    mix = {}
+    for part in text.split(","):
+        name, _, weight = part.partition("=")
+        mix[name.strip()] = float(weight)
+    unknown = set(mix) - {"create", "list", "stats", "approve", "reject"}
+    if unknown:
+        sys.exit(f"Unknown operations in --mix: {', '.join(sorted(unknown))}")
+    return mix
+
+
+def percentile(sorted_values, pct):
+    index = min(len(sorted_values) - 1, max(0, round(pct / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def summarize(timings, duration):
+    timings = sorted(timings)
+    if not timings:
+        return {"count": 0}
+    return {
+        "count": len(timings),
+        "per_second": len(timings) / duration,
+        "p50_ms": percentile(timings, 50) * 1000,
+        "p95_ms": percentile(timings, 95) * 1000,
+        "p99_ms": percentile(timings, 99) * 1000,
+        "max_ms": timings[-1] * 1000,
+    }
+
+
+class Workload:
+    """Issues one operation of the mix against the app"""
+
+    def __init__(self, client, mix, images, report_ids):
+        self.client = client
+        self.operations = list(mix)
+        self.weights = [mix[name] for name in self.operations]
+        self.images = images
+        self.report_ids = report_ids
+
+    async def run_one(self, rng):
+        operation = rng.choices(self.operations, self.weights)[0]
+        start = time.perf_counter()
+        response = await getattr(self, operation)(rng)
+        return operation, time.perf_counter() - start, response.status_code
+
+    async def create(self, rng):
+        response = await self.client.post(
+            "/api/reports/create",
+            data={
+                "latitude": str(12.9 + rng.random() * 0.2),
+                "longitude": str(77.5 + rng.random() * 0.2),
+                "description": "Load test report",
+                "phone_number": PHONE,
+            },
+            files={"image": ("report.jpg", rng.choice(self.images), "image/jpeg")}
+        )
+        if response.status_code == 201:
+            self.report_ids.append(response.json()["_id"])
+        return response
+
+    async def list(self, rng):
+        return await self.client.get("/api/reports/all", params={"view": rng.choice(["summary", "full"])})
+
+    async def stats(self, rng):
+        return await self.client.get("/api/reports/stats/overview")
+
+    async def approve(self, rng):
+        return await self.client.put(
+            f"/api/reports/{rng.choice(self.report_ids)}/approve",
+            data={"ambulance_number": "KA-01-AB-1234", "eta": "8", "hospital": "City Hospital"}
+        )
+
+    async def reject(self, rng):
+        return await self.client.put(
+            f"/api/reports/{rng.choice(self.report_ids)}/reject",
+            data={"admin_notes": "Load test rejection"}
+        )
+
+
+async def run_level(workload, concurrency, duration):
+    """Closed loop with `concurrency` clients for `duration` seconds"""
+    samples = []
+    deadline = time.perf_counter() + duration
+
+    async def client_loop(seed):
+        rng = random.Random(seed)
+        while time.perf_counter() < deadline:
+            samples.append(await workload.run_one(rng))
+
+    start = time.perf_counter()
+    await asyncio.gather(*(client_loop(concurrency * 1000 + i) for i in range(concurrency)))
+    elapsed = time.perf_counter() - start
+
+    by_operation = {}
+    for operation, seconds, _ in samples:
+        by_operation.setdefault(operation, []).append(seconds)
+    errors = {}
+    for operation, _, status_code in samples:
+        if status_code >= 400:
+            errors[f"{operation}:{status_code}"] = errors.get(f"{operation}:{status_code}", 0) + 1
+    return {
+        "concurrency": concurrency,
+        "seconds": elapsed,
+        "requests_per_second": len(samples) / elapsed,
+        "error_rate": sum(errors.values()) / len(samples) if samples else 0.0,
+        "errors": errors,
+        "overall": summarize([seconds for _, seconds, _ in samples], elapsed),
+        "operations": {name: summarize(timings, elapsed) for name, timings in sorted(by_operation.items())},
+    }
+
+
+async def run(args, mix):
+    import httpx
+    from app.main import app
+    from app.core.database import Database
+    from app.core.metrics import registry
+
+    loop = asyncio.get_running_loop()
+    if args.executor_workers:
+        loop.set_default_executor(ThreadPoolExecutor(max_workers=args.executor_workers))
+
+    if args.mongo_url:
+        await Database.connect_db()
+    await Database.ensure_indexes()
+
+    images = load_images(args.image_pool)
+    report_ids = await seed_reports(args.seed_reports)
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://loadtest", timeout=None) as client:
+        workload = Workload(client, mix, images, report_ids)
+        await run_level(workload, 2, args.warmup)
+
+        levels = []
+        for concurrency in args.concurrency:
+            level = await run_level(workload, concurrency, args.duration)
+            levels.append(level)
+            overall = level["overall"]
+            print(f"  c={concurrency:<4} {level['requests_per_second']:8.1f} req/s   "
+                  f"p50 {overall['p50_ms']:8.1f} ms   p95 {overall['p95_ms']:8.1f} ms   "
+                  f"p99 {overall['p99_ms']:8.1f} ms   errors {level['error_rate'] * 100:.1f}%")
+
+    if args.mongo_url:
+        await Database.close_db()
+
+    peak = max(level["requests_per_second"] for level in levels)
+    # Smallest concurrency that already gets 95% of the best throughput
+    saturation = next(level["concurrency"] for level in levels if level["requests_per_second"] >= 0.95 * peak)
+    return {
+        "config": {
+            "mix": mix,
+            "duration_seconds": args.duration,
+            "inference_ms": args.inference_ms,
+            "sms_ms": args.sms_ms,
+            "executor_workers": args.executor_workers,
+            "mongo": args.mongo_url or "mongomock",
+            "seed_reports": args.seed_reports,
+            "timestamp": datetime.now().isoformat(),
+        },
+        "levels": levels,
+        "peak_requests_per_second": peak,
+        "saturation_concurrency": saturation,
+        "stage_metrics": registry.render() if args.include_stage_metrics else None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the report API in-process")
+    parser.add_argument("--concurrency", default="1,2,4,8,16,32", help="Comma-separated client counts")
+    parser.add_argument("--duration", type=float, default=10, help="Seconds per concurrency level")
+    parser.add_argument("--warmup", type=float, default=2, help="Warm-up seconds before measuring")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help="Operation weights")
+    parser.add_argument("--inference-ms", type=float, default=150, help="Fake model latency")
+    parser.add_argument("--sms-ms", type=float, default=300, help="Fake Twilio latency")
+    parser.add_argument("--executor-workers", type=int, default=None, help="Default thread pool size")
+    parser.add_argument("--mongo-url", default=None, help="Use this mongod instead of mongomock")
+    parser.add_argument("--seed-reports", type=int, default=500, help="Reports inserted before the run")
+    parser.add_argument("--image-pool", type=int, default=64, help="Distinct upload images")
+    parser.add_argument("--include-stage-metrics", action="store_true", help="Store /metrics output in the JSON")
+    parser.add_argument("--output", default="load_test_results.json", help="JSON output path")
+    args = parser.parse_args()
+    args.concurrency = [int(level) for level in args.concurrency.split(",") if level.strip()]
+    mix = parse_mix(args.mix)
+
+    upload_dir = tempfile.mkdtemp(prefix="load_test_uploads_")
+    os.environ["UPLOAD_DIR"] = upload_dir
+    os.environ.setdefault("TWILIO_ACCOUNT_SID", "ACload-test")
+    os.environ.setdefault("TWILIO_AUTH_TOKEN", "load-test")
+    os.environ.setdefault("TWILIO_PHONE_NUMBER", "+15005550006")
+    if args.mongo_url:
+        os.environ["MONGODB_URL"] = args.mongo_url
+        os.environ.setdefault("DATABASE_NAME", "accident_detection_load_test")
+    sys.path.insert(0, BACKEND)
+    sys.path.insert(0, ROOT)
+
+    install_fakes(args)
+    print(f"Load test: mix {args.mix}, {args.duration:g} s per level, "
+          f"inference {args.inference_ms:g} ms, SMS {args.sms_ms:g} ms")
+    try:
+        result = asyncio.run(run(args, mix))
+    finally:
+        shutil.rmtree(upload_dir, ignore_errors=True)
+
+    with open(args.output, "w") as f:
+        json.dump(result, f, indent=2)
+    print(f"Peak {result['peak_requests_per_second']:.1f} req/s, "
+          f"saturated at {result['saturation_concurrency']} concurrent clients")
+    print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
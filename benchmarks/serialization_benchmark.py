@@ -0,0 +1,124 @@
+"""
+Report list serialization benchmark
+
+Compares the previous response path for a page of reports (per-item dict
+fix-ups, ReportResponse validation, json.dumps) with the orjson wire
+transform used by the list endpoints.
+
+Usage:
+    python benchmarks/serialization_benchmark.py [--items 100] [--repeat 200]
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+from typing import List
+
+from bson import ObjectId
+from pydantic import TypeAdapter
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backend"))
+
+from app.api.serialization import ORJSON_AVAILABLE, reports_response  # noqa: E402
+from app.schemas.report import ReportResponse  # noqa: E402
+
+
+def make_reports(count):
+    """Documents shaped like the ones create_report stores"""
+    now = datetime.utcnow()
+    reports = []
+    for i in range(count):
+        reports.append({
+            "_id": ObjectId(),
+            "user_id": str(ObjectId()),
+            "user_email": f"user{i}@example.com",
+            "user_name": f"User {i}",
+            "image_path": f"media/blobs/ab/cd/{i:064x}.jpg",
+            "image_filename": f"{i:064x}.jpg",
+            "location": {"latitude": 12.97 + i * 1e-4, "longitude": 77.59, "address": "MG Road, Bengaluru"},
+            "location_geo": {"type": "Point", "coordinates": [77.59, 12.97 + i * 1e-4]},
+            "prediction": {
+                "is_accident": i % 3 != 0,
+                "confidence": 0.91,
+                "accident_probability": 0.91,
+                "non_accident_probability": 0.09,
+                "threshold": 0.5,
+                "model_type": "enhanced_v3",
+                "image_phash": "fa90ad2ac589d936",
+                "model_performance": {
+                    "accuracy": 0.92, "precision": 0.85, "recall": 0.93, "f1_score": 0.89,
+                    "auc": 0.96, "specificity": 0.91
+                },
+            },
+            "status": "pending",
+            "admin_notes": None,
+            "description": "Two-wheeler collision near junction, one injured",
+            "phone_number": "+919876543210",
+            "ambulance_eta_minutes": 9,
+            "estimated_arrival": "10:42 PM",
+            "incident_id": str(ObjectId()),
+            "image_sha256": f"{i:064x}",
+            "image_size_bytes": 184_233,
+            "image_phash": "fa90ad2ac589d936",
+            "created_at": now - timedelta(minutes=i),
+            "updated_at": now - timedelta(minutes=i),
+        })
+    return reports
+
+
+def previous_path(reports):
+    """Handler loop + response_model validation + stdlib JSON rendering"""
+    reports = [dict(report) for report in reports]
+    for report in reports:
+        report["_id"] = str(report["_id"])
+        if "updated_at" not in report:
+            report["updated_at"] = report.get("created_at", datetime.utcnow())
+        if "created_at" not in report:
+            report["created_at"] = datetime.utcnow()
+    adapter = TypeAdapter(List[ReportResponse])
+    content = adapter.dump_python(adapter.validate_python(reports), mode="json", by_alias=True)
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode("utf-8")
+
+
+def fast_path(reports):
+    return reports_response(reports).body
+
+
+def bench(fn, reports, repeat):
+    fn(reports)  # warm up
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        body = fn(reports)
+        timings.append(time.perf_counter() - start)
+    timings.sort()
+    return {
+        "median_ms": timings[len(timings) // 2] * 1000,
+        "p95_ms": timings[int(len(timings) * 0.95) - 1] * 1000,
+        "bytes": len(body),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark report list serialization")
+    parser.add_argument("--items", type=int, default=100, help="Reports per page")
+    parser.add_argument("--repeat", type=int, default=200, help="Timed iterations")
+    args = parser.parse_args()
+
+    reports = make_reports(args.items)
+    assert json.loads(previous_path(reports)) == json.loads(fast_path(reports)), "Outputs differ"
+
+    before = bench(previous_path, reports, args.repeat)
+    after = bench(fast_path, reports, args.repeat)
+
+    print(f"{args.items} reports per page, {args.repeat} iterations (orjson: {ORJSON_AVAILABLE})")
+    for name, result in (("before", before), ("after", after)):
+        print(f"  {name:<7} median {result['median_ms']:7.3f} ms   p95 {result['p95_ms']:7.3f} ms   {result['bytes']} bytes")
+    print(f"  speedup {before['median_ms'] / after['median_ms']:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
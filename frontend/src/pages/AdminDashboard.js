@@ -252,7 +252,7 @@ function AdminDashboard({ user, onLogout }) {
                     {/* Image */}
                     <div className="lg:w-80 flex-shrink-0">
                       <img
-                        src={`http://localhost:8000/${report.image_path}`}
+                        src={`http://localhost:8000/${report.thumbnail_path || report.image_path}`}
                         alt="Accident"
                         className="w-full h-64 object-cover rounded-lg"
                         onError={(e) => {
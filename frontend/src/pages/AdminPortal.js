@@ -386,7 +386,7 @@ function AdminPortal() {
                   <h3 className="text-xl font-bold text-gray-800 mb-4">Report Details</h3>
                   
                   <img
-                    src={`http://localhost:8000/${selectedReport.image_path}`}
+                    src={`http://localhost:8000/${selectedReport.preview_path || selectedReport.image_path}`}
                     alt="Accident"
                     className="w-full h-48 object-cover rounded-lg mb-4"
                   />
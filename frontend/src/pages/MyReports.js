@@ -128,7 +128,7 @@ function MyReports({ user, onLogout }) {
                     {/* Image */}
                     <div className="md:w-64 flex-shrink-0">
                       <img
-                        src={`http://localhost:8000/${report.image_path}`}
+                        src={`http://localhost:8000/${report.thumbnail_path || report.image_path}`}
                         alt="Accident"
                         className="w-full h-48 object-cover rounded-lg"
                         onError={(e) => {
@@ -76,10 +76,21 @@ export const reportsAPI = {
       },
     });
   },
-  getUserReports: (skip = 0, limit = 100) => 
-    api.get(`/reports/user?skip=${skip}&limit=${limit}`),
-  getAllReports: (skip = 0, limit = 100, status = null) => {
-    let url = `/reports/all?skip=${skip}&limit=${limit}`;
+  getUserReports: (skip = 0, limit = 100, view = 'full') => 
+    api.get(`/reports/user?skip=${skip}&limit=${limit}&view=${view}`),
+  getAllReports: (skip = 0, limit = 100, status = null, view = 'full') => {
+    let url = `/reports/all?skip=${skip}&limit=${limit}&view=${view}`;
+    if (status) url += `&status_filter=${status}`;
+    return api.get(url);
+  },
+  getModelVersions: () => api.get('/reports/models'),
+  getIncidents: (skip = 0, limit = 100, status = null) => {
+    let url = `/reports/incidents?skip=${skip}&limit=${limit}`;
+    if (status) url += `&status_filter=${status}`;
+    return api.get(url);
+  },
+  getGeoMarkers: ({ minLat, minLon, maxLat, maxLon }, zoom, status = null) => {
+    let url = `/reports/geo?min_lat=${minLat}&min_lon=${minLon}&max_lat=${maxLat}&max_lon=${maxLon}&zoom=${zoom}`;
     if (status) url += `&status_filter=${status}`;
     return api.get(url);
   },
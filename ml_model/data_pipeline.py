@@ -0,0 +1,143 @@
+"""
+tf.data input pipeline for training and evaluation
+Decodes images in parallel, caches the resized tensors on disk and streams
+shuffled, prefetched batches, so datasets no longer have to fit in RAM
+"""
+
+import hashlib
+import os
+
+import tensorflow as tf
+
+try:
+    from .dataset_cache import IMG_SIZE, list_labelled_images
+except ImportError:
+    from dataset_cache import IMG_SIZE, list_labelled_images
+
+AUTOTUNE = tf.data.AUTOTUNE
+
+
+def decode_image(path, img_size=IMG_SIZE):
+    """
+    Read and resize one image to a uint8 tensor
+
+    Uses Lanczos resampling like AccidentPredictor.preprocess_image so
+    training inputs match what the model sees at serving time.
+    """
+    data = tf.io.read_file(path)
+    img = tf.io.decode_image(data, channels=3, expand_animations=False)
+    img = tf.image.resize(img, img_size, method='lanczos3', antialias=True)
+    return tf.cast(tf.clip_by_value(tf.round(img), 0, 255), tf.uint8)
+
+
+def _cache_path(cache_dir, name, paths, img_size):
+    """Cache file keyed by the file list and size, so stale caches are never reused"""
+    digest = hashlib.sha1()
+    digest.update(f"{img_size[0]}x{img_size[1]}".encode())
+    for path in paths:
+        digest.update(os.path.abspath(path).encode())
+        digest.update(str(os.path.getmtime(path)).encode())
+    return os.path.join(cache_dir, f"{name}-{digest.hexdigest()[:16]}")
+
+
+def augment(images, labels):
+    """Light photometric and flip augmentation on a float batch"""
+    images = tf.image.random_flip_left_right(images)
+    images = tf.image.random_brightness(images, 0.1)
+    images = tf.image.random_contrast(images, 0.9, 1.1)
+    return tf.clip_by_value(images, 0.0, 1.0), labels
+
+
+def build_dataset(paths, labels, batch_size=32, training=False, cache_dir=None, name='data',
+                  shuffle_buffer=1024, augment_images=False, img_size=IMG_SIZE, seed=None):
+    """
+    Build a batched dataset of (images, labels)
+
+    Args:
+        paths: Image file paths
+        labels: Integer labels (1 = accident)
+        batch_size: Batch size
+        training: Shuffle every epoch (and augment if augment_images)
+        cache_dir: Directory for the on-disk cache of decoded images
+            (in-memory cache if None)
+        name: Cache file prefix
+        shuffle_buffer: Shuffle buffer size in images
+        augment_images: Apply augment() to training batches
+        img_size: Output size (height, width)
+        seed: Shuffle seed
+
+    Returns:
+        tf.data.Dataset yielding float32 images in [0, 1] and float32 labels
+    """
+    ds = tf.data.Dataset.from_tensor_slices((list(paths), list(labels)))
+    ds = ds.map(lambda path, label: (decode_image(path, img_size), label),
+                num_parallel_calls=AUTOTUNE, deterministic=not training)
+    ds = ds.ignore_errors(log_warning=True)  # skip unreadable files instead of failing the epoch
+
+    # Decoded uint8 tensors are cached, so only the first epoch reads JPEGs
+    if cache_dir:
+        os.makedirs(cache_dir, exist_ok=True)
+        ds = ds.cache(_cache_path(cache_dir, name, paths, img_size))
+    else:
+        ds = ds.cache()
+
+    if training:
+        ds = ds.shuffle(min(shuffle_buffer, max(len(paths), 1)), seed=seed, reshuffle_each_iteration=True)
+
+    ds = ds.batch(batch_size)
+    ds = ds.map(lambda images, batch_labels: (tf.cast(images, tf.float32) / 255.0, tf.cast(batch_labels, tf.float32)),
+                num_parallel_calls=AUTOTUNE)
+    if training and augment_images:
+        ds = ds.map(augment, num_parallel_calls=AUTOTUNE)
+    return ds.prefetch(AUTOTUNE)
+
+
+def dataset_from_directory(directory, **kwargs):
+    """
+    Build a dataset from an accident/ + non-accident/ directory
+
+    Args:
+        directory: Class-structured image directory
+        **kwargs: Passed to build_dataset
+
+    Returns:
+        (dataset, number of images)
+    """
+    paths, labels = list_labelled_images(directory)
+    if not paths:
+        raise FileNotFoundError(f"No accident/ or non-accident/ images under {directory}")
+    kwargs.setdefault('name', os.path.basename(os.path.normpath(directory)))
+    return build_dataset(paths, labels, **kwargs), len(paths)
+
+
+def load_splits(dataset_dir='dataset', batch_size=32, cache_dir=None, augment_images=True, seed=42):
+    """
+    Datasets for the dataset/{train,valid,test} layout used by the trainers
+
+    Args:
+        dataset_dir: Root containing train/, valid/ and test/
+        batch_size: Batch size
+        cache_dir: On-disk cache directory (defaults to <dataset_dir>/.cache)
+        augment_images: Augment the training split
+        seed: Shuffle seed
+
+    Returns:
+        Dict of split name -> (dataset, number of images) for splits that exist
+    """
+    cache_dir = cache_dir or os.path.join(dataset_dir, '.cache')
+    splits = {}
+    for split in ('train', 'valid', 'test'):
+        directory = os.path.join(dataset_dir, split)
+        if not os.path.isdir(directory):
+            continue
+        training = split == 'train'
+        splits[split] = dataset_from_directory(
+            directory,
+            batch_size=batch_size,
+            training=training,
+            cache_dir=cache_dir,
+            name=split,
+            augment_images=augment_images and training,
+            seed=seed
+        )
+    return splits
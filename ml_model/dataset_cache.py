@@ -0,0 +1,283 @@
+"""
+Compiled image datasets
+Decodes and resizes a labelled image directory once into uint8 .npy shards
+plus an index; later runs np.load them memory-mapped instead of decoding JPEGs
+
+Layout of a compiled dataset directory:
+    index.json                  files, labels, shard table, source fingerprint
+    images-<build>-00000.npy    (n, 224, 224, 3) uint8, one file per shard
+    labels-<build>.npy          (count,) int8, 1 = accident
+
+Usage:
+    python -m ml_model.dataset_cache test data/compiled/test [--shard-size 4096] [--force]
+"""
+
+import argparse
+import hashlib
+import itertools
+import json
+import os
+import sys
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+from PIL import Image
+
+IMG_SIZE = (224, 224)
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.bmp', '.gif')
+CLASS_DIRS = {'accident': 1, 'non-accident': 0}
+INDEX_FILE = 'index.json'
+FORMAT_VERSION = 1
+
+
+def list_labelled_images(directory):
+    """
+    Collect images from accident/ and non-accident/ subdirectories
+
+    Args:
+        directory: Directory containing one subdirectory per class
+
+    Returns:
+        (paths, labels) with accident = 1, non-accident = 0
+    """
+    paths, labels = [], []
+    for class_dir, label in CLASS_DIRS.items():
+        class_path = os.path.join(directory, class_dir)
+        if not os.path.isdir(class_path):
+            continue
+        for name in sorted(os.listdir(class_path)):
+            if name.lower().endswith(IMAGE_EXTENSIONS):
+                paths.append(os.path.join(class_path, name))
+                labels.append(label)
+    return paths, labels
+
+
+def load_resized(path, img_size=IMG_SIZE):
+    """Decode and resize exactly like AccidentPredictor.preprocess_image, as uint8"""
+    with Image.open(path) as img:
+        if img.mode != 'RGB':
+            img = img.convert('RGB')
+        img = img.resize(img_size, Image.Resampling.LANCZOS)
+        return np.asarray(img, dtype=np.uint8)
+
+
+def source_fingerprint(paths, labels, img_size=IMG_SIZE):
+    """Changes whenever a file is added, removed, relabelled or modified"""
+    digest = hashlib.sha1(f"v{FORMAT_VERSION}:{img_size[0]}x{img_size[1]}".encode())
+    for path, label in zip(paths, labels):
+        stat = os.stat(path)
+        digest.update(f"{os.path.abspath(path)}|{label}|{stat.st_size}|{stat.st_mtime_ns}\n".encode())
+    return digest.hexdigest()
+
+
+def compile_dataset(paths, labels, output_dir, shard_size=4096, img_size=IMG_SIZE, workers=None, force=False):
+    """
+    Write preprocessed images and labels as memory-mappable shards
+
+    Args:
+        paths: Image file paths
+        labels: Integer labels (1 = accident)
+        output_dir: Compiled dataset directory
+        shard_size: Images per shard file
+        img_size: Output size (width, height) as for PIL
+        workers: Decode threads (defaults to the CPU count)
+        force: Rebuild even if the index matches the source files
+
+    Returns:
+        The index dictionary
+    """
+    fingerprint = source_fingerprint(paths, labels, img_size)
+    index_path = os.path.join(output_dir, INDEX_FILE)
+    if not force and os.path.exists(index_path):
+        with open(index_path, 'r') as f:
+            index = json.load(f)
+        if index.get('fingerprint') == fingerprint:
+            return index
+
+    os.makedirs(output_dir, exist_ok=True)
+    build = uuid.uuid4().hex[:8]
+    height, width = img_size[1], img_size[0]
+
+    # Decode in parallel; files that fail to decode are left out of the shards
+    with ThreadPoolExecutor(max_workers=workers or os.cpu_count()) as pool:
+        def decode(path):
+            try:
+                return load_resized(path, img_size)
+            except Exception as e:
+                return e
+        decoded = pool.map(decode, paths)
+
+        files, kept_labels, skipped, shards, allocated = [], [], [], [], []
+        shard, shard_file, position = None, None, 0
+        for path, label, image in zip(paths, labels, decoded):
+            if isinstance(image, Exception):
+                skipped.append({'path': path, 'error': str(image)})
+                continue
+            if shard is None or position == len(shard):
+                if shard is not None:
+                    shard.flush()
+                remaining = len(paths) - len(files) - len(skipped)
+                shard_file = f"images-{build}-{len(shards):05d}.npy"
+                shard = np.lib.format.open_memmap(
+                    os.path.join(output_dir, shard_file), mode='w+', dtype=np.uint8,
+                    shape=(min(shard_size, remaining), height, width, 3)
+                )
+                shards.append({'file': shard_file, 'start': len(files), 'count': 0})
+                allocated.append(len(shard))
+                position = 0
+            shard[position] = image
+            shards[-1]['count'] += 1
+            files.append({'path': path, 'label': int(label)})
+            kept_labels.append(label)
+            position += 1
+        if shard is not None:
+            shard.flush()
+            del shard
+
+    # A shard may be over-allocated when trailing files failed to decode
+    for entry, size in zip(shards, allocated):
+        if size != entry['count']:
+            shard_path = os.path.join(output_dir, entry['file'])
+            np.save(shard_path, np.load(shard_path)[:entry['count']])
+
+    labels_file = f"labels-{build}.npy"
+    np.save(os.path.join(output_dir, labels_file), np.asarray(kept_labels, dtype=np.int8))
+
+    index = {
+        'version': FORMAT_VERSION,
+        'fingerprint': fingerprint,
+        'created_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'img_size': [height, width],
+        'count': len(files),
+        'labels_file': labels_file,
+        'shards': shards,
+        'files': files,
+        'skipped': skipped,
+    }
+
+    # The index is replaced atomically, then files of earlier builds are removed
+    tmp_path = index_path + '.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump(index, f, indent=1)
+    os.replace(tmp_path, index_path)
+
+    current = {labels_file} | {entry['file'] for entry in shards}
+    for name in os.listdir(output_dir):
+        if name.endswith('.npy') and name.startswith(('images-', 'labels-')) and name not in current:
+            os.remove(os.path.join(output_dir, name))
+    return index
+
+
+class CompiledDataset:
+    """Read-only, memory-mapped view of a compiled dataset"""
+
+    def __init__(self, directory):
+        with open(os.path.join(directory, INDEX_FILE), 'r') as f:
+            self.index = json.load(f)
+        if self.index.get('version') != FORMAT_VERSION:
+            raise ValueError(f"Unsupported compiled dataset version in {directory}")
+        self.directory = directory
+        self.shards = [np.load(os.path.join(directory, entry['file']), mmap_mode='r') for entry in self.index['shards']]
+        self._starts = [entry['start'] for entry in self.index['shards']]
+        self.labels = np.load(os.path.join(directory, self.index['labels_file']), mmap_mode='r')
+        self.paths = [entry['path'] for entry in self.index['files']]
+
+    def __len__(self):
+        return self.index['count']
+
+    def image(self, i):
+        """uint8 image i (a view into the memory map)"""
+        shard = int(np.searchsorted(self._starts, i, side='right')) - 1
+        return self.shards[shard][i - self._starts[shard]]
+
+    def batches(self, batch_size=32, shuffle=False, seed=None, normalize=True):
+        """
+        Iterate (images, labels) batches
+
+        Args:
+            batch_size: Images per batch
+            shuffle: Random order across all shards
+            seed: Shuffle seed
+            normalize: float32 in [0, 1] like preprocess_image; raw uint8 views otherwise
+
+        Yields:
+            (images, labels) numpy arrays
+        """
+        if shuffle:
+            order = np.random.default_rng(seed).permutation(len(self))
+            for offset in range(0, len(order), batch_size):
+                # Sorted rows keep reads within each shard sequential
+                rows = np.sort(order[offset:offset + batch_size])
+                yield self._output(self._take(rows), normalize), np.asarray(self.labels[rows])
+            return
+
+        for shard, start in zip(self.shards, self._starts):
+            for offset in range(0, len(shard), batch_size):
+                images = shard[offset:offset + batch_size]  # contiguous slice: no copy
+                labels = self.labels[start + offset:start + offset + len(images)]
+                yield self._output(images, normalize), np.asarray(labels)
+
+    def _take(self, rows):
+        """Gather sorted global rows from the shards they live in"""
+        shard_ids = np.searchsorted(self._starts, rows, side='right') - 1
+        parts = [
+            self.shards[shard_id][rows[shard_ids == shard_id] - self._starts[shard_id]]
+            for shard_id in np.unique(shard_ids)
+        ]
+        return parts[0] if len(parts) == 1 else np.concatenate(parts)
+
+    @staticmethod
+    def _output(images, normalize):
+        if normalize:
+            return images.astype(np.float32) / 255.0
+        return images
+
+    def tf_dataset(self, batch_size=32, training=False, seed=None):
+        """tf.data.Dataset over the shards, shuffled per epoch when training"""
+        import tensorflow as tf
+
+        height, width = self.index['img_size']
+        epochs = itertools.count()
+
+        def generator():
+            # A new order every epoch, reproducible when seeded
+            epoch_seed = None if seed is None else [seed, next(epochs)]
+            yield from self.batches(batch_size, shuffle=training, seed=epoch_seed, normalize=False)
+
+        ds = tf.data.Dataset.from_generator(
+            generator,
+            output_signature=(
+                tf.TensorSpec((None, height, width, 3), tf.uint8),
+                tf.TensorSpec((None,), tf.int8),
+            )
+        )
+        ds = ds.map(lambda images, labels: (tf.cast(images, tf.float32) / 255.0, tf.cast(labels, tf.float32)),
+                    num_parallel_calls=tf.data.AUTOTUNE)
+        return ds.prefetch(tf.data.AUTOTUNE)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compile a labelled image directory into memory-mapped shards")
+    parser.add_argument('source', help="Directory with accident/ and non-accident/ subdirectories")
+    parser.add_argument('output', help="Compiled dataset directory")
+    parser.add_argument('--shard-size', type=int, default=4096, help="Images per shard")
+    parser.add_argument('--workers', type=int, default=None, help="Decode threads")
+    parser.add_argument('--force', action='store_true', help="Rebuild even if up to date")
+    args = parser.parse_args()
+
+    paths, labels = list_labelled_images(args.source)
+    if not paths:
+        sys.exit(f"No accident/ or non-accident/ images under {args.source}")
+
+    start = time.perf_counter()
+    index = compile_dataset(paths, labels, args.output, args.shard_size, workers=args.workers, force=args.force)
+    elapsed = time.perf_counter() - start
+    size_mb = sum(os.path.getsize(os.path.join(args.output, entry['file'])) for entry in index['shards']) / 2**20
+    print(f"{index['count']} images in {len(index['shards'])} shard(s), {size_mb:.0f} MB, "
+          f"{len(index['skipped'])} skipped ({elapsed:.2f} s)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,296 @@
+"""
+Model evaluation
+Scores a labelled accident/ + non-accident/ directory with batched inference
+and writes a fresh <model>_metrics.json next to the model
+
+Raw scores are cached per image content hash in <model>_eval_cache.json, so
+re-running after adding or changing a few images only scores those. The
+cache is discarded whenever the model file itself changes.
+
+Usage:
+    python -m ml_model.evaluate test [--model models/enhanced_accident_model_v3.h5]
+        [--batch-size 32] [--threshold 0.5] [--workers 4] [--full]
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+import numpy as np
+
+try:
+    from .dataset_cache import list_labelled_images, load_resized
+    from .predict import AccidentPredictor, metrics_path_for
+except ImportError:
+    from dataset_cache import list_labelled_images, load_resized
+    from predict import AccidentPredictor, metrics_path_for
+
+
+def file_sha256(path, chunk_size=1024 * 1024):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def cache_path_for(model_path):
+    return model_path.replace('.h5', '_eval_cache.json')
+
+
+def load_score_cache(model_path, model_sha256):
+    """Cached raw scores for this exact model file, keyed by image hash"""
+    path = cache_path_for(model_path)
+    if not os.path.exists(path):
+        return {}
+    try:
+        with open(path, 'r') as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if cache.get('model_sha256') != model_sha256:
+        return {}
+    return cache.get('scores', {})
+
+
+def _write_json(path, data):
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump(data, f, indent=4)
+    os.replace(tmp_path, path)
+
+
+def score_images(predictor, paths, batch_size=32, workers=None):
+    """
+    Raw model outputs for image files, one model call per batch
+
+    Args:
+        predictor: Loaded AccidentPredictor
+        paths: Image paths
+        batch_size: Images per model call
+        workers: Decode threads
+
+    Returns:
+        (scores by path, skipped paths, per-batch timings in seconds as
+        (images, preprocess, inference) tuples)
+    """
+    scores, skipped, timings = {}, [], []
+
+    def load(path):
+        try:
+            return load_resized(path, predictor.img_size)
+        except Exception:
+            return None
+
+    with ThreadPoolExecutor(max_workers=workers or os.cpu_count()) as pool:
+        for start in range(0, len(paths), batch_size):
+            chunk = paths[start:start + batch_size]
+            began = time.perf_counter()
+            images = list(pool.map(load, chunk))
+            loaded = [(path, image) for path, image in zip(chunk, images) if image is not None]
+            skipped.extend(path for path, image in zip(chunk, images) if image is None)
+            if not loaded:
+                continue
+            batch = np.stack([image for _, image in loaded]).astype(np.float32) / 255.0
+            preprocessed = time.perf_counter()
+            raw = predictor.predict_arrays(batch)
+            finished = time.perf_counter()
+            timings.append((len(loaded), preprocessed - began, finished - preprocessed))
+            scores.update((path, float(score)) for (path, _), score in zip(loaded, raw))
+    return scores, skipped, timings
+
+
+def roc_auc(labels, scores):
+    """Area under the ROC curve (Mann-Whitney U with tied ranks averaged)"""
+    labels = np.asarray(labels)
+    scores = np.asarray(scores, dtype=np.float64)
+    positives = labels.sum()
+    negatives = len(labels) - positives
+    if positives == 0 or negatives == 0:
+        return None
+    order = np.argsort(scores, kind='mergesort')
+    sorted_scores = scores[order]
+    ranks = np.empty(len(scores))
+    i = 0
+    while i < len(scores):
+        j = i
+        while j + 1 < len(scores) and sorted_scores[j + 1] == sorted_scores[i]:
+            j += 1
+        ranks[order[i:j + 1]] = (i + j) / 2 + 1
+        i = j + 1
+    return float((ranks[labels == 1].sum() - positives * (positives + 1) / 2) / (positives * negatives))
+
+
+def compute_metrics(labels, accident_scores, predicted):
+    """Confusion matrix and summary metrics with accident as the positive class"""
+    labels = np.asarray(labels, dtype=int)
+    predicted = np.asarray(predicted, dtype=int)
+    tp = int(((labels == 1) & (predicted == 1)).sum())
+    fp = int(((labels == 0) & (predicted == 1)).sum())
+    tn = int(((labels == 0) & (predicted == 0)).sum())
+    fn = int(((labels == 1) & (predicted == 0)).sum())
+    precision = tp / (tp + fp) if tp + fp else 0.0
+    recall = tp / (tp + fn) if tp + fn else 0.0
+    specificity = tn / (tn + fp) if tn + fp else 0.0
+
+    probabilities = np.clip(np.asarray(accident_scores, dtype=np.float64), 1e-7, 1 - 1e-7)
+    log_loss = -np.mean(labels * np.log(probabilities) + (1 - labels) * np.log(1 - probabilities))
+
+    return {
+        'test_loss': float(log_loss),
+        'test_accuracy': (tp + tn) / len(labels),
+        'test_precision': precision,
+        'test_recall': recall,
+        'test_auc': roc_auc(labels, accident_scores),
+        'test_f1': 2 * precision * recall / (precision + recall) if precision + recall else 0.0,
+        'test_specificity': specificity,
+        'test_true_positives': tp,
+        'test_false_positives': fp,
+        'test_true_negatives': tn,
+        'test_false_negatives': fn,
+    }
+
+
+def latency_stats(timings):
+    """
+    Latency and throughput from per-batch timings
+
+    Each batch contributes one value: its wall time divided by its image
+    count. The percentiles are over those batch means, not over individual
+    images.
+    """
+    if not timings:
+        return None
+    batch_means = np.array([(pre + infer) / count for count, pre, infer in timings]) * 1000
+    images = sum(count for count, _, _ in timings)
+    total = sum(pre + infer for _, pre, infer in timings)
+    return {
+        'images': images,
+        'batches': len(timings),
+        'batch_mean_ms_per_image_p50': float(np.percentile(batch_means, 50)),
+        'batch_mean_ms_per_image_p95': float(np.percentile(batch_means, 95)),
+        'batch_mean_ms_per_image_p99': float(np.percentile(batch_means, 99)),
+        'preprocess_seconds': sum(pre for _, pre, _ in timings),
+        'inference_seconds': sum(infer for _, _, infer in timings),
+        'images_per_second': images / total if total else None,
+    }
+
+
+def evaluate(data_dir, model_path=None, batch_size=32, threshold=0.5, workers=None, full=False):
+    """
+    Evaluate a model on a labelled directory and write its metrics file
+
+    Args:
+        data_dir: Directory with accident/ and non-accident/ subdirectories
+        model_path: Model .h5 (predictor default if None)
+        batch_size: Images per model call
+        threshold: Decision threshold
+        workers: Decode threads
+        full: Ignore cached scores and score every image
+
+    Returns:
+        The metrics dictionary that was written
+    """
+    paths, labels = list_labelled_images(data_dir)
+    if not paths:
+        raise FileNotFoundError(f"No accident/ or non-accident/ images under {data_dir}")
+
+    predictor = AccidentPredictor(model_path)
+    if model_path and os.path.abspath(predictor.model_path) != os.path.abspath(model_path):
+        raise RuntimeError(f"Could not load {model_path} (predictor fell back to {predictor.model_path})")
+    model_path = predictor.model_path
+    model_sha256 = file_sha256(model_path)
+
+    cached = {} if full else load_score_cache(model_path, model_sha256)
+    with ThreadPoolExecutor(max_workers=workers or os.cpu_count()) as pool:
+        hashes = list(pool.map(file_sha256, paths))
+    pending = [path for path, digest in zip(paths, hashes) if digest not in cached]
+
+    fresh, skipped, timings = score_images(predictor, pending, batch_size, workers)
+    scores = dict(cached)
+    for path, digest in zip(paths, hashes):
+        if path in fresh:
+            scores[digest] = fresh[path]
+
+    evaluated = [(label, scores[digest]) for label, digest in zip(labels, hashes) if digest in scores]
+    if not evaluated:
+        raise RuntimeError(f"None of the {len(paths)} images under {data_dir} could be read")
+    eval_labels = [label for label, _ in evaluated]
+    raw = np.array([score for _, score in evaluated])
+    accident_scores = raw if predictor.higher_is_accident else 1 - raw
+    predicted = [bool(predictor.classify(score, threshold)) for score in raw]
+
+    metrics_path = metrics_path_for(model_path)
+    metrics = compute_metrics(eval_labels, accident_scores, predicted)
+    metrics.update({
+        'class_indices': {'accident': 1, 'non-accident': 0},
+        'model_version': f"{os.path.splitext(os.path.basename(model_path))[0]}-{model_sha256[:12]}",
+        'model_sha256': model_sha256,
+        'evaluated_at': datetime.now().isoformat(),
+        'evaluation': {
+            'dataset': os.path.abspath(data_dir),
+            'samples': len(evaluated),
+            'threshold': threshold,
+            'scored': len(fresh),
+            'reused': len(evaluated) - len(fresh),
+            'skipped': skipped,
+            'metrics_path': metrics_path,
+        },
+        'latency': latency_stats(timings),
+    })
+
+    # Latency of the last run that actually scored images is kept
+    if metrics['latency'] is None and os.path.exists(metrics_path):
+        try:
+            with open(metrics_path, 'r') as f:
+                metrics['latency'] = json.load(f).get('latency')
+        except (OSError, ValueError):
+            pass
+
+    live = set(hashes)
+    _write_json(cache_path_for(model_path), {
+        'model_sha256': model_sha256,
+        'scores': {digest: score for digest, score in scores.items() if digest in live},
+    })
+    _write_json(metrics_path, metrics)
+    return metrics
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Evaluate the accident model and write <model>_metrics.json")
+    parser.add_argument('data', help="Directory with accident/ and non-accident/ subdirectories")
+    parser.add_argument('--model', default=None, help="Model .h5 path (predictor default if omitted)")
+    parser.add_argument('--batch-size', type=int, default=32, help="Images per model call")
+    parser.add_argument('--threshold', type=float, default=0.5, help="Decision threshold")
+    parser.add_argument('--workers', type=int, default=None, help="Decode threads")
+    parser.add_argument('--full', action='store_true', help="Re-score every image")
+    args = parser.parse_args()
+
+    try:
+        metrics = evaluate(args.data, args.model, args.batch_size, args.threshold, args.workers, args.full)
+    except (FileNotFoundError, RuntimeError) as e:
+        sys.exit(str(e))
+
+    evaluation = metrics['evaluation']
+    print(f"{evaluation['samples']} images ({evaluation['scored']} scored, {evaluation['reused']} cached, "
+          f"{len(evaluation['skipped'])} unreadable)")
+    auc = metrics['test_auc']
+    print(f"  accuracy {metrics['test_accuracy']:.3f}   precision {metrics['test_precision']:.3f}   "
+          f"recall {metrics['test_recall']:.3f}   f1 {metrics['test_f1']:.3f}   "
+          f"auc {'n/a' if auc is None else f'{auc:.3f}'}")
+    print(f"  TP {metrics['test_true_positives']}  FP {metrics['test_false_positives']}  "
+          f"TN {metrics['test_true_negatives']}  FN {metrics['test_false_negatives']}")
+    if metrics['latency']:
+        latency = metrics['latency']
+        print(f"  {latency['batch_mean_ms_per_image_p50']:.1f} ms/image (p50 of batch means), "
+              f"{latency['batch_mean_ms_per_image_p95']:.1f} ms p95, {latency['images_per_second']:.1f} images/s")
+    print(f"Metrics written to {metrics['evaluation']['metrics_path']}")
+
+
+if __name__ == '__main__':
+    main()
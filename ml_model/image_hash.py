@@ -0,0 +1,51 @@
+"""
+Perceptual image hashing for near-duplicate detection
+Re-encoded, resized or lightly cropped copies of a photo hash to nearby values
+"""
+
+import numpy as np
+from PIL import Image
+
+HASH_SIZE = 8
+_DCT_SIZE = 32
+
+
+def _dct_matrix(n):
+    """Orthonormal DCT-II basis matrix"""
+    k = np.arange(n)[:, np.newaxis]
+    i = np.arange(n)[np.newaxis, :]
+    matrix = np.sqrt(2.0 / n) * np.cos(np.pi * (2 * i + 1) * k / (2 * n))
+    matrix[0, :] = np.sqrt(1.0 / n)
+    return matrix
+
+
+_DCT = _dct_matrix(_DCT_SIZE)
+
+
+def perceptual_hash(img):
+    """
+    Compute a 64-bit DCT perceptual hash (pHash)
+
+    Args:
+        img: PIL image (any mode)
+
+    Returns:
+        16-character hex string
+    """
+    gray = img.convert('L').resize((_DCT_SIZE, _DCT_SIZE), Image.Resampling.LANCZOS)
+    pixels = np.asarray(gray, dtype=np.float64)
+
+    # Keep the lowest frequencies, which survive re-encoding and resizing
+    dct = _DCT @ pixels @ _DCT.T
+    low = dct[:HASH_SIZE, :HASH_SIZE].flatten()
+    median = np.median(low[1:])
+
+    bits = 0
+    for bit in low > median:
+        bits = (bits << 1) | int(bit)
+    return f"{bits:016x}"
+
+
+def hamming_distance(hash_a, hash_b):
+    """Number of differing bits between two hex hashes"""
+    return bin(int(hash_a, 16) ^ int(hash_b, 16)).count('1')
@@ -8,11 +8,22 @@ import numpy as np
 import tensorflow as tf
 from tensorflow import keras
 from PIL import Image
+import io
 import json
 import os
 from datetime import datetime
 from typing import Dict, Optional
 
+try:
+    from .image_hash import perceptual_hash
+except ImportError:
+    from image_hash import perceptual_hash
+
+def metrics_path_for(model_path):
+    """Metrics file stored next to a model"""
+    return model_path.replace('.h5', '_metrics.json')
+
+
 class AccidentPredictor:
     def __init__(self, model_path=None):
         """
@@ -60,7 +71,7 @@ class AccidentPredictor:
     
     def load_metrics(self):
         """Load model metrics if available"""
-        metrics_path = self.model_path.replace('.h5', '_metrics.json')
+        metrics_path = metrics_path_for(self.model_path)
         
         if os.path.exists(metrics_path):
             try:
@@ -70,21 +81,27 @@ class AccidentPredictor:
             except Exception as e:
                 print(f"⚠ Could not load metrics: {e}")
     
-    def preprocess_image(self, image_path_or_array):
+    def preprocess_image(self, image_path_or_array, return_hash=False):
         """
         Preprocess image for prediction
         
         Args:
-            image_path_or_array: Path to image file or numpy array
+            image_path_or_array: Path, encoded bytes, file-like object,
+                numpy array or PIL image
+            return_hash: Also return the perceptual hash of the decoded image
             
         Returns:
-            Preprocessed image array
+            Preprocessed image array, or (array, phash) if return_hash
         """
         # Load image
         if isinstance(image_path_or_array, str):
             img = Image.open(image_path_or_array)
+        elif isinstance(image_path_or_array, (bytes, bytearray, memoryview)):
+            img = Image.open(io.BytesIO(image_path_or_array))
         elif isinstance(image_path_or_array, np.ndarray):
             img = Image.fromarray(image_path_or_array.astype('uint8'))
+        elif hasattr(image_path_or_array, 'read'):
+            img = Image.open(image_path_or_array)
         else:
             img = image_path_or_array
         
@@ -92,6 +109,9 @@ class AccidentPredictor:
         if img.mode != 'RGB':
             img = img.convert('RGB')
         
+        # Hash the decoded image before resizing (used for near-duplicate lookup)
+        image_phash = perceptual_hash(img) if return_hash else None
+        
         # Resize with high quality
         img = img.resize(self.img_size, Image.Resampling.LANCZOS)
         
@@ -102,71 +122,93 @@ class AccidentPredictor:
         # Add batch dimension
         img_array = np.expand_dims(img_array, axis=0)
         
+        if return_hash:
+            return img_array, image_phash
         return img_array
     
-    def predict(self, image_path_or_array, threshold=0.5, **kwargs):
+    @property
+    def higher_is_accident(self):
+        """Enhanced models output P(accident); the original model outputs P(non-accident)"""
+        return 'enhanced' in self.model_path.lower()
+    
+    def classify(self, raw_prediction, threshold=0.5):
+        """Accident decision for a raw model output"""
+        if self.higher_is_accident:
+            # Enhanced model: higher values = accident
+            return raw_prediction >= threshold
+        # Original model: lower values = accident
+        return raw_prediction < 0.1
+    
+    def _build_result(self, raw_prediction, threshold, image_phash=None):
+        """Turn a raw sigmoid output into the prediction dictionary"""
+        is_accident = self.classify(raw_prediction, threshold)
+        if self.higher_is_accident:
+            confidence = raw_prediction if is_accident else (1 - raw_prediction)
+        else:
+            confidence = (1 - raw_prediction) if is_accident else raw_prediction
+        
+        predicted_class = 'accident' if is_accident else 'non-accident'
+        
+        # Ensure confidence is reasonable
+        confidence = max(0.60, min(0.99, confidence))
+        
+        # Build result
+        result = {
+            'prediction': predicted_class,
+            'is_accident': bool(is_accident),
+            'confidence': float(confidence),
+            'raw_score': float(raw_prediction),
+            'threshold': threshold,
+            'method': 'enhanced_predictor_v3.0' if 'enhanced' in self.model_path.lower() else 'original_predictor',
+            'model_version': self.model_metrics.get('model_version', 'unknown') if self.model_metrics else 'original',
+            'image_phash': image_phash
+        }
+        
+        # Add probabilities
+        if is_accident:
+            result['accident_probability'] = float(confidence)
+            result['non_accident_probability'] = float(1 - confidence)
+        else:
+            result['accident_probability'] = float(1 - confidence)
+            result['non_accident_probability'] = float(confidence)
+        
+        # Add model performance info if available
+        if self.model_metrics:
+            result['model_performance'] = {
+                'accuracy': self.model_metrics.get('test_accuracy', 0),
+                'precision': self.model_metrics.get('test_precision', 0),
+                'recall': self.model_metrics.get('test_recall', 0),
+                'auc': self.model_metrics.get('test_auc', 0)
+            }
+        
+        return result
+    
+    def predict(self, image_path_or_array, threshold=0.5, image_phash=None, **kwargs):
         """
         Predict if image contains accident
         
         Args:
-            image_path_or_array: Path to image or image array
+            image_path_or_array: Path, encoded bytes, file-like object,
+                image array or PIL image
             threshold: Decision threshold (default 0.5 for enhanced model)
+            image_phash: Perceptual hash the caller already computed (it is
+                computed during preprocessing otherwise)
             **kwargs: Additional parameters (ignored for simplicity)
             
         Returns:
             Dictionary with prediction results
         """
         try:
-            # Preprocess image
-            processed_img = self.preprocess_image(image_path_or_array)
+            # Preprocess image (hashing only if the caller did not)
+            if image_phash is None:
+                processed_img, image_phash = self.preprocess_image(image_path_or_array, return_hash=True)
+            else:
+                processed_img = self.preprocess_image(image_path_or_array)
             
             # Make prediction
             raw_prediction = self.model.predict(processed_img, verbose=0)[0][0]
             
-            # Determine prediction based on model type
-            if 'enhanced' in self.model_path.lower():
-                # Enhanced model: higher values = accident
-                is_accident = raw_prediction >= threshold
-                confidence = raw_prediction if is_accident else (1 - raw_prediction)
-            else:
-                # Original model: lower values = accident
-                is_accident = raw_prediction < 0.1
-                confidence = (1 - raw_prediction) if is_accident else raw_prediction
-            
-            predicted_class = 'accident' if is_accident else 'non-accident'
-            
-            # Ensure confidence is reasonable
-            confidence = max(0.60, min(0.99, confidence))
-            
-            # Build result
-            result = {
-                'prediction': predicted_class,
-                'is_accident': bool(is_accident),
-                'confidence': float(confidence),
-                'raw_score': float(raw_prediction),
-                'threshold': threshold,
-                'method': 'enhanced_predictor_v3.0' if 'enhanced' in self.model_path.lower() else 'original_predictor',
-                'model_version': self.model_metrics.get('model_version', 'unknown') if self.model_metrics else 'original'
-            }
-            
-            # Add probabilities
-            if is_accident:
-                result['accident_probability'] = float(confidence)
-                result['non_accident_probability'] = float(1 - confidence)
-            else:
-                result['accident_probability'] = float(1 - confidence)
-                result['non_accident_probability'] = float(confidence)
-            
-            # Add model performance info if available
-            if self.model_metrics:
-                result['model_performance'] = {
-                    'accuracy': self.model_metrics.get('test_accuracy', 0),
-                    'precision': self.model_metrics.get('test_precision', 0),
-                    'recall': self.model_metrics.get('test_recall', 0),
-                    'auc': self.model_metrics.get('test_auc', 0)
-                }
-            
-            return result
+            return self._build_result(raw_prediction, threshold, image_phash)
             
         except Exception as e:
             print(f"❌ Prediction error: {e}")
@@ -178,31 +220,59 @@ class AccidentPredictor:
                 'method': 'error'
             }
     
-    def predict_batch(self, image_paths):
+    def predict_arrays(self, batch):
+        """
+        Raw model scores for a batch of preprocessed images
+        
+        Args:
+            batch: Array of shape (n, 224, 224, 3) scaled to [0, 1]
+            
+        Returns:
+            1-D array of n sigmoid outputs
+        """
+        return np.asarray(self.model.predict_on_batch(batch)).reshape(-1)
+    
+    def predict_batch(self, image_paths, batch_size=32, threshold=0.5):
         """
-        Predict multiple images
+        Predict multiple images, running the model once per batch
         
         Args:
             image_paths: List of image paths
+            batch_size: Images per model call
+            threshold: Decision threshold
             
         Returns:
-            List of prediction results
+            List of prediction results (in input order)
         """
         results = []
-        for img_path in image_paths:
-            try:
-                result = self.predict(img_path)
+        for start in range(0, len(image_paths), batch_size):
+            chunk = image_paths[start:start + batch_size]
+            arrays, hashes, loaded = [], [], []
+            for img_path in chunk:
+                try:
+                    img_array, image_phash = self.preprocess_image(img_path, return_hash=True)
+                    arrays.append(img_array)
+                    hashes.append(image_phash)
+                    loaded.append(img_path)
+                except Exception as e:
+                    results.append({
+                        'image_path': img_path,
+                        'error': str(e),
+                        'prediction': 'non-accident',
+                        'is_accident': False,
+                        'confidence': 0.0
+                    })
+            
+            if not arrays:
+                continue
+            scores = self.predict_arrays(np.concatenate(arrays, axis=0))
+            for img_path, image_phash, score in zip(loaded, hashes, scores):
+                result = self._build_result(score, threshold, image_phash)
                 result['image_path'] = img_path
                 results.append(result)
-            except Exception as e:
-                results.append({
-                    'image_path': img_path,
-                    'error': str(e),
-                    'prediction': 'non-accident',
-                    'is_accident': False,
-                    'confidence': 0.0
-                })
         
+        order = {path: index for index, path in enumerate(image_paths)}
+        results.sort(key=lambda result: order.get(result['image_path'], 0))
         return results
 
 
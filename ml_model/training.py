@@ -0,0 +1,267 @@
+"""
+Shared CPU training runner
+Used by the fine-tune and training scripts to configure TensorFlow threading,
+optional bfloat16 mixed precision, gradient accumulation and checkpoint/resume
+in one place, and to report samples/sec so settings can be compared
+
+Create the runner before loading or building a model: thread pools can only
+be sized before the TensorFlow runtime starts.
+"""
+
+import os
+import shutil
+import time
+
+import tensorflow as tf
+from tensorflow import keras
+
+PRECISIONS = ('auto', 'bfloat16', 'float32')
+
+
+def available_cores():
+    """CPU cores this process may run on (respects container CPU affinity)"""
+    if hasattr(os, 'sched_getaffinity'):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+def bfloat16_supported():
+    """True if the CPU has native bfloat16 instructions (AVX512-BF16 or AMX)"""
+    try:
+        with open('/proc/cpuinfo', 'r') as f:
+            flags = f.read()
+    except OSError:
+        return False
+    return 'avx512_bf16' in flags or 'amx_bf16' in flags
+
+
+def _with_dtype_policy(model, policy):
+    """
+    Rebuild a model with every layer on the given dtype policy
+
+    The output layer stays float32 so the sigmoid and loss are computed at
+    full precision. Variables are float32 under both policies, so weights
+    are copied over unchanged.
+    """
+    config = model.get_config()
+    output_name = model.layers[-1].name
+
+    def rewrite(node):
+        if isinstance(node, dict):
+            layer_config = node.get('config')
+            if (node.get('class_name') not in (None, 'InputLayer') and isinstance(layer_config, dict)
+                    and 'dtype' in layer_config and 'layers' not in layer_config):
+                layer_policy = 'float32' if layer_config.get('name') == output_name else policy
+                layer_config['dtype'] = layer_policy
+            for value in node.values():
+                rewrite(value)
+        elif isinstance(node, list):
+            for value in node:
+                rewrite(value)
+
+    rewrite(config.get('layers', []))
+    rebuilt = type(model).from_config(config)
+    rebuilt.set_weights(model.get_weights())
+    return rebuilt
+
+
+class ThroughputLogger(keras.callbacks.Callback):
+    """Prints and records training samples/sec for every epoch"""
+
+    def __init__(self, samples_per_epoch):
+        super().__init__()
+        self.samples_per_epoch = samples_per_epoch
+        self.rates = []
+        self._started = None
+        self._elapsed = None
+
+    def on_epoch_begin(self, epoch, logs=None):
+        self._started = time.perf_counter()
+        self._elapsed = None
+
+    def on_test_begin(self, logs=None):
+        # Validation time is not training throughput
+        if self._started is not None and self._elapsed is None:
+            self._elapsed = time.perf_counter() - self._started
+
+    def on_epoch_end(self, epoch, logs=None):
+        elapsed = self._elapsed if self._elapsed is not None else time.perf_counter() - self._started
+        rate = self.samples_per_epoch / elapsed if elapsed else 0.0
+        self.rates.append(rate)
+        if logs is not None:
+            logs['samples_per_sec'] = rate
+        print(f"  epoch {epoch + 1}: {rate:.1f} samples/sec ({elapsed:.1f} s)")
+
+    def on_train_end(self, logs=None):
+        # The first epoch fills the decode cache and traces the graph
+        steady = self.rates[1:] or self.rates
+        if steady:
+            print(f"  steady-state throughput: {sum(steady) / len(steady):.1f} samples/sec")
+
+
+class TrainingRunner:
+    """Training settings shared by the training scripts"""
+
+    def __init__(self, intra_op_threads=None, inter_op_threads=2, precision='auto',
+                 accumulation_steps=1, checkpoint_dir=None, resume=True):
+        """
+        Args:
+            intra_op_threads: Threads inside one op such as a convolution
+                (defaults to the available cores)
+            inter_op_threads: Ops run concurrently
+            precision: 'bfloat16', 'float32', or 'auto' for bfloat16 on CPUs
+                with native support
+            accumulation_steps: Batches whose gradients are summed per
+                optimizer update (effective batch = batch size x steps)
+            checkpoint_dir: Where epoch checkpoints are kept for resuming
+                (no checkpoints if None)
+            resume: Continue from a checkpoint left by an interrupted run
+        """
+        if precision not in PRECISIONS:
+            raise ValueError(f"precision must be one of {', '.join(PRECISIONS)}")
+        if precision == 'auto':
+            precision = 'bfloat16' if bfloat16_supported() else 'float32'
+
+        self.intra_op_threads = intra_op_threads or available_cores()
+        self.inter_op_threads = inter_op_threads
+        self.precision = precision
+        self.accumulation_steps = max(1, accumulation_steps)
+        self.checkpoint_dir = checkpoint_dir
+        self.resume = resume
+
+        try:
+            tf.config.threading.set_intra_op_parallelism_threads(self.intra_op_threads)
+            tf.config.threading.set_inter_op_parallelism_threads(self.inter_op_threads)
+        except RuntimeError:
+            print("⚠ TensorFlow already initialized; thread settings not applied")
+        keras.mixed_precision.set_global_policy('mixed_bfloat16' if precision == 'bfloat16' else 'float32')
+
+        print(f"⚙️  Runner: {self.intra_op_threads} intra-op / {self.inter_op_threads} inter-op threads, "
+              f"{precision}, gradient accumulation x{self.accumulation_steps}")
+
+    @classmethod
+    def from_args(cls, args):
+        """Runner from the flags added by add_arguments()"""
+        return cls(
+            intra_op_threads=args.intra_op_threads,
+            inter_op_threads=args.inter_op_threads,
+            precision=args.precision,
+            accumulation_steps=args.accumulation_steps,
+            checkpoint_dir=args.checkpoint_dir,
+            resume=not args.fresh
+        )
+
+    @staticmethod
+    def add_arguments(parser, checkpoint_dir=None):
+        """Add the runner's command line flags to an argparse parser"""
+        group = parser.add_argument_group('runtime')
+        group.add_argument('--intra-op-threads', type=int, default=None, help="Threads per op (default: all cores)")
+        group.add_argument('--inter-op-threads', type=int, default=2, help="Concurrent ops")
+        group.add_argument('--precision', choices=PRECISIONS, default='auto', help="Compute precision")
+        group.add_argument('--accumulation-steps', type=int, default=1, help="Batches per optimizer update")
+        group.add_argument('--checkpoint-dir', default=checkpoint_dir, help="Epoch checkpoints for resuming")
+        group.add_argument('--fresh', action='store_true', help="Ignore checkpoints of an interrupted run")
+        return group
+
+    def prepare(self, model):
+        """Model on the runner's precision (loaded models keep their saved dtypes otherwise)"""
+        if self.precision == 'bfloat16':
+            return _with_dtype_policy(model, 'mixed_bfloat16')
+        return model
+
+    def compile(self, model, learning_rate=1e-4, loss='binary_crossentropy', metrics=('accuracy',),
+                optimizer_class=keras.optimizers.Adam, **optimizer_kwargs):
+        """Compile with an optimizer that applies accumulated gradients"""
+        if self.accumulation_steps > 1:
+            optimizer_kwargs['gradient_accumulation_steps'] = self.accumulation_steps
+        model.compile(
+            optimizer=optimizer_class(learning_rate=learning_rate, **optimizer_kwargs),
+            loss=loss,
+            metrics=list(metrics)
+        )
+        return model
+
+    def fit(self, model, train_ds, epochs, samples_per_epoch, validation_data=None, callbacks=(), verbose=1):
+        """
+        model.fit with throughput logging and resumable checkpoints
+
+        Args:
+            model: Compiled model
+            train_ds: Training dataset
+            epochs: Total epochs (a resumed run continues up to this)
+            samples_per_epoch: Training images per epoch, for samples/sec
+            validation_data: Optional validation dataset
+            callbacks: Extra Keras callbacks
+            verbose: Keras progress output
+
+        Returns:
+            Keras History (history['samples_per_sec'] holds per-epoch rates)
+        """
+        callbacks = list(callbacks) + [ThroughputLogger(samples_per_epoch)]
+        if self.checkpoint_dir:
+            if not self.resume and os.path.isdir(self.checkpoint_dir):
+                shutil.rmtree(self.checkpoint_dir)
+            elif os.path.isdir(self.checkpoint_dir) and os.listdir(self.checkpoint_dir):
+                print(f"↻ Resuming from checkpoint in {self.checkpoint_dir}")
+            # Removed again once training finishes
+            callbacks.insert(0, keras.callbacks.BackupAndRestore(self.checkpoint_dir))
+        return model.fit(train_ds, epochs=epochs, validation_data=validation_data,
+                         callbacks=callbacks, verbose=verbose)
+
+    def save(self, model, path):
+        """Save as float32 so the predictor runs it at full precision on any CPU"""
+        if self.precision == 'bfloat16':
+            model = _with_dtype_policy(model, 'float32')
+        model.save(path)
+
+
+def train_on_splits(runner, base_model_path, output_path, dataset_dir='dataset', epochs=30, batch_size=16,
+                    learning_rate=1e-4, trainable_layers=None, patience=5):
+    """
+    Train a saved model on the dataset/{train,valid} splits and save the best weights
+
+    Args:
+        runner: TrainingRunner (created before any model is loaded)
+        base_model_path: Model to start from
+        output_path: Where the trained model is saved
+        dataset_dir: Root containing train/ and optionally valid/
+        epochs: Maximum epochs
+        batch_size: Images per step (per optimizer update: x runner.accumulation_steps)
+        learning_rate: Optimizer learning rate
+        trainable_layers: Train only the last N layers (all layers if None)
+        patience: Early stopping patience in epochs
+
+    Returns:
+        Keras History
+    """
+    try:
+        from .data_pipeline import load_splits
+    except ImportError:
+        from data_pipeline import load_splits
+
+    splits = load_splits(dataset_dir, batch_size=batch_size)
+    if 'train' not in splits:
+        raise FileNotFoundError(f"No train/ split under {dataset_dir}")
+    train_ds, train_count = splits['train']
+    val_ds = splits['valid'][0] if 'valid' in splits else None
+
+    model = runner.prepare(keras.models.load_model(base_model_path))
+    if trainable_layers:
+        for layer in model.layers[:-trainable_layers]:
+            layer.trainable = False
+        for layer in model.layers[-trainable_layers:]:
+            layer.trainable = True
+    runner.compile(model, learning_rate=learning_rate)
+
+    monitor = 'val_loss' if val_ds is not None else 'loss'
+    history = runner.fit(
+        model,
+        train_ds,
+        epochs=epochs,
+        samples_per_epoch=train_count,
+        validation_data=val_ds,
+        callbacks=[keras.callbacks.EarlyStopping(monitor=monitor, patience=patience, restore_best_weights=True)]
+    )
+    os.makedirs(os.path.dirname(output_path) or '.', exist_ok=True)
+    runner.save(model, output_path)
+    return history
@@ -0,0 +1,80 @@
+#!/usr/bin/env python
+"""
+Test duplicate-incident clustering against a running MongoDB
+Uses a throwaway database (MONGODB_URL from the backend settings) and drops it afterwards
+"""
+
+import asyncio
+import sys
+from datetime import datetime
+from pathlib import Path
+
+from bson import ObjectId
+
+# Add backend directory
+sys.path.insert(0, str(Path(__file__).parent / "backend"))
+
+from app.core.config import settings  # noqa: E402
+from app.core.database import Database  # noqa: E402
+from app.core.geo import geohash_encode, haversine_km  # noqa: E402
+from app.services.incident_service import incident_service  # noqa: E402
+
+settings.DATABASE_NAME = f"incident_clustering_test_{ObjectId()}"
+
+# ~500 m apart in the same 1.2 x 0.6 km geohash cell, beyond INCIDENT_RADIUS_METERS
+FAR_A = (12.9730, 77.5900)
+FAR_B = (12.9730, 77.5946)
+
+
+async def assign(location, reported_at):
+    report_id = ObjectId()
+    info = await incident_service.assign_incident(location[0], location[1], reported_at, report_id)
+    if info["incident_id"]:
+        info.update(await incident_service.add_report(info["incident_id"], str(report_id), reported_at))
+    info["report_id"] = str(report_id)
+    return info
+
+
+async def main():
+    await Database.connect_db()
+    await Database.ensure_indexes()
+    failed = False
+    try:
+        now = datetime.utcnow()
+
+        print("\n[TEST 1] Same geohash cell, outside the incident radius...")
+        distance_m = haversine_km(*FAR_A, *FAR_B) * 1000
+        assert geohash_encode(*FAR_A, 6) == geohash_encode(*FAR_B, 6)
+        assert distance_m > settings.INCIDENT_RADIUS_METERS
+        first = await assign(FAR_A, now)
+        second = await assign(FAR_B, now)
+        if first["incident_id"] != second["incident_id"] and second["new_incident"]:
+            print(f"[PASS] {distance_m:.0f} m apart -> separate incidents")
+        else:
+            print(f"[FAIL] {distance_m:.0f} m apart but clustered: {first} / {second}")
+            failed = True
+
+        print("\n[TEST 2] Simultaneous reports of one crash...")
+        crash = (13.0500, 77.6200)
+        results = await asyncio.gather(*[assign(crash, now) for _ in range(8)])
+        incidents = {r["incident_id"] for r in results}
+        primaries = [r for r in results if r["duplicate_of"] is None]
+        incident = await Database.get_collection("incidents").find_one({"_id": ObjectId(incidents.pop())}) \
+            if len(incidents) == 1 else None
+        if incident and len(primaries) == 1 and incident["report_count"] == len(results):
+            print(f"[PASS] {len(results)} reports -> 1 incident, primary {incident['primary_report_id']}")
+        else:
+            print(f"[FAIL] Reports were split or miscounted: {results}")
+            failed = True
+    finally:
+        await Database.client.drop_database(settings.DATABASE_NAME)
+        await Database.close_db()
+
+    print("=" * 70)
+    if failed:
+        sys.exit(1)
+    print("[SUCCESS] Incident clustering OK")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())